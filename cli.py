@@ -1,3 +1,6 @@
+import asyncio
+import json
+
 import click
 import uvicorn
 
@@ -18,5 +21,286 @@ def run_webapp():
     run_service()
 
 
+@cli.command()
+def run_review_worker():
+    """Consume the review ingestion stream and write reviews in batches."""
+    from src.reviews.ingestion import ReviewIngestionWorker
+
+    asyncio.run(ReviewIngestionWorker().run())
+
+
+@cli.command()
+@click.option(
+    "--save", is_flag=True, help="Record a new baseline instead of comparing with it."
+)
+@click.option(
+    "--max-regression",
+    default="20%",
+    show_default=True,
+    help="Fail when the median of a benchmark regresses by more than this.",
+)
+def benchmark(save, max_regression):
+    """Time the hot path micro-benchmarks against the committed baseline."""
+    import pytest
+
+    args = ["tests/benchmarks", "--benchmark-enable"]
+    if save:
+        args.append("--benchmark-save=baseline")
+    else:
+        args += [
+            "--benchmark-compare",
+            f"--benchmark-compare-fail=median:{max_regression}",
+        ]
+    raise SystemExit(pytest.main(args))
+
+
+@cli.command()
+@click.option(
+    "--algorithm",
+    type=click.Choice(["RS256", "EdDSA"]),
+    default="EdDSA",
+    show_default=True,
+)
+@click.option("--kid", required=True, help="Key ID, e.g. the creation date.")
+def generate_jwt_key(algorithm, kid):
+    """Write a new private JWT signing key to JWT_KEYS_DIR."""
+    import os
+    from pathlib import Path
+
+    from src.config import settings
+    from src.users.keyring import generate_key
+
+    if not settings.JWT_KEYS_DIR:
+        raise click.UsageError("JWT_KEYS_DIR is not set")
+
+    path = Path(settings.JWT_KEYS_DIR) / f"{kid}.pem"
+    if path.exists():
+        raise click.UsageError(f"{path} already exists")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as key_file:
+        key_file.write(generate_key(algorithm))
+    click.echo(f"Wrote {path}")
+
+
+@cli.command()
+@click.option("--users", type=click.IntRange(min=1), default=1000, show_default=True)
+@click.option("--books", type=click.IntRange(min=1), default=10_000, show_default=True)
+@click.option(
+    "--reviews-per-book",
+    type=click.FloatRange(min=0),
+    default=5,
+    show_default=True,
+    help="Average number of reviews per book.",
+)
+@click.option(
+    "--reviews-per-book-dist",
+    type=click.Choice(["zipf", "uniform"]),
+    default="zipf",
+    show_default=True,
+)
+@click.option("--seed", type=int, default=None, help="Seed for reproducible data.")
+def seed(users, books, reviews_per_book, reviews_per_book_dist, seed):
+    """Bulk load synthetic users, books and reviews with COPY."""
+    from src.db.seed import SEED_EMAIL_TEMPLATE, SEED_PASSWORD, seed_database
+
+    counts = asyncio.run(
+        seed_database(users, books, reviews_per_book, reviews_per_book_dist, seed)
+    )
+    click.echo(
+        f"Seeded {counts['users']} users, {counts['books']} books and {counts['reviews']} reviews"
+    )
+    click.echo(
+        f"Users log in as {SEED_EMAIL_TEMPLATE.format('<id>')} / {SEED_PASSWORD}, "
+        f"ids start at {counts['first_user_id']}"
+    )
+
+
+@cli.command()
+@click.option("--base-url", default="http://localhost:8000", show_default=True)
+@click.option(
+    "--virtual-users", type=click.IntRange(min=1), default=20, show_default=True
+)
+@click.option("--first-user-id", type=int, default=1, show_default=True)
+@click.option("--duration", type=float, default=60, show_default=True, help="Seconds.")
+@click.option(
+    "--report",
+    type=click.Path(dir_okay=False),
+    default="load-test-report.json",
+    show_default=True,
+)
+@click.option("--seed", type=int, default=None)
+def load_test(base_url, virtual_users, first_user_id, duration, report, seed):
+    """Run the login/browse/view/review/revoke scenario against a running app.
+
+    Virtual users log in as the accounts created by the seed command.
+    """
+    from src.db.seed import SEED_EMAIL_TEMPLATE, SEED_PASSWORD
+    from src.load_test import run_load_test
+
+    emails = [
+        SEED_EMAIL_TEMPLATE.format(id)
+        for id in range(first_user_id, first_user_id + virtual_users)
+    ]
+    results = asyncio.run(
+        run_load_test(base_url, emails, SEED_PASSWORD, duration, seed)
+    )
+
+    with open(report, "w") as report_file:
+        json.dump(results, report_file, indent=2, sort_keys=True)
+
+    for step, stats in results["steps"].items():
+        latency = stats["latency_ms"]
+        click.echo(
+            f"{step:<18} {stats['throughput_rps']:>8} rps  p50 {latency['p50']}ms  "
+            f"p95 {latency['p95']}ms  p99 {latency['p99']}ms  errors {stats['errors']}"
+        )
+    click.echo(f"Report written to {report}")
+
+
+@cli.group()
+def db():
+    """Database maintenance commands."""
+
+
+@db.command("index-audit")
+@click.option(
+    "--min-rows",
+    default=10_000,
+    show_default=True,
+    help="Only flag sequential scans on tables with at least this many rows.",
+)
+def index_audit(min_rows):
+    """EXPLAIN every service query and flag sequential scans on large tables."""
+    from src.db.audit import audit_service_queries
+
+    audits = asyncio.run(audit_service_queries(min_rows))
+
+    flagged = 0
+    for audit in audits:
+        if not audit.seq_scans:
+            click.echo(f"[OK]       {audit.label}")
+            continue
+
+        flagged += 1
+        tables = ", ".join(
+            f"{table} (~{rows} rows)" for table, rows in audit.seq_scans.items()
+        )
+        click.echo(f"[SEQ SCAN] {audit.label}: {tables}")
+        click.echo(f"           {' '.join(audit.statement.split())}")
+
+    click.echo(f"{len(audits)} queries explained, {flagged} flagged")
+    if flagged:
+        raise SystemExit(1)
+
+
+@db.command("purge-deleted")
+@click.option(
+    "--older-than-days",
+    type=click.FloatRange(min=0),
+    default=30,
+    show_default=True,
+    help="Only purge rows soft deleted at least this many days ago.",
+)
+@click.option(
+    "--batch-size", type=click.IntRange(min=1), default=500, show_default=True
+)
+@click.option(
+    "--pause",
+    type=click.FloatRange(min=0),
+    default=0.1,
+    show_default=True,
+    help="Seconds to wait between batches.",
+)
+def purge_deleted(older_than_days, batch_size, pause):
+    """Hard delete soft deleted reviews and books in small batches.
+
+    Cache invalidations past their retention are deleted as well.
+    """
+    from datetime import timedelta
+
+    from src.db.invalidation import purge_invalidations
+    from src.db.purge import purge_deleted_rows
+
+    async def purge():
+        purged = await purge_deleted_rows(
+            timedelta(days=older_than_days), batch_size, pause
+        )
+        return purged, await purge_invalidations()
+
+    purged, invalidations = asyncio.run(purge())
+    click.echo(f"Purged {purged['review']} reviews and {purged['book']} books")
+    click.echo(f"Purged {invalidations} cache invalidations")
+
+
+@db.command("purge-orphan-reviews")
+@click.option(
+    "--batch-size", type=click.IntRange(min=1), default=500, show_default=True
+)
+@click.option(
+    "--pause",
+    type=click.FloatRange(min=0),
+    default=0.1,
+    show_default=True,
+    help="Seconds to wait between batches.",
+)
+def purge_orphan_reviews(batch_size, pause):
+    """Hard delete the reviews left without a book by book deletes.
+
+    Book deletes used to detach the reviews of the book instead of deleting them.
+    This can't be undone.
+    """
+    from src.db.purge import purge_orphan_reviews as purge_reviews
+
+    purged = asyncio.run(purge_reviews(batch_size, pause))
+    click.echo(f"Purged {purged} reviews without a book")
+
+
+@db.command("create-partitions")
+@click.option(
+    "--months-ahead",
+    type=click.IntRange(min=0),
+    default=3,
+    show_default=True,
+    help="Create partitions up to this many months after the current one.",
+)
+def create_partitions(months_ahead):
+    """Create the upcoming monthly partitions of the partitioned tables."""
+    from src.db.partitions import PARTITIONED_TABLES
+    from src.db.partitions import create_partitions as create_table_partitions
+
+    async def create_all():
+        created = []
+        for table in PARTITIONED_TABLES:
+            created += await create_table_partitions(table, months_ahead)
+        return created
+
+    created = asyncio.run(create_all())
+    click.echo(f"Created {len(created)} partitions")
+    for name in created:
+        click.echo(f"  {name}")
+
+
+@db.command("benchmark-ids")
+@click.option(
+    "--rows", type=click.IntRange(min=1), default=10_000_000, show_default=True
+)
+@click.option(
+    "--batch-size", type=click.IntRange(min=1), default=100_000, show_default=True
+)
+def benchmark_ids(rows, batch_size):
+    """Compare the insert throughput of uuid4 and uuid7 primary keys."""
+    from src.db.id_benchmark import benchmark_id_inserts
+
+    results = asyncio.run(benchmark_id_inserts(rows, batch_size))
+    for name, result in results.items():
+        click.echo(
+            f"{name}  {result['rows']} rows in {result['seconds']}s  "
+            f"{result['rows_per_second']} rows/s  "
+            f"last 10%: {result['tail_rows_per_second']} rows/s  "
+            f"index {result['index_size_bytes'] // (1024 * 1024)} MiB"
+        )
+
+
 if __name__ == "__main__":
     cli()
@@ -9,6 +9,7 @@ from sqlmodel import SQLModel
 
 from src.books.models import Book  # noqa:F401
 from src.config import settings
+from src.reviews.models import Review  # noqa:F401
 from src.users.models import User  # noqa:F401
 
 # this is the Alembic Config object, which provides
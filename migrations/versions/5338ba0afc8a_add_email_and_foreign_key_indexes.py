@@ -0,0 +1,52 @@
+"""add unique index on user email and indexes on foreign keys
+
+Revision ID: 5338ba0afc8a
+Revises: 567e371c3f9a
+Create Date: 2026-10-19 13:26:05.114873
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5338ba0afc8a"
+down_revision: Union[str, None] = "567e371c3f9a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns, unique)
+INDEXES = [
+    ("ix_user_email", "user", ["email"], True),
+    ("ix_book_user_id", "book", ["user_id"], False),
+    ("ix_review_book_id", "review", ["book_id"], False),
+    ("ix_review_user_id", "review", ["user_id"], False),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY doesn't block writes, but it cannot run inside a
+    # transaction. If a build fails it leaves an INVALID index behind that has to be
+    # dropped before running the migration again.
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=unique,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
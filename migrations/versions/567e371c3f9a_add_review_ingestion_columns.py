@@ -0,0 +1,61 @@
+"""add rating aggregates to book and idempotency key to review
+
+Revision ID: 567e371c3f9a
+Revises: 9cdfd61ec02a
+Create Date: 2026-10-19 11:04:17.902113
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "567e371c3f9a"
+down_revision: Union[str, None] = "9cdfd61ec02a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "book",
+        sa.Column("review_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "book",
+        sa.Column("rating_sum", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE book
+        SET review_count = totals.review_count, rating_sum = totals.rating_sum
+        FROM (
+            SELECT book_id, count(*) AS review_count, sum(rating) AS rating_sum
+            FROM review
+            GROUP BY book_id
+        ) AS totals
+        WHERE book.id = totals.book_id
+        """
+    )
+
+    op.add_column(
+        "review",
+        sa.Column("idempotency_key", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    )
+    op.create_index(
+        "ix_review_user_id_idempotency_key",
+        "review",
+        ["user_id", "idempotency_key"],
+        unique=True,
+        postgresql_where=sa.text("idempotency_key IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_review_user_id_idempotency_key", table_name="review")
+    op.drop_column("review", "idempotency_key")
+    op.drop_column("book", "rating_sum")
+    op.drop_column("book", "review_count")
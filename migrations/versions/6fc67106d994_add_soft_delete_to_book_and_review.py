@@ -0,0 +1,67 @@
+"""add soft delete to book and review
+
+Revision ID: 6fc67106d994
+Revises: 84081901321f
+Create Date: 2026-10-19 14:31:17.902364
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "6fc67106d994"
+down_revision: Union[str, None] = "84081901321f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns, where)
+INDEXES = [
+    ("ix_book_created_at_live", "book", ["created_at"], "deleted_at IS NULL"),
+    (
+        "ix_book_user_id_created_at_live",
+        "book",
+        ["user_id", "created_at"],
+        "deleted_at IS NULL",
+    ),
+    ("ix_book_deleted_at", "book", ["deleted_at"], "deleted_at IS NOT NULL"),
+    ("ix_review_deleted_at", "review", ["deleted_at"], "deleted_at IS NOT NULL"),
+]
+
+
+def upgrade() -> None:
+    # Nullable columns without a default are added without rewriting the tables.
+    op.add_column(
+        "book", sa.Column("deleted_at", postgresql.TIMESTAMP(), nullable=True)
+    )
+    op.add_column(
+        "review", sa.Column("deleted_at", postgresql.TIMESTAMP(), nullable=True)
+    )
+
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_where=sa.text(where),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+    op.drop_column("review", "deleted_at")
+    op.drop_column("book", "deleted_at")
@@ -0,0 +1,47 @@
+"""cascade review deletes with their book
+
+Revision ID: 84081901321f
+Revises: 5338ba0afc8a
+Create Date: 2026-10-19 14:02:41.538127
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "84081901321f"
+down_revision: Union[str, None] = "5338ba0afc8a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONSTRAINT = "review_book_id_fkey"
+
+
+def upgrade() -> None:
+    # Reviews detached from deleted books by the previous delete_book keep a NULL
+    # book_id, which the constraint allows; `python cli.py db purge-orphan-reviews`
+    # deletes them.
+
+    # Adding the constraint as NOT VALID only takes a lock blocking writes for an
+    # instant. The validation scans the table with a lock that doesn't block writes,
+    # once the first lock is released by committing, so it runs outside of the
+    # migration transaction.
+    op.drop_constraint(CONSTRAINT, "review", type_="foreignkey")
+    op.create_foreign_key(
+        CONSTRAINT,
+        "review",
+        "book",
+        ["book_id"],
+        ["id"],
+        ondelete="CASCADE",
+        postgresql_not_valid=True,
+    )
+    with op.get_context().autocommit_block():
+        op.execute(f"ALTER TABLE review VALIDATE CONSTRAINT {CONSTRAINT}")
+
+
+def downgrade() -> None:
+    op.drop_constraint(CONSTRAINT, "review", type_="foreignkey")
+    op.create_foreign_key(CONSTRAINT, "review", "book", ["book_id"], ["id"])
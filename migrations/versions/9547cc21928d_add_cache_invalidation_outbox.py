@@ -0,0 +1,78 @@
+"""add cache invalidation outbox
+
+Revision ID: 9547cc21928d
+Revises: e929cc241c1e
+Create Date: 2026-10-19 16:21:37.650813
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9547cc21928d"
+down_revision: Union[str, None] = "e929cc241c1e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, events) whose rows are cached locally by id. Book inserts are left out,
+# nothing can be cached for a book that didn't exist.
+TRIGGERS = [
+    ("book", "UPDATE OR DELETE"),
+    ("user", "INSERT OR UPDATE OR DELETE"),
+]
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE cache_invalidation (
+            id bigserial PRIMARY KEY,
+            entity varchar NOT NULL,
+            key varchar NOT NULL,
+            created_at timestamp without time zone NOT NULL DEFAULT clock_timestamp()
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_cache_invalidation_created_at "
+        "ON cache_invalidation (created_at)"
+    )
+    # Writes the changed row to the outbox table, for listeners catching up after a
+    # disconnect, and notifies it. Notifications are only delivered on commit.
+    op.execute(
+        """
+        CREATE FUNCTION notify_cache_invalidation() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            row_key varchar;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                row_key := OLD.id::varchar;
+            ELSE
+                row_key := NEW.id::varchar;
+            END IF;
+
+            INSERT INTO cache_invalidation (entity, key) VALUES (TG_ARGV[0], row_key);
+            PERFORM pg_notify(
+                'cache_invalidation',
+                json_build_object('entity', TG_ARGV[0], 'key', row_key)::text
+            );
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    for table, events in TRIGGERS:
+        op.execute(
+            f'CREATE TRIGGER {table}_cache_invalidation AFTER {events} ON "{table}" '
+            f"FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation('{table}')"
+        )
+
+
+def downgrade() -> None:
+    for table, _ in TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_cache_invalidation ON "{table}"')
+    op.execute("DROP FUNCTION IF EXISTS notify_cache_invalidation()")
+    op.execute("DROP TABLE IF EXISTS cache_invalidation")
@@ -0,0 +1,29 @@
+"""add version column to book table
+
+Revision ID: 9cdfd61ec02a
+Revises: 45e52a4a3065
+Create Date: 2026-10-19 09:12:41.528310
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9cdfd61ec02a"
+down_revision: Union[str, None] = "45e52a4a3065"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "book",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("book", "version")
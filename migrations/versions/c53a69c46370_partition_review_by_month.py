@@ -0,0 +1,162 @@
+"""partition review by month
+
+Revision ID: c53a69c46370
+Revises: 6fc67106d994
+Create Date: 2026-10-19 15:12:08.417391
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c53a69c46370"
+down_revision: Union[str, None] = "6fc67106d994"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Number of monthly partitions created ahead of the current month, like
+# `python cli.py db create-partitions`.
+MONTHS_AHEAD = 3
+
+COLUMNS = "id, text, rating, created_at, deleted_at, user_id, book_id, idempotency_key"
+
+COLUMN_DEFINITIONS = """
+    id integer NOT NULL DEFAULT nextval('review_id_seq'),
+    text varchar NOT NULL,
+    rating integer NOT NULL,
+    created_at timestamp without time zone {created_at},
+    deleted_at timestamp without time zone,
+    user_id integer,
+    book_id uuid,
+    idempotency_key varchar,
+    CONSTRAINT review_pkey PRIMARY KEY ({primary_key}),
+    CONSTRAINT review_user_id_fkey FOREIGN KEY (user_id) REFERENCES "user" (id),
+    CONSTRAINT review_book_id_fkey FOREIGN KEY (book_id) REFERENCES book (id)
+        ON DELETE CASCADE
+"""
+
+# (index name, CREATE statement) on the partitioned table
+PARTITIONED_INDEXES = [
+    ("ix_review_book_id", "CREATE INDEX ix_review_book_id ON review (book_id)"),
+    ("ix_review_user_id", "CREATE INDEX ix_review_user_id ON review (user_id)"),
+    (
+        "ix_review_user_id_idempotency_key",
+        "CREATE UNIQUE INDEX ix_review_user_id_idempotency_key "
+        "ON review (user_id, idempotency_key, created_at) "
+        "WHERE idempotency_key IS NOT NULL",
+    ),
+    (
+        "ix_review_deleted_at",
+        "CREATE INDEX ix_review_deleted_at ON review (deleted_at) "
+        "WHERE deleted_at IS NOT NULL",
+    ),
+    (
+        "ix_review_created_at",
+        "CREATE INDEX ix_review_created_at ON review USING brin (created_at)",
+    ),
+]
+
+# (index name, CREATE statement) on the plain table
+PLAIN_INDEXES = [
+    ("ix_review_book_id", "CREATE INDEX ix_review_book_id ON review (book_id)"),
+    ("ix_review_user_id", "CREATE INDEX ix_review_user_id ON review (user_id)"),
+    (
+        "ix_review_user_id_idempotency_key",
+        "CREATE UNIQUE INDEX ix_review_user_id_idempotency_key "
+        "ON review (user_id, idempotency_key) WHERE idempotency_key IS NOT NULL",
+    ),
+    (
+        "ix_review_deleted_at",
+        "CREATE INDEX ix_review_deleted_at ON review (deleted_at) "
+        "WHERE deleted_at IS NOT NULL",
+    ),
+]
+
+# One partition per month from the oldest review up to MONTHS_AHEAD months from now,
+# named like the partitions created by `src.db.partitions`.
+CREATE_PARTITIONS = f"""
+    DO $$
+    DECLARE
+        month date;
+        last_month date;
+    BEGIN
+        SELECT date_trunc('month', COALESCE(min(created_at), now()))::date,
+               date_trunc('month', greatest(
+                   max(created_at), now() + interval '{MONTHS_AHEAD} months'
+               ))::date
+        INTO month, last_month
+        FROM review_old;
+
+        WHILE month <= last_month LOOP
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF review FOR VALUES FROM (%L) TO (%L)',
+                'review_' || to_char(month, 'YYYY_MM'),
+                month,
+                (month + interval '1 month')::date
+            );
+            month := (month + interval '1 month')::date;
+        END LOOP;
+    END $$
+"""
+
+
+def replace_review_table(
+    old_indexes: list, create_statements: list[str], new_indexes: list
+) -> None:
+    """
+    Moves the reviews into a new `review` table, keeping the id sequence.
+
+    The old table is renamed out of the way (with its primary key, whose index name
+    would clash) and dropped once its rows are copied, so this holds an exclusive
+    lock on `review` for as long as the copy takes. Indexes are built after the copy.
+    """
+    op.execute("ALTER TABLE review RENAME TO review_old")
+    op.execute(
+        "ALTER TABLE review_old RENAME CONSTRAINT review_pkey TO review_old_pkey"
+    )
+    for name, _ in old_indexes:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    # Otherwise the sequence would be dropped with the old table.
+    op.execute("ALTER SEQUENCE review_id_seq OWNED BY NONE")
+
+    for statement in create_statements:
+        op.execute(statement)
+    op.execute(
+        f"""
+        INSERT INTO review ({COLUMNS})
+        SELECT id, text, rating, COALESCE(created_at, now()), deleted_at, user_id,
+               book_id, idempotency_key
+        FROM review_old
+        """
+    )
+    op.execute("ALTER SEQUENCE review_id_seq OWNED BY review.id")
+    # The partitions of a partitioned old table are dropped with it.
+    op.execute("DROP TABLE review_old")
+
+    for _, statement in new_indexes:
+        op.execute(statement)
+    op.execute("ANALYZE review")
+
+
+def upgrade() -> None:
+    create_table = (
+        "CREATE TABLE review ("
+        + COLUMN_DEFINITIONS.format(
+            created_at="NOT NULL DEFAULT now()", primary_key="id, created_at"
+        )
+        + ") PARTITION BY RANGE (created_at)"
+    )
+    replace_review_table(
+        PLAIN_INDEXES, [create_table, CREATE_PARTITIONS], PARTITIONED_INDEXES
+    )
+
+
+def downgrade() -> None:
+    create_table = (
+        "CREATE TABLE review ("
+        + COLUMN_DEFINITIONS.format(created_at="", primary_key="id")
+        + ")"
+    )
+    replace_review_table(PARTITIONED_INDEXES, [create_table], PLAIN_INDEXES)
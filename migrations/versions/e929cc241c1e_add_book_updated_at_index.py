@@ -0,0 +1,38 @@
+"""add book updated_at index for the changes feed
+
+Revision ID: e929cc241c1e
+Revises: c53a69c46370
+Create Date: 2026-10-19 15:48:52.107624
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e929cc241c1e"
+down_revision: Union[str, None] = "c53a69c46370"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_book_updated_at_id",
+            "book",
+            ["updated_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_book_updated_at_id",
+            table_name="book",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
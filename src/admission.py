@@ -0,0 +1,152 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+
+from src.config import settings
+from src.exceptions import RequestShedException
+
+# Priority classes, most important first, with the share of the in-flight slots each
+# may use. Lower classes are kept out of the last slots, so that health checks and
+# logins are still admitted while listings are being shed.
+PRIORITY_SHARES = {"critical": 1.0, "normal": 0.9, "low": 0.5}
+CRITICAL_PATHS = ("/health", "/metrics", "/api/users/auth/")
+LOW_PRIORITY_PATHS = ("/api/books/", "/api/books/current-user")
+LOW_PRIORITY_PREFIXES = ("/api/books/user/",)
+
+
+def request_priority(method: str, path: str) -> str:
+    """
+    Classifies a request for admission control.
+
+    Parameters:
+    - method (str): The HTTP method.
+    - path (str): The URL path.
+
+    Returns:
+    - str: `critical` for health checks, metrics and authentication, `low` for book
+      listings and `normal` for everything else.
+    """
+    if path.startswith(CRITICAL_PATHS):
+        return "critical"
+    if method == "GET" and (
+        path in LOW_PRIORITY_PATHS or path.startswith(LOW_PRIORITY_PREFIXES)
+    ):
+        return "low"
+    return "normal"
+
+
+class AdmissionController:
+    """
+    Limits the number of requests a worker processes at the same time.
+
+    Requests beyond `max_in_flight` wait in a queue per priority class. When a slot
+    frees up it goes to the oldest waiter of the most important class allowed to use
+    it. A request that waited longer than the queue time budget of its class is shed,
+    so that under overload some requests fail fast instead of all of them timing out.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = settings.ADMISSION_MAX_IN_FLIGHT,
+        queue_budgets_ms: dict[str, int] = settings.ADMISSION_QUEUE_BUDGETS_MS,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.queue_budgets_ms = queue_budgets_ms
+        self.slots = {
+            priority: max(1, int(max_in_flight * share))
+            for priority, share in PRIORITY_SHARES.items()
+        }
+        self.in_flight = 0
+        self._waiters = {priority: deque() for priority in PRIORITY_SHARES}
+        self.admitted = defaultdict(int)
+        self.shed = defaultdict(int)
+        self.queue_time_ms = defaultdict(float)
+
+    def _can_admit(self, priority: str) -> bool:
+        return self.in_flight < self.slots[priority]
+
+    async def acquire(self, priority: str) -> float:
+        """
+        Waits for an in-flight slot.
+
+        Parameters:
+        - priority (str): The priority class of the request.
+
+        Returns:
+        - float: The time spent queueing, in milliseconds.
+
+        Raises:
+        - RequestShedException: If no slot became available within the queue time budget.
+        """
+        start_time = time.monotonic()
+        queued_ahead = any(
+            self._waiters[other]
+            for other in PRIORITY_SHARES
+            if self.slots[other] >= self.slots[priority]
+        )
+        if not queued_ahead and self._can_admit(priority):
+            self.in_flight += 1
+            self.admitted[priority] += 1
+            return 0.0
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_budgets_ms[priority] / 1000)
+        except asyncio.CancelledError:
+            # The client went away; give back the slot if it was already handed over.
+            if waiter.done():
+                self.release()
+            else:
+                self._waiters[priority].remove(waiter)
+            raise
+
+        queue_time_ms = (time.monotonic() - start_time) * 1000
+        if not waiter.done():
+            self._waiters[priority].remove(waiter)
+            self.shed[priority] += 1
+            raise RequestShedException(
+                f"Shed a {priority} request after queueing {queue_time_ms:.0f}ms"
+            )
+
+        self.admitted[priority] += 1
+        self.queue_time_ms[priority] += queue_time_ms
+        return queue_time_ms
+
+    def release(self) -> None:
+        """
+        Frees an in-flight slot, handing it straight to the next eligible waiter.
+        """
+        self.in_flight -= 1
+        for priority, waiters in self._waiters.items():
+            if waiters and self._can_admit(priority):
+                # The slot stays taken, it now belongs to the waiter.
+                self.in_flight += 1
+                waiters.popleft().set_result(None)
+                return
+
+    def metrics(self) -> dict:
+        """
+        Returns:
+        - dict: The current load and the admitted and shed request counts per
+          priority class, with the average queue time of admitted requests.
+        """
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "classes": {
+                priority: {
+                    "queued": len(self._waiters[priority]),
+                    "admitted": self.admitted[priority],
+                    "shed": self.shed[priority],
+                    "avg_queue_time_ms": round(
+                        self.queue_time_ms[priority] / max(1, self.admitted[priority]),
+                        2,
+                    ),
+                }
+                for priority in PRIORITY_SHARES
+            },
+        }
+
+
+admission_controller = AdmissionController()
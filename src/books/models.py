@@ -1,16 +1,40 @@
 from datetime import date, datetime
 from typing import List, Optional
-from uuid import UUID, uuid4
+from uuid import UUID
 
 import sqlalchemy.dialects.postgresql as pg
-from sqlmodel import Column, Field, Relationship, SQLModel
+from sqlmodel import Column, Field, Index, Integer, Relationship, SQLModel, text
+
+from src.db.ids import uuid7
 
 
 class Book(SQLModel, table=True):
     __tablename__ = "book"
+    __table_args__ = (
+        # Listings only read live books, so the indexes serving them skip deleted ones.
+        Index(
+            "ix_book_created_at_live",
+            "created_at",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_book_user_id_created_at_live",
+            "user_id",
+            "created_at",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        # Serves the changes feed, deleted books included as tombstones.
+        Index("ix_book_updated_at_id", "updated_at", "id"),
+        Index(
+            "ix_book_deleted_at",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
 
+    # Time ordered ids keep inserts on the right edge of the primary key index.
     id: UUID = Field(
-        sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid4)
+        sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid7)
     )
     title: str
     author: str
@@ -20,10 +44,30 @@ class Book(SQLModel, table=True):
     language: str
     created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
     updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
-    user_id: int | None = Field(default=None, foreign_key="user.id")
+    deleted_at: datetime | None = Field(
+        default=None, sa_column=Column(pg.TIMESTAMP, nullable=True)
+    )
+    version: int = Field(
+        default=1,
+        sa_column=Column(Integer, nullable=False, default=1, server_default="1"),
+    )
+    review_count: int = Field(
+        default=0,
+        sa_column=Column(Integer, nullable=False, default=0, server_default="0"),
+    )
+    rating_sum: int = Field(
+        default=0,
+        sa_column=Column(Integer, nullable=False, default=0, server_default="0"),
+    )
+    user_id: int | None = Field(default=None, foreign_key="user.id", index=True)
     user: Optional["User"] = Relationship(back_populates="books")
     reviews: List["Review"] = Relationship(
-        back_populates="book", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="book",
+        sa_relationship_kwargs={
+            "lazy": "selectin",
+            "passive_deletes": True,
+            "primaryjoin": "and_(Book.id == Review.book_id, Review.deleted_at == None)",
+        },
     )
 
     def __repr__(self):
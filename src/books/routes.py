@@ -1,25 +1,121 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.app_logging import LoggingConfig
 from src.books.schemas import (
+    BOOK_DETAIL_FIELDS,
+    BOOK_FIELDS,
+    BookBatchGetModel,
+    BookBatchItemModel,
+    BookBatchModel,
+    BookChangeModel,
+    BookChangesModel,
     BookCreateModel,
     BookDetailModel,
     BookModel,
+    BookRatingModel,
     BookUpdateModel,
 )
 from src.books.service import BookService
 from src.db.main import get_session
-from src.exceptions import BookNotFoundException, UserNotFoundException
+from src.exceptions import (
+    BookNotFoundException,
+    BookVersionMismatchException,
+    ChangesTokenExpiredException,
+    InvalidChangesTokenException,
+    ServiceUnavailableException,
+    UserNotFoundException,
+)
+from src.negotiation import NegotiatedRoute
 from src.users.dependencies import AccessTokenBearer, RoleChecker
 
-book_router = APIRouter()
+book_router = APIRouter(route_class=NegotiatedRoute)
 access_token_bearer = AccessTokenBearer()
 role_checker = RoleChecker(["admin", "user"])
 logger = LoggingConfig.get_logger(__name__)
+# Sent with books served from the stale book cache while the database is unavailable.
+STALE_WARNING = '110 - "Response is Stale"'
+
+
+def parse_if_match(if_match: str | None) -> int | None:
+    """
+    Parse the book version out of an `If-Match` header.
+
+    Book ETags are the quoted book version (e.g. `"3"`); weak validators are
+    accepted as well. A missing header or `*` means no version check.
+
+    Args:
+        if_match (str | None): The raw `If-Match` header value.
+
+    Returns:
+        int | None: The expected book version, or None if no check is requested.
+
+    Raises:
+        HTTPException: 412 if the header cannot be parsed into a version.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+
+    value = if_match.strip().removeprefix("W/").strip('"')
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Invalid If-Match header",
+        )
+
+
+class FieldsParser:
+    """
+    Dependency parsing the `fields` query parameter of book endpoints.
+
+    `fields` is a comma separated list of the fields to return, e.g.
+    `?fields=id,title,author`. Only those columns are selected and the response is
+    built from the selected rows directly. `id` is always returned.
+    """
+
+    def __init__(self, allowed_fields: tuple[str, ...]) -> None:
+        self.allowed_fields = allowed_fields
+
+    def __call__(
+        self,
+        fields: str | None = Query(
+            default=None,
+            max_length=512,
+            description="Comma separated fields to return, e.g. `id,title,author`",
+        ),
+    ) -> list[str] | None:
+        """
+        Args:
+            fields (str | None): The raw `fields` query parameter.
+
+        Returns:
+            list[str] | None: The requested fields, `id` first, or None for all fields.
+
+        Raises:
+            HTTPException: 400 if a field is unknown.
+        """
+        if fields is None:
+            return None
+
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in self.allowed_fields]
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. "
+                f"Allowed fields: {', '.join(self.allowed_fields)}",
+            )
+        return list(dict.fromkeys(["id", *requested]))
+
+
+book_fields = FieldsParser(BOOK_FIELDS)
+book_detail_fields = FieldsParser(BOOK_DETAIL_FIELDS)
 
 
 @book_router.get(
@@ -32,8 +128,9 @@ logger = LoggingConfig.get_logger(__name__)
     },
 )
 async def get_all_books(
+    fields: list[str] | None = Depends(book_fields),
     book_service: BookService = Depends(BookService),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_session, scope="function"),
     _: dict = Depends(access_token_bearer),
 ) -> list[BookModel]:
     """
@@ -43,6 +140,7 @@ async def get_all_books(
     Authentication is required, and only authorized users can access this resource.
 
     Args:
+        fields (list[str] | None): The fields to return, all fields by default.
         book_service (BookService): The service handling book-related operations.
         session (AsyncSession): The database session dependency.
         _ (dict): The access token extracted from the request (for authentication).
@@ -54,8 +152,12 @@ async def get_all_books(
         HTTPException: If an internal server error occurs.
     """
     try:
-        books = await book_service.get_all_books(session)
+        books = await book_service.get_all_books(session, fields)
+        if fields is not None:
+            return JSONResponse(jsonable_encoder(books))
         return books
+    except ServiceUnavailableException:
+        raise
     except Exception as ex:
         logger.error(
             f"An error occurred while retrieving the list of books. Exception is: {ex}"
@@ -77,8 +179,9 @@ async def get_all_books(
 )
 async def get_user_books(
     user_id: int,
+    fields: list[str] | None = Depends(book_fields),
     book_service: BookService = Depends(BookService),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_session, scope="function"),
     _: dict = Depends(access_token_bearer),
 ) -> list[BookModel]:
     """
@@ -86,6 +189,7 @@ async def get_user_books(
 
     Args:
         user_id (int): The ID of the user whose books should be retrieved.
+        fields (list[str] | None): The fields to return, all fields by default.
         book_service (BookService): The service handling book-related operations.
         session (AsyncSession): The database session dependency.
         _ (dict): The access token bearer for authentication.
@@ -99,13 +203,17 @@ async def get_user_books(
     """
 
     try:
-        books = await book_service.get_user_books(user_id, session)
+        books = await book_service.get_user_books(user_id, session, fields)
+        if fields is not None:
+            return JSONResponse(jsonable_encoder(books))
         return books
     except UserNotFoundException as ex:
         logger.warning(f"User {user_id} not found. Unable to retrieve book list.")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="User doesn't exist"
         )
+    except ServiceUnavailableException:
+        raise
     except Exception as ex:
         logger.error(
             f"An error occurred while retrieving the list of books for user: {user_id}. Exception is: {ex}"
@@ -126,7 +234,8 @@ async def get_user_books(
     },
 )
 async def get_current_user_books(
-    session: AsyncSession = Depends(get_session),
+    fields: list[str] | None = Depends(book_fields),
+    session: AsyncSession = Depends(get_session, scope="function"),
     book_service: BookService = Depends(BookService),
     token_details: dict = Depends(access_token_bearer),
 ) -> list[BookModel]:
@@ -134,6 +243,7 @@ async def get_current_user_books(
     Retrieves a list of books for the currently authenticated user.
 
     Args:
+        fields (list[str] | None): The fields to return, all fields by default.
         session (AsyncSession): The database session dependency.
         book_service (BookService): The service handling book-related operations.
         token_details (dict): The authentication token containing user details.
@@ -147,7 +257,11 @@ async def get_current_user_books(
     """
 
     try:
-        books = await book_service.get_user_books(token_details["user"]["id"], session)
+        books = await book_service.get_user_books(
+            token_details["user"]["id"], session, fields
+        )
+        if fields is not None:
+            return JSONResponse(jsonable_encoder(books))
         return books
     except UserNotFoundException:
         logger.warning(
@@ -156,6 +270,8 @@ async def get_current_user_books(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="User doesn't exist"
         )
+    except ServiceUnavailableException:
+        raise
     except Exception as ex:
         logger.error(
             f"An error occurred while retrieving the list of books for user: {token_details["user"]["email"]}. Exception is: {ex}"
@@ -166,6 +282,150 @@ async def get_current_user_books(
         )
 
 
+@book_router.get(
+    "/changes",
+    dependencies=[Depends(role_checker)],
+    status_code=status.HTTP_200_OK,
+    responses={
+        403: {"description": "Not authenticated"},
+        400: {"description": "Invalid changes token"},
+        410: {"description": "Changes token expired, resync from scratch"},
+    },
+)
+async def get_book_changes(
+    since: str | None = Query(default=None, max_length=256),
+    limit: int = Query(default=100, ge=1, le=1000),
+    book_service: BookService = Depends(BookService),
+    session: AsyncSession = Depends(get_session, scope="function"),
+    _: dict = Depends(access_token_bearer),
+) -> BookChangesModel:
+    """
+    Fetch the books created, updated or deleted since the last sync.
+
+    Clients start without `since`, then pass the `next_token` of the previous page
+    until `has_more` is false, and keep the last token to resume from on their next
+    sync. Deleted books are returned as tombstones (`deleted` set, no `book`).
+
+    Args:
+        since (str | None): The `next_token` of the previous call.
+        limit (int): The maximum number of changes to return.
+        book_service (BookService): The service handling book-related operations.
+        session (AsyncSession): The database session dependency.
+        _ (dict): The access token extracted from the request (for authentication).
+
+    Returns:
+        BookChangesModel: The changes, the token to resume from and whether more
+            changes are available right away.
+
+    Raises:
+        HTTPException: 400 if the token is invalid, 410 if it is older than the
+            tombstone retention, 500 if an internal server error occurs.
+    """
+    try:
+        books, next_token, has_more = await book_service.get_book_changes(
+            since, limit, session
+        )
+        return BookChangesModel(
+            changes=[
+                BookChangeModel(
+                    id=book.id,
+                    deleted=book.deleted_at is not None,
+                    book=BookModel.model_validate(book, from_attributes=True)
+                    if book.deleted_at is None
+                    else None,
+                )
+                for book in books
+            ],
+            next_token=next_token,
+            has_more=has_more,
+        )
+    except InvalidChangesTokenException:
+        logger.warning(f"Invalid changes token {since}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid changes token"
+        )
+    except ChangesTokenExpiredException:
+        logger.warning(f"Expired changes token {since}")
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Changes token expired, resync from scratch",
+        )
+    except ServiceUnavailableException:
+        raise
+    except Exception as ex:
+        logger.error(
+            f"An error occurred while retrieving book changes. Exception is: {ex}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Something went wrong",
+        )
+
+
+@book_router.post(
+    "/batch-get",
+    dependencies=[Depends(role_checker)],
+    status_code=status.HTTP_200_OK,
+    responses={403: {"description": "Not authenticated"}},
+)
+async def batch_get_books(
+    batch: BookBatchGetModel,
+    book_service: BookService = Depends(BookService),
+    session: AsyncSession = Depends(get_session, scope="function"),
+    _: dict = Depends(access_token_bearer),
+) -> BookBatchModel:
+    """
+    Fetch several books by their IDs in one request.
+
+    Books are returned in the order of the requested IDs. IDs of books that don't
+    exist or were deleted are returned with `found` unset and no `book`.
+
+    Args:
+        batch (BookBatchGetModel): The IDs of the books, up to 100, and whether to
+            include their review count and average rating.
+        book_service (BookService): The service handling book-related operations.
+        session (AsyncSession): The database session dependency.
+        _ (dict): The access token extracted from the request (for authentication).
+
+    Returns:
+        BookBatchModel: One entry per requested ID.
+
+    Raises:
+        HTTPException: 500 if an internal server error occurs.
+    """
+    try:
+        books = await book_service.get_books(batch.ids, session)
+        items = []
+        for book_id in batch.ids:
+            book = books.get(book_id)
+            item = BookBatchItemModel(
+                id=book_id,
+                found=book is not None,
+                book=BookModel.model_validate(book, from_attributes=True)
+                if book is not None
+                else None,
+            )
+            if book is not None and batch.include_ratings:
+                item.rating = BookRatingModel(
+                    review_count=book.review_count,
+                    average_rating=book.rating_sum / book.review_count
+                    if book.review_count
+                    else None,
+                )
+            items.append(item)
+        return BookBatchModel(books=items)
+    except ServiceUnavailableException:
+        raise
+    except Exception as ex:
+        logger.error(
+            f"An error occurred while retrieving a batch of {len(batch.ids)} books. Exception is: {ex}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Something went wrong",
+        )
+
+
 @book_router.get(
     "/get-book/{book_id}",
     dependencies=[Depends(role_checker)],
@@ -177,8 +437,10 @@ async def get_current_user_books(
 )
 async def get_book(
     book_id: UUID,
+    response: Response,
+    fields: list[str] | None = Depends(book_detail_fields),
     book_service: BookService = Depends(BookService),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_session, scope="function"),
     _: dict = Depends(access_token_bearer),
 ) -> BookDetailModel:
     """
@@ -187,8 +449,12 @@ async def get_book(
     This endpoint fetches a book's details based on the provided book ID. If the book is not found,
     a 404 error is returned. In case of other errors, a generic 500 error is raised.
 
+    While the database is unavailable, the last version of the book read by this worker is
+    returned with a `Warning: 110` header, or a 503 error if there is none.
+
     Args:
         book_id (UUID): The ID of the book to retrieve.
+        fields (list[str] | None): The fields to return, all fields by default.
         book_service (BookService): The service used to interact with the book data.
         session (AsyncSession): The database session used for queries.
         _: dict: The access token for user authentication (included by the Depends).
@@ -201,8 +467,21 @@ async def get_book(
     """
 
     try:
-        book = await book_service.get_book(book_id, session)
+        book, stale = await book_service.get_book_or_stale(book_id, session, fields)
+        headers = {}
+        if stale:
+            logger.warning(f"Serving stale book {book_id}, the database is unavailable")
+            headers["Warning"] = STALE_WARNING
+        if book is not None and fields is not None:
+            # The book may be shared with concurrent requests, see `get_book`.
+            content = {
+                field: value for field, value in book.items() if field != "version"
+            }
+            headers["ETag"] = f'"{book["version"]}"'
+            return JSONResponse(jsonable_encoder(content), headers=headers)
         if book is not None:
+            response.headers.update(headers)
+            response.headers["ETag"] = f'"{book.version}"'
             return book
         else:
             raise BookNotFoundException(f"Book {book_id} doesn't exist")
@@ -211,6 +490,8 @@ async def get_book(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Book not found"
         )
+    except ServiceUnavailableException:
+        raise
     except Exception as ex:
         logger.error(
             f"An error occurred while retrieving book: {book_id}. Exception is: {ex}"
@@ -233,7 +514,7 @@ async def get_book(
 async def create_book(
     book_data: BookCreateModel,
     book_service: BookService = Depends(BookService),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_session, scope="function"),
     token_details: dict = Depends(access_token_bearer),
 ) -> BookModel:
     """
@@ -269,6 +550,8 @@ async def create_book(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot create a book, user doesn't exist",
         )
+    except ServiceUnavailableException:
+        raise
     except Exception as ex:
         logger.error(f"An error occurred while creating a book. Exception is: {ex}")
         raise HTTPException(
@@ -283,13 +566,16 @@ async def create_book(
     responses={
         403: {"description": "Not authenticated"},
         400: {"description": "Bad Request"},
+        412: {"description": "Precondition Failed"},
     },
 )
 async def update_book(
     book_id: UUID,
     book_data: BookUpdateModel,
+    response: Response,
+    if_match: str | None = Header(default=None),
     book_service: BookService = Depends(BookService),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_session, scope="function"),
     _: dict = Depends(access_token_bearer),
 ) -> BookModel:
     """
@@ -298,10 +584,13 @@ async def update_book(
     This endpoint allows for updating the book information in the database.
     It expects a valid book ID and the updated data. If the book doesn't exist, it raises a 404 error.
     If an internal error occurs during the update process, a 500 error is raised.
+    When an `If-Match` header carrying the book's ETag is sent, the update only
+    applies if the book has not been modified in the meantime.
 
     Parameters:
     - book_id (UUID): The unique identifier of the book to be updated.
     - book_data (BookUpdateModel): The data to update the book with.
+    - if_match (str | None): Optional ETag (book version) the update is conditional on.
 
     Returns:
     - BookModel: The updated book data.
@@ -310,11 +599,16 @@ async def update_book(
     - 200 OK: Book successfully updated.
     - 400 Bad Request: Invalid request or data provided.
     - 404 Not Found: Book with the specified ID not found.
+    - 412 Precondition Failed: The book was modified since the given version.
     - 500 Internal Server Error: An error occurred during the update process.
     """
+    expected_version = parse_if_match(if_match)
 
     try:
-        book = await book_service.update_book(book_id, book_data, session)
+        book = await book_service.update_book(
+            book_id, book_data, session, expected_version=expected_version
+        )
+        response.headers["ETag"] = f'"{book.version}"'
         return book
     except BookNotFoundException:
         logger.warning(
@@ -324,6 +618,16 @@ async def update_book(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Cannot update book, book not found",
         )
+    except BookVersionMismatchException:
+        logger.warning(
+            f"Failed to update book {book_id}. The book was modified since version {expected_version}."
+        )
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Cannot update book, book was modified by someone else",
+        )
+    except ServiceUnavailableException:
+        raise
     except Exception as ex:
         logger.error(
             f"An error occurred while updating book {book_id}. Exception details: {ex}"
@@ -345,7 +649,7 @@ async def update_book(
 async def delete_book(
     book_id: UUID,
     book_service: BookService = Depends(BookService),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_session, scope="function"),
     _: dict = Depends(access_token_bearer),
 ):
     """
@@ -381,6 +685,8 @@ async def delete_book(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Cannot delete book, book not found",
         )
+    except ServiceUnavailableException:
+        raise
     except Exception as ex:
         logger.error(
             f"An error occurred while deleting book {book_id}. Exception details: {ex}"
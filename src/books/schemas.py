@@ -2,7 +2,7 @@ import uuid
 from datetime import date, datetime
 from typing import List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from src.reviews.schemas import ReviewModel
 
@@ -24,6 +24,44 @@ class BookDetailModel(BookModel):
     reviews: List[ReviewModel]
 
 
+# The fields clients can narrow book responses down to with `?fields=`.
+BOOK_FIELDS = tuple(BookModel.model_fields)
+BOOK_DETAIL_FIELDS = tuple(BookDetailModel.model_fields)
+
+
+class BookChangeModel(BaseModel):
+    id: uuid.UUID
+    deleted: bool
+    book: BookModel | None
+
+
+class BookChangesModel(BaseModel):
+    changes: List[BookChangeModel]
+    next_token: str | None
+    has_more: bool
+
+
+class BookBatchGetModel(BaseModel):
+    ids: List[uuid.UUID] = Field(min_length=1, max_length=100)
+    include_ratings: bool = False
+
+
+class BookRatingModel(BaseModel):
+    review_count: int
+    average_rating: float | None
+
+
+class BookBatchItemModel(BaseModel):
+    id: uuid.UUID
+    found: bool
+    book: BookModel | None
+    rating: BookRatingModel | None = None
+
+
+class BookBatchModel(BaseModel):
+    books: List[BookBatchItemModel]
+
+
 class BookCreateModel(BaseModel):
     title: str
     author: str
@@ -1,11 +1,30 @@
+import base64
+import binascii
+from datetime import datetime, timedelta
 from uuid import UUID
 
+import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import any_, func, insert, literal, tuple_, update
+from sqlalchemy.orm import raiseload
 from sqlmodel import desc, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.books.models import Book
 from src.books.schemas import BookCreateModel, BookUpdateModel
-from src.exceptions import BookNotFoundException, UserNotFoundException
+from src.cache import book_cache, stale_book_cache
+from src.config import settings
+from src.exceptions import (
+    BookNotFoundException,
+    BookVersionMismatchException,
+    ChangesTokenExpiredException,
+    InvalidChangesTokenException,
+    ServiceUnavailableException,
+    UserNotFoundException,
+)
+from src.loaders import get_loaders
+from src.reviews.models import Review
+from src.reviews.schemas import ReviewModel
+from src.singleflight import coalesce
 from src.users.service import UserService
 
 user_service = UserService()
@@ -19,31 +38,42 @@ class BookService:
     from the database. It ensures that user-related checks are performed where necessary.
     """
 
-    async def get_all_books(self, session: AsyncSession) -> list[Book]:
+    async def get_all_books(
+        self, session: AsyncSession, fields: list[str] | None = None
+    ) -> list[Book] | list[dict]:
         """
-        Retrieve all books from the database.
+        Retrieve all books from the database, except soft deleted ones.
 
         Args:
             session (AsyncSession): The database session.
+            fields (list[str] | None): When given, only these columns are selected
+                and the books are returned as dicts instead of `Book` objects.
 
         Returns:
-            list[Book]: A list of all books, ordered by creation date.
+            list[Book] | list[dict]: A list of all books, ordered by creation date.
         """
-        statement = select(Book).order_by(desc(Book.created_at))
-        results = await session.exec(statement)
-
-        return results.all()
+        statement = (
+            select(*self._columns(fields))
+            .where(Book.deleted_at.is_(None))
+            .order_by(desc(Book.created_at))
+        )
+        return await self._fetch_books(statement, fields, session)
 
-    async def get_user_books(self, user_id: int, session: AsyncSession) -> list[Book]:
+    async def get_user_books(
+        self, user_id: int, session: AsyncSession, fields: list[str] | None = None
+    ) -> list[Book] | list[dict]:
         """
         Retrieve all books belonging to a specific user.
 
         Args:
             user_id (int): The ID of the user.
             session (AsyncSession): The database session.
+            fields (list[str] | None): When given, only these columns are selected
+                and the books are returned as dicts instead of `Book` objects.
 
         Returns:
-            list[Book]: A list of books associated with the given user.
+            list[Book] | list[dict]: A list of books associated with the given user,
+                except soft deleted ones.
 
         Raises:
             UserNotFoundException: If the user does not exist.
@@ -53,26 +83,207 @@ class BookService:
             raise UserNotFoundException(f"User {user_id} doesn't exist")
 
         statement = (
-            select(Book).where(Book.user_id == user_id).order_by(desc(Book.created_at))
+            select(*self._columns(fields))
+            .where(Book.user_id == user_id, Book.deleted_at.is_(None))
+            .order_by(desc(Book.created_at))
         )
-        results = await session.exec(statement)
-
-        return results.all()
+        return await self._fetch_books(statement, fields, session)
 
-    async def get_book(self, book_id: int, session: AsyncSession) -> Book | None:
+    async def get_book(
+        self, book_id: int, session: AsyncSession, fields: list[str] | None = None
+    ) -> Book | dict | None:
         """
         Retrieve a book by its ID.
 
+        Books are served from the local book cache when possible. Every change to a
+        book row evicts it from the caches of all workers. Other lookups are batched
+        and memoised for the session (see `Loaders`), and concurrent lookups of the
+        same book share one query (see `coalesce`), so the result must not be
+        mutated.
+
         Args:
             book_id (UUID): The unique identifier of the book.
             session (AsyncSession): The database session.
+            fields (list[str] | None): When given, the book is returned as a dict of
+                these fields (and `version`), and only their columns are selected.
+                `reviews` loads the reviews of the book.
+
+        Returns:
+            Book | dict | None: The book if found and not soft deleted, otherwise None.
+        """
+        book = book_cache.get(str(book_id))
+        if book is not None:
+            return self._project(book, fields) if fields is not None else book
+
+        return await self._load_book(book_id, session, fields)
+
+    async def get_book_or_stale(
+        self, book_id: UUID, session: AsyncSession, fields: list[str] | None = None
+    ) -> tuple[Book | dict | None, bool]:
+        """
+        Retrieve a book by its ID, or its last version read by this worker while the
+        database is unavailable.
+
+        Args:
+            book_id (UUID): The unique identifier of the book.
+            session (AsyncSession): The database session.
+            fields (list[str] | None): The fields to return, see `get_book`.
+
+        Returns:
+            tuple[Book | dict | None, bool]: The book, as returned by `get_book`, and
+                whether it is stale.
+
+        Raises:
+            ServiceUnavailableException: If the database is unavailable and the book
+                wasn't read by this worker within `STALE_BOOK_TTL_SECONDS`.
+        """
+        try:
+            return await self.get_book(book_id, session, fields), False
+        except ServiceUnavailableException:
+            book = stale_book_cache.get(str(book_id))
+            if book is None:
+                raise
+            return (self._project(book, fields) if fields is not None else book), True
+
+    async def get_books(
+        self, book_ids: list[UUID], session: AsyncSession
+    ) -> dict[UUID, Book]:
+        """
+        Retrieve several books by their IDs.
+
+        Books in the local book cache are served from it, the others are fetched
+        with a single `id = ANY(:ids)` query, without their reviews. Repeated IDs
+        are only looked up once.
+
+        Args:
+            book_ids (list[UUID]): The unique identifiers of the books.
+            session (AsyncSession): The database session.
+
+        Returns:
+            dict[UUID, Book]: The books found and not soft deleted, by ID.
+        """
+        books = {}
+        missing = []
+        for book_id in dict.fromkeys(book_ids):
+            book = book_cache.get(str(book_id))
+            if book is not None:
+                books[book_id] = book
+            else:
+                missing.append(book_id)
+
+        if missing:
+            statement = (
+                select(Book)
+                .options(raiseload(Book.reviews))
+                .where(
+                    # One array parameter, so the statement is the same for any
+                    # number of IDs.
+                    Book.id == any_(literal(missing, pg.ARRAY(pg.UUID))),
+                    Book.deleted_at.is_(None),
+                )
+            )
+            results = await session.exec(statement)
+            books.update((book.id, book) for book in results.all())
+
+        return books
+
+    @staticmethod
+    def encode_changes_token(updated_at: datetime, book_id: UUID) -> str:
+        """
+        Encode a position in the changes feed as an opaque token.
+
+        Args:
+            updated_at (datetime): The `updated_at` of the last book seen.
+            book_id (UUID): The id of the last book seen.
+
+        Returns:
+            str: The token to resume the feed after this position.
+        """
+        position = f"{updated_at.isoformat()}|{book_id}"
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    @staticmethod
+    def decode_changes_token(token: str) -> tuple[datetime, UUID]:
+        """
+        Decode a changes feed token.
+
+        Args:
+            token (str): A token returned by `encode_changes_token`.
+
+        Returns:
+            tuple[datetime, UUID]: The `updated_at` and id of the last book seen.
+
+        Raises:
+            InvalidChangesTokenException: If the token is malformed.
+        """
+        try:
+            updated_at, _, book_id = (
+                base64.urlsafe_b64decode(token.encode()).decode().partition("|")
+            )
+            return datetime.fromisoformat(updated_at), UUID(book_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise InvalidChangesTokenException(f"Invalid changes token {token}")
+
+    async def get_book_changes(
+        self, since: str | None, limit: int, session: AsyncSession
+    ) -> tuple[list[Book], str, bool]:
+        """
+        Retrieve the books created, updated or deleted after a feed position.
+
+        Books are returned in `(updated_at, id)` order, read through the matching
+        index, so the cost of a call depends on the number of changes and not on the
+        size of the catalogue. Deleted books are returned too, as tombstones, until
+        they are purged. Changes younger than `BOOK_CHANGES_LAG_SECONDS` are held
+        back, so that a write committing late can't land behind a position a client
+        has already moved past. When there is no change, the feed resumes from that
+        cutoff, so a client polling a quiet catalogue keeps a recent token. All the
+        timestamps of the feed come from the database clock.
+
+        Args:
+            since (str | None): The token of the last change seen, or None to start
+                from the beginning.
+            limit (int): The maximum number of changes to return.
+            session (AsyncSession): The database session.
 
         Returns:
-            Book | None: The book if found, otherwise None.
+            tuple[list[Book], str, bool]: The changed books, the token to resume the
+                feed from and whether more changes are available right away.
+
+        Raises:
+            InvalidChangesTokenException: If `since` is malformed.
+            ChangesTokenExpiredException: If `since` is older than the tombstone
+                retention, so deletions may have been missed.
         """
-        statement = select(Book).where(Book.id == book_id)
+        # A timestamp without time zone, like `updated_at`, so that it can be a token.
+        cutoff = func.localtimestamp() - timedelta(
+            seconds=settings.BOOK_CHANGES_LAG_SECONDS
+        )
+        statement = (
+            select(Book)
+            .options(raiseload(Book.reviews))
+            .where(Book.updated_at < cutoff)
+            .order_by(Book.updated_at, Book.id)
+            .limit(limit + 1)
+        )
+        if since is not None:
+            updated_at, book_id = self.decode_changes_token(since)
+            retention = timedelta(days=settings.BOOK_CHANGES_RETENTION_DAYS)
+            if updated_at < datetime.now() - retention:
+                raise ChangesTokenExpiredException(f"Changes token {since} expired")
+            statement = statement.where(
+                tuple_(Book.updated_at, Book.id) > tuple_(updated_at, book_id)
+            )
+
         results = await session.exec(statement)
-        return results.first()
+        books = results.all()
+        if books:
+            books, has_more = books[:limit], len(books) > limit
+            last = books[-1]
+            return books, self.encode_changes_token(last.updated_at, last.id), has_more
+
+        results = await session.exec(select(cutoff))
+        # Every book changed before the cutoff has been seen, whatever its id.
+        return [], self.encode_changes_token(results.one(), UUID(int=0)), False
 
     async def create_book(
         self, book_data: BookCreateModel, user_id: int, session: AsyncSession
@@ -95,47 +306,94 @@ class BookService:
         if user is None:
             raise UserNotFoundException(f"User {user_id} doesn't exist")
 
-        book = Book(**book_data.model_dump())
-        book.user_id = user_id
-
-        session.add(book)
+        # Stamped by the database, like updates and deletions, see `get_book_changes`.
+        statement = (
+            insert(Book)
+            .values(
+                **book_data.model_dump(),
+                user_id=user_id,
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            .returning(*Book.__table__.columns)
+        )
+        results = await session.exec(statement)
+        row = results.first()
         await session.commit()
 
-        return book
+        return Book(**row._mapping)
 
     async def update_book(
-        self, book_id: UUID, book_data: BookUpdateModel, session: AsyncSession
+        self,
+        book_id: UUID,
+        book_data: BookUpdateModel,
+        session: AsyncSession,
+        expected_version: int | None = None,
     ) -> Book:
         """
         Update an existing book's details.
 
+        The update is issued as a single `UPDATE ... RETURNING` statement, so the
+        book is never loaded into the session. `updated_at` is set by the database
+        and the book version is incremented on every successful update.
+
         Args:
             book_id (UUID): The unique identifier of the book to update.
             book_data (BookUpdateModel): The updated book data.
             session (AsyncSession): The database session.
+            expected_version (int | None): When given, the update only applies if the
+                stored version still matches (optimistic concurrency).
 
         Returns:
             Book: The updated book instance.
 
         Raises:
             BookNotFoundException: If the book does not exist.
+            BookVersionMismatchException: If the book exists but its version differs
+                from `expected_version`.
         """
-        book_to_update = await self.get_book(book_id, session)
+        statement = (
+            update(Book)
+            .where(Book.id == book_id, Book.deleted_at.is_(None))
+            .values(
+                **book_data.model_dump(),
+                updated_at=func.now(),
+                version=Book.version + 1,
+            )
+            .returning(*Book.__table__.columns)
+        )
+        if expected_version is not None:
+            statement = statement.where(Book.version == expected_version)
 
-        if book_to_update is None:
+        results = await session.exec(statement)
+        row = results.first()
+
+        if row is None:
+            if expected_version is not None and await self._book_exists(
+                book_id, session
+            ):
+                raise BookVersionMismatchException(
+                    f"Book {book_id} doesn't match version {expected_version}"
+                )
             raise BookNotFoundException(f"Book {book_id} doesn't exist")
 
-        for key, value in book_data.model_dump().items():
-            setattr(book_to_update, key, value)
-
-        session.add(book_to_update)
         await session.commit()
+        # Other workers evict it when notified of the commit.
+        book_cache.evict(str(book_id))
+        stale_book_cache.evict(str(book_id))
+        get_loaders(session).book.clear(book_id)
 
-        return book_to_update
+        return Book(**row._mapping)
 
     async def delete_book(self, book_id: UUID, session: AsyncSession) -> bool:
         """
-        Delete a book from the database.
+        Soft delete a book.
+
+        The book is marked as deleted with a single `UPDATE ... RETURNING` statement
+        and hidden from all queries but the changes feed, where it shows up as a
+        tombstone. It is removed for good, together with its reviews (through the
+        `ON DELETE CASCADE` rule of `review.book_id`), by `purge_deleted_rows` once it
+        has been deleted for long enough.
 
         Args:
             book_id (UUID): The unique identifier of the book to delete.
@@ -145,13 +403,121 @@ class BookService:
             bool: True if the book was successfully deleted.
 
         Raises:
-            BookNotFoundException: If the book does not exist.
+            BookNotFoundException: If the book does not exist or is already deleted.
         """
-        book_to_delete = await self.get_book(book_id, session)
+        statement = (
+            update(Book)
+            .where(Book.id == book_id, Book.deleted_at.is_(None))
+            .values(deleted_at=func.now(), updated_at=func.now())
+            .returning(Book.id)
+        )
 
-        if book_to_delete is None:
+        results = await session.exec(statement)
+        deleted_id = results.scalar_one_or_none()
+
+        if deleted_id is None:
             raise BookNotFoundException(f"Book {book_id} doesn't exist")
 
-        await session.delete(book_to_delete)
         await session.commit()
+        book_cache.evict(str(book_id))
+        stale_book_cache.evict(str(book_id))
+        get_loaders(session).book.clear(book_id)
         return True
+
+    @coalesce
+    async def _load_book(
+        self, book_id: UUID, session: AsyncSession, fields: list[str] | None
+    ) -> Book | dict | None:
+        """
+        Retrieve a book missing from the local book cache, see `get_book`.
+        """
+        if fields is not None:
+            return await self._get_book_fields(book_id, session, fields)
+
+        book = await get_loaders(session).book.load(book_id)
+        if book is not None:
+            # Shared with the concurrent callers, see `coalesce`.
+            for instance in [book, *book.reviews]:
+                if instance in session:
+                    session.expunge(instance)
+            book_cache.set(str(book_id), book)
+            stale_book_cache.set(str(book_id), book)
+        return book
+
+    async def _get_book_fields(
+        self, book_id: UUID, session: AsyncSession, fields: list[str]
+    ) -> dict | None:
+        """
+        Retrieve some fields of a book, without loading it as a `Book`.
+
+        Args:
+            book_id (UUID): The unique identifier of the book.
+            session (AsyncSession): The database session.
+            fields (list[str]): The fields to return, `reviews` included.
+
+        Returns:
+            dict | None: The fields and the version of the book if found and not
+                soft deleted, otherwise None.
+        """
+        columns = [field for field in fields if field != "reviews"]
+        statement = select(*self._columns(columns), Book.version).where(
+            Book.id == book_id, Book.deleted_at.is_(None)
+        )
+        results = await session.execute(statement)
+        row = results.first()
+        if row is None:
+            return None
+
+        book = row._asdict()
+        if "reviews" in fields:
+            statement = select(
+                *(getattr(Review, field) for field in ReviewModel.model_fields)
+            ).where(Review.book_id == book_id, Review.deleted_at.is_(None))
+            results = await session.execute(statement)
+            book["reviews"] = [review._asdict() for review in results.all()]
+        return book
+
+    @staticmethod
+    def _columns(fields: list[str] | None) -> list:
+        if fields is None:
+            return [Book]
+        return [getattr(Book, field) for field in fields]
+
+    @staticmethod
+    async def _fetch_books(
+        statement, fields: list[str] | None, session: AsyncSession
+    ) -> list[Book] | list[dict]:
+        if fields is None:
+            results = await session.exec(statement)
+            return results.all()
+        # Rows rather than scalars, even for a single column.
+        results = await session.execute(statement)
+        return [row._asdict() for row in results.all()]
+
+    @staticmethod
+    def _project(book: Book, fields: list[str]) -> dict:
+        projection = {
+            field: getattr(book, field) for field in fields if field != "reviews"
+        }
+        projection["version"] = book.version
+        if "reviews" in fields:
+            projection["reviews"] = [
+                review.model_dump(include=set(ReviewModel.model_fields))
+                for review in book.reviews
+            ]
+        return projection
+
+    async def _book_exists(self, book_id: UUID, session: AsyncSession) -> bool:
+        """
+        Check whether a book exists without loading it.
+
+        Args:
+            book_id (UUID): The unique identifier of the book.
+            session (AsyncSession): The database session.
+
+        Returns:
+            bool: True if the book exists and is not soft deleted, otherwise False.
+        """
+        statement = select(Book.id).where(Book.id == book_id, Book.deleted_at.is_(None))
+        results = await session.exec(statement)
+        return results.first() is not None
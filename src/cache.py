@@ -0,0 +1,140 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+from src.config import settings
+
+
+class LocalCache:
+    """
+    An in-process LRU cache of database entities, keyed by their id.
+
+    Entries expire after `ttl` seconds and the least recently used ones are dropped
+    beyond `max_size`. Every worker has its own copy, kept consistent with the other
+    workers by `CacheInvalidationListener`: the cache only serves entries while the
+    listener is connected, so it can't miss an invalidation. A `stale` cache serves
+    entries regardless, for when possibly outdated values beat no value at all.
+    """
+
+    def __init__(
+        self,
+        entity: str,
+        max_size: int = settings.LOCAL_CACHE_MAX_SIZE,
+        ttl: float = settings.LOCAL_CACHE_TTL_SECONDS,
+        stale: bool = False,
+    ) -> None:
+        self.entity = entity
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale = stale
+        self.enabled = stale
+        self._entries = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        """
+        Parameters:
+        - key (str): The id of the entity.
+
+        Returns:
+        - Any | None: The cached value, or None if it is missing, expired or the
+          cache is disabled.
+        """
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Caches a value, unless the cache is disabled.
+
+        Parameters:
+        - key (str): The id of the entity.
+        - value (Any): The value to cache.
+        """
+        if not self.enabled:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def evict(self, key: str) -> None:
+        """
+        Drops a cached value, if any.
+
+        Parameters:
+        - key (str): The id of the entity.
+        """
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Drops all cached values.
+        """
+        self._entries.clear()
+
+
+class LocalCaches:
+    """
+    The local caches of a worker, invalidated together by entity name.
+    """
+
+    def __init__(self) -> None:
+        self._caches: list[LocalCache] = []
+
+    def register(self, cache: LocalCache) -> LocalCache:
+        """
+        Parameters:
+        - cache (LocalCache): The cache to invalidate with the others.
+
+        Returns:
+        - LocalCache: The registered cache.
+        """
+        self._caches.append(cache)
+        return cache
+
+    def invalidate(self, entity: str, key: str) -> None:
+        """
+        Evicts an entity from every cache holding that kind of entity.
+
+        Parameters:
+        - entity (str): The entity name, e.g. `book`.
+        - key (str): The id of the entity.
+        """
+        for cache in self._caches:
+            if cache.entity == entity:
+                cache.evict(key)
+
+    def enable(self) -> None:
+        """
+        Starts serving cached values, once invalidations are received.
+        """
+        for cache in self._caches:
+            cache.enabled = True
+
+    def disable(self) -> None:
+        """
+        Stops serving and drops all cached values, while invalidations may be missed.
+        Stale caches keep serving theirs.
+        """
+        for cache in self._caches:
+            if cache.stale:
+                continue
+            cache.enabled = False
+            cache.clear()
+
+
+local_caches = LocalCaches()
+book_cache = local_caches.register(LocalCache("book"))
+# The last version of the books read by the worker, served while the database is down.
+stale_book_cache = local_caches.register(
+    LocalCache("book", ttl=settings.STALE_BOOK_TTL_SECONDS, stale=True)
+)
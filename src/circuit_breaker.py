@@ -0,0 +1,115 @@
+import math
+import time
+
+from src.app_logging import LoggingConfig
+from src.config import settings
+from src.exceptions import ServiceUnavailableException
+
+logger = LoggingConfig.get_logger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Fails calls to a dependency fast while it is unavailable.
+
+    The breaker is closed while calls succeed and opens after `failure_threshold`
+    consecutive failures: calls are then rejected without trying the dependency.
+    `reset_timeout` seconds later one trial call is let through, which closes the
+    breaker again if it succeeds or reopens it if it fails. Another trial is let
+    through if the first one doesn't report back within `reset_timeout` either.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = settings.CIRCUIT_BREAKER_RESET_SECONDS,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+
+    @property
+    def retry_after(self) -> int:
+        """
+        Returns:
+        - int: The seconds until the next trial call, at least 1.
+        """
+        elapsed = time.monotonic() - self._opened_at
+        return max(1, math.ceil(self.reset_timeout - elapsed))
+
+    def check(self, trial: bool = True) -> None:
+        """
+        Rejects a call while the breaker is open.
+
+        Parameters:
+        - trial (bool): Whether the call may be the trial call of the breaker. Calls
+          that can't tell whether the dependency is back, like opening a connection,
+          pass False: they are let through once a trial is due, without using it up.
+
+        Raises:
+        - ServiceUnavailableException: If the breaker is open.
+        """
+        if self.state == "closed":
+            return
+        now = time.monotonic()
+        if now - self._opened_at >= self.reset_timeout:
+            if trial:
+                self.state = "half_open"
+                self._opened_at = now
+            return
+        self.rejected += 1
+        raise ServiceUnavailableException(
+            f"The {self.name} circuit breaker is open",
+            retry_after=self.retry_after,
+        )
+
+    def record_success(self) -> None:
+        """
+        Closes the breaker after a successful call.
+        """
+        if self.state != "closed":
+            logger.info(f"The {self.name} circuit breaker is closed")
+            self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        """
+        Counts a failed call, opening the breaker after too many or a failed trial.
+        """
+        self.failures += 1
+        if self.state == "closed" and self.failures < self.failure_threshold:
+            return
+        if self.state == "closed":
+            logger.warning(
+                f"The {self.name} circuit breaker is open after {self.failures} failures"
+            )
+            self.opened += 1
+        self.state = "open"
+        self._opened_at = time.monotonic()
+
+    def metrics(self) -> dict:
+        """
+        Returns:
+        - dict: The state of the breaker, its consecutive failures, how many times it
+          opened and the calls it rejected.
+        """
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+database_breaker = CircuitBreaker("database")
+redis_breaker = CircuitBreaker("redis")
+# The circuit breakers of the worker, by name.
+circuit_breakers = {
+    breaker.name: breaker for breaker in (database_breaker, redis_breaker)
+}
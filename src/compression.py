@@ -0,0 +1,155 @@
+import asyncio
+import gzip
+import hashlib
+
+import brotli
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.cache import LocalCache
+from src.config import settings
+
+# Supported content codings, preferred first when a client accepts several equally.
+CODECS = {
+    "zstd": lambda body: zstandard.ZstdCompressor(level=3).compress(body),
+    "br": lambda body: brotli.compress(body, quality=5),
+    "gzip": lambda body: gzip.compress(body, compresslevel=6, mtime=0),
+}
+COMPRESSIBLE_TYPES = ("application/json", "application/msgpack", "text/")
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """
+    Picks the content coding of a response from the `Accept-Encoding` request header.
+
+    Parameters:
+    - accept_encoding (str): The `Accept-Encoding` header, e.g. `gzip, br;q=0.9`.
+
+    Returns:
+    - str | None: The supported coding with the highest quality value, ties going to
+      the first one in `CODECS`, or None if the client accepts none of them.
+    """
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+
+    encoding, best_quality = None, 0.0
+    for coding in CODECS:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            encoding, best_quality = coding, quality
+    return encoding
+
+
+class CompressionMiddleware:
+    """
+    Compresses response bodies with the best coding the client accepts.
+
+    Only complete bodies (not streamed ones) of compressible types and at least
+    `minimum_size` bytes are compressed. Bodies of `thread_minimum_size` bytes and
+    more are compressed in a thread, so that a large listing doesn't block the event
+    loop. Compressed bodies are cached by coding and content digest: a response
+    served again unchanged, e.g. a popular listing, costs a hash instead of a
+    compression. Since entries are looked up by content, they never go stale.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = settings.COMPRESSION_MINIMUM_SIZE,
+        thread_minimum_size: int = settings.COMPRESSION_THREAD_MINIMUM_SIZE,
+        cache_max_size: int = settings.COMPRESSION_CACHE_MAX_SIZE,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_minimum_size = thread_minimum_size
+        self.cache = LocalCache("compressed_body", max_size=cache_max_size)
+        self.cache.enabled = cache_max_size > 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            compressible = self.compressible(headers)
+            if compressible:
+                headers.add_vary_header("Accept-Encoding")
+            if (
+                not compressible
+                or message.get("more_body", False)
+                or len(body) < self.minimum_size
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            body = await self.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def compressible(headers: MutableHeaders) -> bool:
+        """
+        Parameters:
+        - headers (MutableHeaders): The response headers.
+
+        Returns:
+        - bool: Whether the response is of a compressible type and not encoded yet.
+        """
+        return "content-encoding" not in headers and headers.get(
+            "content-type", ""
+        ).startswith(COMPRESSIBLE_TYPES)
+
+    async def compress(self, body: bytes, encoding: str) -> bytes:
+        """
+        Parameters:
+        - body (bytes): The response body.
+        - encoding (str): The content coding, one of `CODECS`.
+
+        Returns:
+        - bytes: The compressed body, from the cache when it was compressed before.
+        """
+        key = f"{encoding}:{hashlib.blake2b(body, digest_size=16).hexdigest()}"
+        compressed = self.cache.get(key)
+        if compressed is not None:
+            return compressed
+
+        if len(body) >= self.thread_minimum_size:
+            compressed = await asyncio.to_thread(CODECS[encoding], body)
+        else:
+            compressed = CODECS[encoding](body)
+        self.cache.set(key, compressed)
+        return compressed
@@ -1,11 +1,79 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
     JWT_SECRET: str
+    # HS256 signs with JWT_SECRET. RS256 and EdDSA sign with the keys in JWT_KEYS_DIR
+    # (one `<kid>.pem` file per key), which are reloaded every JWT_KEYS_RELOAD_INTERVAL
+    # seconds; JWT_SIGNING_KID defaults to the last private key in kid order.
+    JWT_ALGORITHM: Literal["HS256", "RS256", "EdDSA"] = "HS256"
+    JWT_KEYS_DIR: str | None = None
+    JWT_SIGNING_KID: str | None = None
+    JWT_KEYS_RELOAD_INTERVAL: int = 60
     REDIS_HOST: str
     REDIS_PORT: int = 6379
+    # Connections to Redis fail after this long, so an unreachable Redis fails fast.
+    REDIS_CONNECT_TIMEOUT_SECONDS: float = 1
+    # `blocklist` checks every request's token ID against Redis, so a logout only
+    # revokes that token. `token_version` only compares the token version claim with a
+    # locally cached per-user version, and a logout revokes all sessions of the user.
+    TOKEN_REVOCATION_MODE: Literal["blocklist", "token_version"] = "blocklist"
+    # Whether tokens are accepted or answered with a 503 when Redis is unavailable to
+    # check their revocation. Tokens revoked through this worker are rejected anyway.
+    JTI_CHECK_FAILURE_POLICY: Literal["fail_open", "fail_closed"] = "fail_closed"
+    # Circuit breakers open after this many consecutive failures of the database or
+    # Redis, fail calls fast while open, and let a trial call through after a while.
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_BREAKER_RESET_SECONDS: float = 10
+    REVIEW_INGESTION_ASYNC: bool = False
+    REVIEW_INGESTION_IN_PROCESS_WORKER: bool = True
+    REVIEW_INGESTION_BATCH_SIZE: int = 500
+    REVIEW_INGESTION_FLUSH_INTERVAL_MS: int = 200
+    # Queued reviews failing on their own this many deliveries are dead lettered.
+    REVIEW_INGESTION_MAX_DELIVERIES: int = 5
+    # The book changes feed only returns changes at least this old, so that a write
+    # committed late (or stamped by a slightly skewed clock) isn't skipped by a client
+    # that already read past its timestamp.
+    BOOK_CHANGES_LAG_SECONDS: float = 5
+    # Soft deleted books are the tombstones of the changes feed, keep this in line with
+    # `db purge-deleted --older-than-days`. Older tokens have to resync from scratch.
+    BOOK_CHANGES_RETENTION_DAYS: int = 30
+    # Local caches are only used while the cache invalidation listener is connected.
+    CACHE_INVALIDATION_ENABLED: bool = True
+    LOCAL_CACHE_MAX_SIZE: int = 10_000
+    LOCAL_CACHE_TTL_SECONDS: float = 60
+    # Books are served stale, with a `Warning` header, for this long after they were
+    # last read while the database is unavailable.
+    STALE_BOOK_TTL_SECONDS: float = 3600
+    # Concurrent identical reads of coalesced service methods share one execution.
+    SINGLE_FLIGHT_ENABLED: bool = True
+    ADMISSION_CONTROL_ENABLED: bool = True
+    # Requests processed at the same time per worker, more requests are queued.
+    ADMISSION_MAX_IN_FLIGHT: int = 64
+    # How long a request may queue per priority class before it is shed with a 503.
+    ADMISSION_QUEUE_BUDGETS_MS: dict[str, int] = {
+        "critical": 5000,
+        "normal": 1000,
+        "low": 250,
+    }
+    COMPRESSION_ENABLED: bool = True
+    # Smaller bodies are sent uncompressed, larger ones are compressed in a thread.
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_THREAD_MINIMUM_SIZE: int = 64 * 1024
+    # Compressed bodies kept per worker, by content and coding, 0 disables the cache.
+    COMPRESSION_CACHE_MAX_SIZE: int = 256
+    RATE_LIMIT_ENABLED: bool = True
+    # Requests allowed per route, as `<count>/<second|minute|hour|day>`.
+    RATE_LIMITS: dict[str, str] = {
+        "login": "10/minute",
+        "signup": "5/minute",
+        "create_review": "30/minute",
+        # Charged per review, so it must allow a full batch.
+        "create_reviews": "300/minute",
+    }
 
 
 settings = Settings()
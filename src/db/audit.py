@@ -0,0 +1,210 @@
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import event, text
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.books.models import Book
+from src.books.schemas import BookUpdateModel
+from src.books.service import BookService
+from src.db.main import async_engine
+from src.reviews.schemas import ReviewBatchItemModel, ReviewCreateModel
+from src.reviews.service import ReviewService
+from src.users.models import User
+from src.users.service import UserService
+
+TABLE_SIZES_QUERY = text(
+    """
+    SELECT c.relname, GREATEST(c.reltuples, s.n_live_tup)::bigint
+    FROM pg_class c
+    JOIN pg_stat_user_tables s ON s.relid = c.oid
+    """
+)
+
+
+@dataclass
+class QueryAudit:
+    """The plan summary of one SQL statement issued by a service method."""
+
+    label: str
+    statement: str
+    seq_scans: dict[str, int] = field(default_factory=dict)
+
+
+class QueryRecorder:
+    """
+    Engine event listener recording the SQL statements issued while a label is set.
+    """
+
+    def __init__(self) -> None:
+        self.label = None
+        self.queries = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.label is None or executemany:
+            return
+        if statement.lstrip().split(" ", 1)[0].upper() in ("SAVEPOINT", "RELEASE"):
+            return
+        self.queries.append((self.label, statement, parameters))
+
+
+def find_seq_scans(plan: dict) -> set[str]:
+    """
+    Collects the relations read with a sequential scan anywhere in a plan tree.
+
+    Args:
+        plan (dict): A plan node from `EXPLAIN (FORMAT JSON)`.
+
+    Returns:
+        set[str]: The names of the sequentially scanned relations.
+    """
+    relations = set()
+    if plan.get("Node Type") == "Seq Scan":
+        relations.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        relations |= find_seq_scans(child)
+    return relations
+
+
+async def run_service_queries(session: AsyncSession, recorder: QueryRecorder) -> None:
+    """
+    Calls every database-backed service method once, against the first user and book.
+
+    Args:
+        session (AsyncSession): A session whose commits only release savepoints.
+        recorder (QueryRecorder): The recorder to label the issued statements with.
+
+    Raises:
+        RuntimeError: If there is no user or no book to run the service methods with.
+    """
+    user = (await session.exec(select(User).limit(1))).first()
+    book = (await session.exec(select(Book).limit(1))).first()
+    if user is None or book is None:
+        raise RuntimeError("The index audit needs at least one user and one book")
+
+    user_service = UserService()
+    book_service = BookService()
+    review_service = ReviewService()
+    review_data = ReviewCreateModel(text="index audit", rating=3)
+    service_calls = [
+        (
+            "UserService.get_user_by_email",
+            lambda: user_service.get_user_by_email(user.email, session),
+        ),
+        (
+            "UserService.get_user_by_id",
+            lambda: user_service.get_user_by_id(user.id, session),
+        ),
+        ("BookService.get_all_books", lambda: book_service.get_all_books(session)),
+        (
+            "BookService.get_user_books",
+            lambda: book_service.get_user_books(user.id, session),
+        ),
+        ("BookService.get_book", lambda: book_service.get_book(book.id, session)),
+        (
+            "BookService.update_book",
+            lambda: book_service.update_book(
+                book.id, BookUpdateModel(**book.model_dump()), session
+            ),
+        ),
+        (
+            "ReviewService.add_new_review",
+            lambda: review_service.add_new_review(
+                user.id, book.id, review_data, session
+            ),
+        ),
+        (
+            "ReviewService.add_new_reviews",
+            lambda: review_service.add_new_reviews(
+                user.id,
+                [ReviewBatchItemModel(**review_data.model_dump(), book_id=book.id)],
+                session,
+            ),
+        ),
+        (
+            "ReviewService.write_review_batch",
+            lambda: review_service.write_review_batch(
+                [
+                    {
+                        **review_data.model_dump(),
+                        "created_at": datetime.now(),
+                        "user_id": user.id,
+                        "book_id": book.id,
+                        "idempotency_key": "index-audit",
+                    }
+                ],
+                session,
+            ),
+        ),
+        ("BookService.delete_book", lambda: book_service.delete_book(book.id, session)),
+    ]
+
+    for label, call in service_calls:
+        recorder.label = label
+        try:
+            await call()
+        finally:
+            recorder.label = None
+
+
+async def audit_service_queries(min_rows: int) -> list[QueryAudit]:
+    """
+    Explains every query the services issue and flags sequential scans on large tables.
+
+    The service methods run for real, inside a transaction that is rolled back at the
+    end, so the audit leaves no trace in the database. Each captured statement is then
+    explained (without ANALYZE) with the parameters it was issued with.
+
+    Args:
+        min_rows (int): Sequential scans on tables with fewer (estimated) rows are
+            not flagged, since the planner rightly prefers them on small tables.
+
+    Returns:
+        list[QueryAudit]: One entry per distinct statement, in the order issued.
+    """
+    recorder = QueryRecorder()
+    audits = []
+
+    async with async_engine.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            event.listen(connection.sync_connection, "before_cursor_execute", recorder)
+            try:
+                async with AsyncSession(
+                    bind=connection,
+                    join_transaction_mode="create_savepoint",
+                    expire_on_commit=False,
+                ) as session:
+                    await run_service_queries(session, recorder)
+            finally:
+                event.remove(
+                    connection.sync_connection, "before_cursor_execute", recorder
+                )
+
+            table_sizes = dict((await connection.execute(TABLE_SIZES_QUERY)).all())
+
+            seen = set()
+            for label, statement, parameters in recorder.queries:
+                if (label, statement) in seen:
+                    continue
+                seen.add((label, statement))
+
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                )
+                plan = result.scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+
+                audit = QueryAudit(label=label, statement=statement)
+                for relation in sorted(find_seq_scans(plan[0]["Plan"])):
+                    rows = table_sizes.get(relation, 0)
+                    if rows >= min_rows:
+                        audit.seq_scans[relation] = rows
+                audits.append(audit)
+        finally:
+            await transaction.rollback()
+
+    return audits
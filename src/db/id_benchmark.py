@@ -0,0 +1,110 @@
+import time
+from typing import Callable, Iterator
+from uuid import UUID, uuid4
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.app_logging import LoggingConfig
+from src.db.ids import uuid7
+from src.db.main import async_engine
+
+logger = LoggingConfig.get_logger(__name__)
+
+ID_GENERATORS = {"uuid4": uuid4, "uuid7": uuid7}
+
+
+def generate_rows(generate_id: Callable[[], UUID], count: int) -> Iterator[tuple]:
+    for _ in range(count):
+        yield (generate_id(),)
+
+
+def summarize(batch_timings: list[tuple[int, float]], index_size: int) -> dict:
+    """
+    Summarizes the batch timings of one id version.
+
+    Args:
+        batch_timings (list[tuple[int, float]]): The row count and duration in
+            seconds of every batch, in insert order.
+        index_size (int): The size of the primary key index in bytes.
+
+    Returns:
+        dict: The benchmark results of one id version.
+    """
+    total_rows = sum(count for count, _ in batch_timings)
+    total_seconds = sum(seconds for _, seconds in batch_timings)
+
+    tail_rows, tail_seconds = 0, 0.0
+    for count, seconds in reversed(batch_timings):
+        if tail_rows >= total_rows / 10:
+            break
+        tail_rows += count
+        tail_seconds += seconds
+
+    return {
+        "rows": total_rows,
+        "seconds": round(total_seconds, 2),
+        "rows_per_second": round(total_rows / total_seconds) if total_seconds else 0,
+        "tail_rows_per_second": round(tail_rows / tail_seconds) if tail_seconds else 0,
+        "index_size_bytes": index_size,
+    }
+
+
+async def benchmark_id_inserts(
+    rows: int, batch_size: int, engine: AsyncEngine = async_engine
+) -> dict:
+    """
+    Compares the insert throughput of uuid4 and uuid7 primary keys.
+
+    For every id version, a scratch table with a UUID primary key (like `book`) is
+    filled with `rows` rows in COPY batches of `batch_size`, one transaction per
+    batch. Random uuid4 keys touch a random leaf page of the index per row, so once
+    the index outgrows shared buffers throughput drops and the index bloats with half
+    empty pages from splits; uuid7 keys only ever append to the rightmost leaf. The
+    scratch tables are dropped at the end.
+
+    Args:
+        rows (int): The number of rows to insert per id version.
+        batch_size (int): The number of rows per COPY batch.
+        engine (AsyncEngine): The engine of the database to benchmark on.
+
+    Returns:
+        dict: Per id version, the total time, the overall throughput, the throughput
+        of the last tenth of the rows and the final primary key index size.
+    """
+    results = {}
+    async with engine.connect() as connection:
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+
+        for name, generate_id in ID_GENERATORS.items():
+            table = f"id_benchmark_{name}"
+            await driver_connection.execute(f"DROP TABLE IF EXISTS {table}")
+            await driver_connection.execute(
+                f"CREATE TABLE {table} (id uuid PRIMARY KEY)"
+            )
+
+            logger.info(f"Inserting {rows} {name} keys")
+            batch_timings = []
+            inserted = 0
+            try:
+                while inserted < rows:
+                    count = min(batch_size, rows - inserted)
+                    start_time = time.perf_counter()
+                    async with driver_connection.transaction():
+                        await driver_connection.copy_records_to_table(
+                            table,
+                            records=generate_rows(generate_id, count),
+                            columns=["id"],
+                        )
+                    batch_timings.append((count, time.perf_counter() - start_time))
+                    inserted += count
+
+                index_size = await driver_connection.fetchval(
+                    f"SELECT pg_relation_size('{table}_pkey')"
+                )
+            finally:
+                await driver_connection.execute(f"DROP TABLE IF EXISTS {table}")
+
+            results[name] = summarize(batch_timings, index_size)
+
+    return results
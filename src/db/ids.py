@@ -0,0 +1,52 @@
+import os
+import threading
+import time
+from uuid import UUID
+
+# 74 bits follow the 48 bit timestamp (the 12 bit `rand_a` and the 62 bit `rand_b`
+# fields), they are used as one counter.
+COUNTER_BITS = 74
+COUNTER_MAX = (1 << COUNTER_BITS) - 1
+
+_lock = threading.Lock()
+_last_timestamp_ms = 0
+_last_counter = 0
+
+
+def uuid7() -> UUID:
+    """
+    Generates a UUID version 7 (RFC 9562): a millisecond Unix timestamp followed by
+    random bits.
+
+    Unlike uuid4, consecutive ids sort by creation time, so new rows are appended to
+    the right edge of a B-tree index instead of landing on a random leaf page. Ids
+    are monotonic within the process: the random bits of the first id of a
+    millisecond are used as a counter, which later ids of the same millisecond (or
+    of an earlier one, if the clock goes back) increase by a random step. The top
+    counter bit starts cleared, so it does not overflow in practice; if it does, the
+    timestamp is moved a millisecond ahead.
+
+    Returns:
+        UUID: The new id.
+    """
+    global _last_timestamp_ms, _last_counter
+
+    with _lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms > _last_timestamp_ms:
+            counter = int.from_bytes(os.urandom(10)) & (COUNTER_MAX >> 1)
+        else:
+            timestamp_ms = _last_timestamp_ms
+            counter = _last_counter + int.from_bytes(os.urandom(4)) + 1
+            if counter > COUNTER_MAX:
+                timestamp_ms += 1
+                counter = int.from_bytes(os.urandom(10)) & (COUNTER_MAX >> 1)
+        _last_timestamp_ms, _last_counter = timestamp_ms, counter
+
+    return UUID(
+        int=(timestamp_ms << 80)
+        | (0x7 << 76)
+        | ((counter >> 62) << 64)
+        | (0b10 << 62)
+        | (counter & ((1 << 62) - 1))
+    )
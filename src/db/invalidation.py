@@ -0,0 +1,180 @@
+import asyncio
+import json
+from datetime import timedelta
+
+import asyncpg
+from sqlalchemy import text
+
+from src.app_logging import LoggingConfig
+from src.cache import LocalCaches, local_caches
+from src.config import settings
+from src.db.main import async_session
+
+logger = LoggingConfig.get_logger(__name__)
+
+# The channel the `notify_cache_invalidation` trigger notifies on commit.
+CHANNEL = "cache_invalidation"
+# Longer than any transaction writing a cached table: an invalidation is stamped when
+# its row is written and only visible (and notified) once its transaction commits.
+BACKFILL_SLACK = timedelta(seconds=60)
+# How long rows are kept in the cache_invalidation table, see `purge_invalidations`.
+# A listener disconnected for longer drops its caches instead of backfilling.
+INVALIDATION_RETENTION = timedelta(days=1)
+HEARTBEAT_INTERVAL = 5
+RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 30
+
+
+def listener_dsn(database_url: str) -> str:
+    """
+    Args:
+        database_url (str): The SQLAlchemy database URL.
+
+    Returns:
+        str: The URL as accepted by `asyncpg.connect`.
+    """
+    return database_url.replace("+asyncpg", "", 1)
+
+
+class CacheInvalidationListener:
+    """
+    Evicts entities changed by any worker from the local caches of this worker.
+
+    Triggers on the cached tables write every change to the `cache_invalidation`
+    table and notify it on commit. The listener keeps a dedicated connection that
+    LISTENs for these notifications. Notifications sent while it is disconnected
+    are lost, so on every (re)connect it starts listening first, then replays the
+    invalidations written since its last heartbeat (minus `BACKFILL_SLACK`) from the
+    table, and only then lets the caches serve entries again. While disconnected,
+    the caches are disabled and empty.
+    """
+
+    def __init__(
+        self, dsn: str | None = None, caches: LocalCaches = local_caches
+    ) -> None:
+        self.dsn = dsn or listener_dsn(settings.DATABASE_URL)
+        self.caches = caches
+        # The database time of the last heartbeat, every invalidation committed
+        # before it has been received.
+        self.synced_at = None
+        self._stopped = asyncio.Event()
+
+    def stop(self) -> None:
+        """
+        Asks the listener to disconnect and exit.
+        """
+        self._stopped.set()
+
+    def handle_notification(
+        self, connection: asyncpg.Connection, pid: int, channel: str, payload: str
+    ) -> None:
+        """
+        Evicts the entity named by a notification from the local caches.
+
+        Args:
+            connection (asyncpg.Connection): The listening connection.
+            pid (int): The id of the notifying backend.
+            channel (str): The notification channel.
+            payload (str): The invalidation as JSON, with `entity` and `key`.
+        """
+        try:
+            invalidation = json.loads(payload)
+            self.caches.invalidate(invalidation["entity"], invalidation["key"])
+        except (ValueError, KeyError) as ex:
+            logger.error(f"Ignoring malformed cache invalidation {payload}: {ex}")
+
+    async def backfill(self, connection: asyncpg.Connection) -> int:
+        """
+        Replays the invalidations that may have been missed while disconnected.
+
+        Args:
+            connection (asyncpg.Connection): A connection already listening.
+
+        Returns:
+            int: The number of invalidations replayed, or -1 if the caches were
+                cleared instead because the missed invalidations are unknown.
+        """
+        expired = self.synced_at is None or await connection.fetchval(
+            "SELECT $1::timestamp < LOCALTIMESTAMP - $2::interval",
+            self.synced_at,
+            INVALIDATION_RETENTION,
+        )
+        if expired:
+            self.caches.disable()
+            return -1
+
+        rows = await connection.fetch(
+            "SELECT entity, key FROM cache_invalidation WHERE created_at >= $1",
+            self.synced_at - BACKFILL_SLACK,
+        )
+        for row in rows:
+            self.caches.invalidate(row["entity"], row["key"])
+        return len(rows)
+
+    async def listen(self) -> None:
+        """
+        Connects, catches up and listens until the connection fails or `stop` is
+        called.
+        """
+        connection = await asyncpg.connect(self.dsn)
+        try:
+            await connection.add_listener(CHANNEL, self.handle_notification)
+            replayed = await self.backfill(connection)
+            logger.info(
+                f"Listening for cache invalidations, {replayed} replayed"
+                if replayed >= 0
+                else "Listening for cache invalidations, caches cleared"
+            )
+            self.caches.enable()
+
+            while not self._stopped.is_set():
+                # Fails once the connection is lost.
+                self.synced_at = await connection.fetchval("SELECT LOCALTIMESTAMP")
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), HEARTBEAT_INTERVAL)
+                except TimeoutError:
+                    pass
+        finally:
+            self.caches.disable()
+            await connection.close(timeout=5)
+
+    async def run(self) -> None:
+        """
+        Listens until `stop` is called, reconnecting with backoff on failures.
+        """
+        delay = RECONNECT_DELAY
+        while not self._stopped.is_set():
+            try:
+                await self.listen()
+                delay = RECONNECT_DELAY
+            except Exception as ex:
+                logger.error(
+                    f"Cache invalidation listener failed, reconnecting in {delay}s: {ex}"
+                )
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), delay)
+                except TimeoutError:
+                    pass
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+
+async def purge_invalidations(retention: timedelta = INVALIDATION_RETENTION) -> int:
+    """
+    Deletes the invalidations older than `retention` from the cache_invalidation table.
+
+    Args:
+        retention (timedelta): How long invalidations are kept for backfills.
+
+    Returns:
+        int: The number of invalidations deleted.
+    """
+    async with async_session() as session:
+        results = await session.execute(
+            text(
+                "DELETE FROM cache_invalidation "
+                "WHERE created_at < LOCALTIMESTAMP - CAST(:retention AS interval)"
+            ),
+            {"retention": retention},
+        )
+        await session.commit()
+    return results.rowcount
@@ -1,5 +1,7 @@
 from typing import AsyncGenerator
 
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext
 from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql import text
@@ -7,19 +9,73 @@ from sqlmodel import create_engine
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.app_logging import LoggingConfig
+from src.circuit_breaker import database_breaker
 from src.config import settings
+from src.exceptions import ServiceUnavailableException
 
 logger = LoggingConfig.get_logger(__name__)
 
 async_engine = AsyncEngine(create_engine(url=settings.DATABASE_URL, echo=False))
 
 
-async def get_session() -> AsyncGenerator[AsyncSession]:
-    Session = sessionmaker(
-        bind=async_engine, class_=AsyncSession, expire_on_commit=False
+# The database circuit breaker: connecting and executing statements are rejected while
+# it is open, and unavailability errors are raised as `ServiceUnavailableException`.
+@event.listens_for(async_engine.sync_engine, "do_connect")
+def _check_breaker_on_connect(dialect, connection_record, cargs, cparams) -> None:
+    database_breaker.check(trial=False)
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _check_breaker_on_execute(*args) -> None:
+    database_breaker.check()
+
+
+@event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+def _record_database_success(*args) -> None:
+    database_breaker.record_success()
+
+
+@event.listens_for(async_engine.sync_engine, "handle_error")
+def _record_database_failure(context: ExceptionContext) -> None:
+    if not is_unavailable_error(context):
+        return
+    database_breaker.record_failure()
+    raise ServiceUnavailableException(
+        f"The database is unavailable: {context.original_exception!r}",
+        retry_after=database_breaker.retry_after,
     )
 
-    async with Session() as session:
+
+def is_unavailable_error(context: ExceptionContext) -> bool:
+    """
+    Tells errors of an unavailable database from errors of a statement.
+
+    Args:
+        context (ExceptionContext): The context of a database error.
+
+    Returns:
+        bool: True for lost connections, failed connection attempts and timeouts.
+    """
+    if context.is_disconnect:
+        return True
+    exception = context.original_exception
+    while exception is not None:
+        if isinstance(exception, (OSError, TimeoutError)):
+            return True
+        exception = exception.__cause__
+    return False
+
+
+async_session = sessionmaker(
+    bind=async_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+
+async def get_session() -> AsyncGenerator[AsyncSession]:
+    # Routes depend on this with `scope="function"`, so the session is closed, and its
+    # connection returned to the pool, as soon as the route function returns rather
+    # than after the response has been serialised and sent.
+    async with async_session() as session:
         yield session
 
 
@@ -0,0 +1,96 @@
+from datetime import date
+
+from sqlalchemy import text
+
+from src.app_logging import LoggingConfig
+from src.db.main import async_session
+
+logger = LoggingConfig.get_logger(__name__)
+
+# Tables partitioned by month on `created_at`.
+PARTITIONED_TABLES = ("review",)
+
+
+def add_months(month: date, count: int) -> date:
+    """
+    Args:
+        month (date): The first day of a month.
+        count (int): The number of months to move ahead.
+
+    Returns:
+        date: The first day of the month `count` months after `month`.
+    """
+    year, month_index = divmod(month.month - 1 + count, 12)
+    return date(month.year + year, month_index + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """
+    Returns:
+        str: The name of the partition of `table` holding the rows of `month`,
+        e.g. `review_2026_10`.
+    """
+    return f"{table}_{month:%Y_%m}"
+
+
+def create_partition_statement(table: str, month: date) -> str:
+    """
+    Returns:
+        str: The statement creating the partition of `table` for `month`, unless it
+        already exists.
+    """
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} "
+        f"PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+    )
+
+
+async def create_partitions(
+    table: str, months_ahead: int, today: date | None = None
+) -> list[str]:
+    """
+    Creates the missing monthly partitions of `table`, from the current month up to
+    `months_ahead` months ahead.
+
+    There is no default partition, so inserting a row for a month without a partition
+    fails: this has to run well before the last partition created is reached, e.g.
+    daily from cron. Creating a partition briefly locks the parent table exclusively,
+    so the lock is only waited for up to a few seconds rather than queueing every
+    query on the table behind a long running transaction.
+
+    Args:
+        table (str): The partitioned table.
+        months_ahead (int): The number of months after the current one to cover.
+        today (date | None): The current date, today by default.
+
+    Returns:
+        list[str]: The names of the partitions created.
+    """
+    current_month = (today or date.today()).replace(day=1)
+    created = []
+
+    async with async_session() as session:
+        results = await session.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = CAST(:table AS regclass)"
+            ),
+            {"table": table},
+        )
+        existing = set(results.scalars().all())
+
+        for offset in range(months_ahead + 1):
+            month = add_months(current_month, offset)
+            name = partition_name(table, month)
+            if name in existing:
+                continue
+
+            await session.execute(text("SET LOCAL lock_timeout = '5s'"))
+            await session.execute(text(create_partition_statement(table, month)))
+            await session.commit()
+            logger.info(f"Created partition {name}")
+            created.append(name)
+
+    return created
@@ -0,0 +1,164 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from sqlalchemy import delete
+from sqlmodel import SQLModel, select
+
+from src.app_logging import LoggingConfig
+from src.books.models import Book
+from src.db.main import async_session
+from src.reviews.models import Review
+
+logger = LoggingConfig.get_logger(__name__)
+
+
+async def delete_batch(
+    model: type[SQLModel], condition, batch_size: int, order_by=None
+) -> int:
+    """
+    Hard deletes one batch of rows matching `condition`, in its own transaction.
+
+    Rows locked by other transactions are skipped rather than waited for, and the
+    batch is kept small so the row locks it takes are short lived.
+
+    Args:
+        model (type[SQLModel]): The model of the rows to delete.
+        condition: The filter selecting the rows to delete.
+        batch_size (int): The maximum number of rows to delete.
+        order_by: When given, the rows to delete first.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    batch = (
+        select(model.id)
+        .where(condition)
+        .order_by(order_by)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    statement = delete(model).where(model.id.in_(batch.scalar_subquery()))
+
+    async with async_session() as session:
+        results = await session.exec(statement)
+        await session.commit()
+
+    return results.rowcount
+
+
+async def purge_batch(model: type[SQLModel], cutoff: datetime, batch_size: int) -> int:
+    """
+    Hard deletes one batch of rows soft deleted before `cutoff`, see `delete_batch`.
+
+    Args:
+        model (type[SQLModel]): The soft deletable model, `Book` or `Review`.
+        cutoff (datetime): Only rows deleted before this point in time are purged.
+        batch_size (int): The maximum number of rows to delete.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    return await delete_batch(
+        model, model.deleted_at < cutoff, batch_size, order_by=model.deleted_at
+    )
+
+
+async def delete_in_batches(
+    delete_one_batch: Callable[[], Awaitable[int]],
+    batch_size: int,
+    pause: float,
+    label: str,
+) -> int:
+    """
+    Deletes batches of rows until one comes back short, pausing between batches so
+    the deletes don't compete with the application for locks and I/O.
+
+    Args:
+        delete_one_batch (Callable[[], Awaitable[int]]): Deletes one batch of at most
+            `batch_size` rows and returns the number of rows deleted.
+        batch_size (int): The maximum number of rows deleted per batch.
+        pause (float): The number of seconds to wait between two batches.
+        label (str): What is deleted, for the progress logs.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    deleted = 0
+    while True:
+        batch_deleted = await delete_one_batch()
+        deleted += batch_deleted
+        if batch_deleted < batch_size:
+            return deleted
+        logger.info(f"Purged {deleted} {label}")
+        await asyncio.sleep(pause)
+
+
+async def purge_deleted_rows(
+    older_than: timedelta, batch_size: int, pause: float
+) -> dict:
+    """
+    Hard deletes reviews and books that were soft deleted more than `older_than` ago.
+
+    Rows are deleted in batches until none are left, see `delete_in_batches`.
+    Soft deleted reviews are purged first, then the remaining reviews of the books
+    to purge, and the books last. That way the `ON DELETE CASCADE` rule has no
+    reviews left to delete with a batch of books, and no batch deletes more than
+    `batch_size` rows however many reviews a book has.
+
+    Args:
+        older_than (timedelta): How long rows stay soft deleted before being purged.
+        batch_size (int): The maximum number of rows deleted per transaction.
+        pause (float): The number of seconds to wait between two batches.
+
+    Returns:
+        dict: The number of purged rows per table.
+    """
+    cutoff = datetime.now() - older_than
+    purged = {}
+
+    purged["review"] = await delete_in_batches(
+        lambda: purge_batch(Review, cutoff, batch_size),
+        batch_size,
+        pause,
+        "soft deleted rows from review",
+    )
+    books_to_purge = select(Book.id).where(Book.deleted_at < cutoff)
+    purged["review"] += await delete_in_batches(
+        lambda: delete_batch(
+            Review, Review.book_id.in_(books_to_purge.scalar_subquery()), batch_size
+        ),
+        batch_size,
+        pause,
+        "reviews of soft deleted books",
+    )
+    purged["book"] = await delete_in_batches(
+        lambda: purge_batch(Book, cutoff, batch_size),
+        batch_size,
+        pause,
+        "soft deleted rows from book",
+    )
+
+    return purged
+
+
+async def purge_orphan_reviews(batch_size: int, pause: float) -> int:
+    """
+    Hard deletes the reviews without a book.
+
+    Before reviews were deleted with their book by `ON DELETE CASCADE`, deleting a
+    book detached its reviews, leaving them with a NULL `book_id`.
+
+    Args:
+        batch_size (int): The maximum number of rows deleted per transaction.
+        pause (float): The number of seconds to wait between two batches.
+
+    Returns:
+        int: The number of reviews deleted.
+    """
+    return await delete_in_batches(
+        lambda: delete_batch(Review, Review.book_id.is_(None), batch_size),
+        batch_size,
+        pause,
+        "reviews without a book",
+    )
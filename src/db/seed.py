@@ -0,0 +1,262 @@
+import random
+from datetime import date, datetime, timedelta
+from typing import Iterator
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.app_logging import LoggingConfig
+from src.db.ids import uuid7
+from src.db.main import async_engine
+from src.db.partitions import add_months, create_partition_statement
+from src.users.domains import UserProfile
+
+logger = LoggingConfig.get_logger(__name__)
+
+SEED_PASSWORD = "Bookhive1234"
+SEED_EMAIL_TEMPLATE = "seed.user.{}@bookhive.test"
+SEED_HISTORY = timedelta(days=2 * 365)
+
+LANGUAGES = ["English", "German", "French", "Spanish", "Arabic", "Japanese"]
+WORDS = [
+    "shadow",
+    "river",
+    "garden",
+    "silent",
+    "empire",
+    "winter",
+    "glass",
+    "hive",
+    "paper",
+    "storm",
+    "ember",
+    "harbor",
+    "orchard",
+    "lantern",
+    "compass",
+    "atlas",
+]
+REVIEW_TEXTS = [
+    "Couldn't put it down.",
+    "Slow start, strong finish.",
+    "Not my cup of tea.",
+    "A must read.",
+    "Overrated, honestly.",
+    "Beautifully written.",
+]
+
+
+def reviews_per_book(
+    book_count: int, mean: float, distribution: str, rng: random.Random
+) -> list[int]:
+    """
+    Decides how many reviews each book gets.
+
+    With `zipf`, the i-th book gets a share proportional to 1 / i, so a few books
+    collect most reviews while the long tail gets none or one, like a real catalogue.
+    With `uniform`, every book gets about `mean` reviews. Fractional counts are
+    rounded randomly so the total stays close to `book_count * mean`.
+
+    Args:
+        book_count (int): The number of books.
+        mean (float): The average number of reviews per book.
+        distribution (str): Either `zipf` or `uniform`.
+        rng (random.Random): The random generator to use.
+
+    Returns:
+        list[int]: The number of reviews for each book, in book order.
+    """
+    if distribution == "zipf":
+        weights = [1 / rank for rank in range(1, book_count + 1)]
+    else:
+        weights = [1.0] * book_count
+
+    scale = book_count * mean / sum(weights)
+    counts = []
+    for weight in weights:
+        expected = weight * scale
+        count = int(expected)
+        if rng.random() < expected - count:
+            count += 1
+        counts.append(count)
+    return counts
+
+
+def random_timestamp(rng: random.Random, now: datetime) -> datetime:
+    """Returns a random point in time within `SEED_HISTORY` before `now`."""
+    return now - timedelta(seconds=rng.randrange(int(SEED_HISTORY.total_seconds())))
+
+
+def generate_users(first_id: int, count: int, rng: random.Random) -> Iterator[tuple]:
+    password_hash = UserProfile.hash_password(SEED_PASSWORD)
+    now = datetime.now()
+    for id in range(first_id, first_id + count):
+        created_at = random_timestamp(rng, now)
+        yield (
+            id,
+            f"seed{id}",
+            SEED_EMAIL_TEMPLATE.format(id),
+            rng.choice(WORDS).title(),
+            rng.choice(WORDS).title(),
+            password_hash,
+            rng.random() < 0.8,
+            "user",
+            created_at,
+            created_at,
+        )
+
+
+def generate_books(
+    book_ids: list[UUID], user_ids: range, rng: random.Random
+) -> Iterator[tuple]:
+    now = datetime.now()
+    for book_id in book_ids:
+        created_at = random_timestamp(rng, now)
+        yield (
+            book_id,
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title(),
+            f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}",
+            f"{rng.choice(WORDS).title()} Press",
+            date(1950, 1, 1) + timedelta(days=rng.randrange(365 * 75)),
+            rng.randint(40, 1200),
+            rng.choice(LANGUAGES),
+            created_at,
+            created_at,
+            rng.choice(user_ids),
+        )
+
+
+def generate_reviews(
+    book_ids: list[UUID], counts: list[int], user_ids: range, rng: random.Random
+) -> Iterator[tuple]:
+    now = datetime.now()
+    for book_id, count in zip(book_ids, counts):
+        for _ in range(count):
+            yield (
+                rng.choice(REVIEW_TEXTS),
+                rng.randint(0, 4),
+                random_timestamp(rng, now),
+                rng.choice(user_ids),
+                book_id,
+            )
+
+
+async def seed_database(
+    users: int,
+    books: int,
+    reviews_per_book_mean: float,
+    distribution: str,
+    seed: int | None = None,
+    engine: AsyncEngine = async_engine,
+) -> dict:
+    """
+    Bulk loads synthetic users, books and reviews with COPY.
+
+    Everything is written in one transaction on top of the existing data. User ids
+    are allocated after the current maximum and the id sequence is moved past them.
+    All seeded users share the password `SEED_PASSWORD` and have emails built from
+    `SEED_EMAIL_TEMPLATE` with their id. Missing review partitions for the seeded
+    history are created. Book rating aggregates are recomputed at the end.
+
+    Args:
+        users (int): The number of users to create.
+        books (int): The number of books to create.
+        reviews_per_book_mean (float): The average number of reviews per book.
+        distribution (str): How reviews are spread over books, `zipf` or `uniform`.
+        seed (int | None): Seed for the random generator, for reproducible data.
+        engine (AsyncEngine): The engine of the database to seed.
+
+    Returns:
+        dict: The number of rows written per table and the first seeded user id.
+    """
+    rng = random.Random(seed)
+
+    async with engine.connect() as connection:
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+
+        async with driver_connection.transaction():
+            max_user_id = await driver_connection.fetchval(
+                'SELECT COALESCE(MAX(id), 0) FROM "user"'
+            )
+            user_ids = range(max_user_id + 1, max_user_id + 1 + users)
+
+            logger.info(f"Seeding {users} users")
+            await driver_connection.copy_records_to_table(
+                "user",
+                records=generate_users(user_ids.start, users, rng),
+                columns=[
+                    "id",
+                    "username",
+                    "email",
+                    "first_name",
+                    "last_name",
+                    "password_hash",
+                    "is_verified",
+                    "role",
+                    "created_at",
+                    "updated_at",
+                ],
+            )
+            await driver_connection.execute(
+                "SELECT setval('user_id_seq', $1)", user_ids.stop - 1
+            )
+
+            logger.info(f"Seeding {books} books")
+            book_ids = [uuid7() for _ in range(books)]
+            await driver_connection.copy_records_to_table(
+                "book",
+                records=generate_books(book_ids, user_ids, rng),
+                columns=[
+                    "id",
+                    "title",
+                    "author",
+                    "publisher",
+                    "published_date",
+                    "page_count",
+                    "language",
+                    "created_at",
+                    "updated_at",
+                    "user_id",
+                ],
+            )
+
+            # Reviews are spread over SEED_HISTORY, older than the partitions kept ahead.
+            month = (datetime.now() - SEED_HISTORY).date().replace(day=1)
+            while month <= date.today():
+                await driver_connection.execute(
+                    create_partition_statement("review", month)
+                )
+                month = add_months(month, 1)
+
+            counts = reviews_per_book(books, reviews_per_book_mean, distribution, rng)
+            logger.info(f"Seeding {sum(counts)} reviews ({distribution})")
+            await driver_connection.copy_records_to_table(
+                "review",
+                records=generate_reviews(book_ids, counts, user_ids, rng),
+                columns=["text", "rating", "created_at", "user_id", "book_id"],
+            )
+
+            logger.info("Recomputing book rating aggregates")
+            await driver_connection.execute(
+                """
+                UPDATE book
+                SET review_count = totals.review_count, rating_sum = totals.rating_sum
+                FROM (
+                    SELECT book_id, count(*) AS review_count, sum(rating) AS rating_sum
+                    FROM review
+                    GROUP BY book_id
+                ) AS totals
+                WHERE book.id = totals.book_id
+                """
+            )
+
+        # Outside of the transaction block, so the fresh statistics are kept.
+        await driver_connection.execute("ANALYZE")
+
+    return {
+        "users": users,
+        "books": books,
+        "reviews": sum(counts),
+        "first_user_id": user_ids.start,
+    }
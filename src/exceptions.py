@@ -31,3 +31,35 @@ class BookNotFoundException(BookHiveException):
     """Raised when a book is not found."""
 
     pass
+
+
+class BookVersionMismatchException(BookHiveException):
+    """Raised when a book was modified since the version the client expected."""
+
+    pass
+
+
+class InvalidChangesTokenException(BookHiveException):
+    """Raised when a book changes feed token cannot be decoded."""
+
+    pass
+
+
+class ChangesTokenExpiredException(BookHiveException):
+    """Raised when a book changes feed token is older than the tombstone retention."""
+
+    pass
+
+
+class RequestShedException(BookHiveException):
+    """Raised when a request waited longer than its queue time budget for a slot."""
+
+    pass
+
+
+class ServiceUnavailableException(BookHiveException):
+    """Raised when the database or Redis is unavailable, or its circuit breaker is open."""
+
+    def __init__(self, message: str, retry_after: int = 1) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
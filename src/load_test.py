@@ -0,0 +1,232 @@
+import asyncio
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import httpx
+
+from src.app_logging import LoggingConfig
+
+logger = LoggingConfig.get_logger(__name__)
+
+PERCENTILES = [50, 90, 95, 99]
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    Args:
+        sorted_values (list[float]): The values, sorted ascending.
+        percent (float): The percentile to compute, between 0 and 100.
+
+    Returns:
+        float: The percentile value, or 0.0 for an empty list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(percent / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LoadTestRecorder:
+    """
+    Collects latencies and failures per scenario step.
+    """
+
+    def __init__(self) -> None:
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        step: str,
+        method: str,
+        url: str,
+        expected_statuses: tuple[int, ...] = (200,),
+        **kwargs,
+    ) -> httpx.Response | None:
+        """
+        Sends a request and records its latency under `step`.
+
+        Returns:
+            httpx.Response | None: The response, or None if the request failed or
+            returned an unexpected status code.
+        """
+        start_time = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as ex:
+            logger.warning(f"{step} failed: {ex}")
+            self.errors[step] += 1
+            return None
+        finally:
+            self.latencies[step].append(time.perf_counter() - start_time)
+
+        if response.status_code not in expected_statuses:
+            self.errors[step] += 1
+            return None
+        return response
+
+    def report(self, duration: float) -> dict:
+        """
+        Summarises throughput and latency percentiles (in milliseconds) per step.
+
+        Args:
+            duration (float): The wall-clock duration of the run in seconds.
+
+        Returns:
+            dict: The per-step and overall statistics.
+        """
+        steps = {}
+        for step, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            steps[step] = {
+                "requests": len(latencies),
+                "errors": self.errors[step],
+                "throughput_rps": round(len(latencies) / duration, 2),
+                "latency_ms": {
+                    **{
+                        f"p{percent}": round(percentile(latencies, percent) * 1000, 2)
+                        for percent in PERCENTILES
+                    },
+                    "max": round(latencies[-1] * 1000, 2),
+                },
+            }
+
+        total_requests = sum(step["requests"] for step in steps.values())
+        return {
+            "duration_s": round(duration, 2),
+            "requests": total_requests,
+            "errors": sum(self.errors.values()),
+            "throughput_rps": round(total_requests / duration, 2),
+            "steps": steps,
+        }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    recorder: LoadTestRecorder,
+    email: str,
+    password: str,
+    deadline: float,
+    rng: random.Random,
+) -> None:
+    """
+    Runs the scenario for one virtual user in a loop until `deadline`.
+
+    Each iteration logs in, browses the book listings, views a book, posts a review
+    for it and finally revokes its access token.
+    """
+    while time.monotonic() < deadline:
+        response = await recorder.request(
+            client,
+            "login",
+            "POST",
+            "/api/users/auth/token",
+            json={"email": email, "password": password},
+        )
+        if response is None:
+            await asyncio.sleep(1)
+            continue
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        books = await recorder.request(
+            client, "browse_books", "GET", "/api/books/", headers=headers
+        )
+        await recorder.request(
+            client,
+            "browse_own_books",
+            "GET",
+            "/api/books/current-user",
+            headers=headers,
+        )
+
+        if books is not None and books.json():
+            book_id = rng.choice(books.json())["id"]
+            await recorder.request(
+                client,
+                "view_book",
+                "GET",
+                f"/api/books/get-book/{book_id}",
+                headers=headers,
+            )
+            await recorder.request(
+                client,
+                "post_review",
+                "POST",
+                f"/api/reviews/create-review/{book_id}",
+                expected_statuses=(201, 202),
+                headers=headers,
+                json={"text": "Load test review", "rating": rng.randint(0, 4)},
+            )
+
+        await recorder.request(
+            client, "revoke", "GET", "/api/users/auth/token/revoke", headers=headers
+        )
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_load_test(
+    base_url: str,
+    emails: list[str],
+    password: str,
+    duration: float,
+    seed: int | None = None,
+) -> dict:
+    """
+    Runs one virtual user per email against a running app for `duration` seconds.
+
+    Args:
+        base_url (str): The base URL of the app, e.g. `http://localhost:8000`.
+        emails (list[str]): The accounts to log in with, one per virtual user.
+        password (str): The password shared by the accounts.
+        duration (float): How long to generate load, in seconds.
+        seed (int | None): Seed for the random choices of the virtual users.
+
+    Returns:
+        dict: The JSON-serialisable report.
+    """
+    recorder = LoadTestRecorder()
+    rng = random.Random(seed)
+    started_at = datetime.now(timezone.utc)
+    limits = httpx.Limits(max_connections=len(emails))
+
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=30
+    ) as client:
+        start_time = time.monotonic()
+        deadline = start_time + duration
+        await asyncio.gather(
+            *(
+                run_scenario(
+                    client,
+                    recorder,
+                    email,
+                    password,
+                    deadline,
+                    random.Random(rng.random()),
+                )
+                for email in emails
+            )
+        )
+        elapsed = time.monotonic() - start_time
+
+    return {
+        "started_at": started_at.isoformat(),
+        "commit": current_commit(),
+        "base_url": base_url,
+        "virtual_users": len(emails),
+        **recorder.report(elapsed),
+    }
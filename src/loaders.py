@@ -0,0 +1,163 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import any_, literal
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.books.models import Book
+from src.users.models import User
+
+
+class DataLoader:
+    """
+    Coalesces the lookups of one kind of entity into batched queries.
+
+    Keys requested in the same iteration of the event loop, e.g. from coroutines
+    gathered together, are fetched with one call of `batch_load`. Results are
+    memoised, so a key is only fetched once for the lifetime of the loader; missing
+    entities are memoised as None.
+    """
+
+    def __init__(
+        self,
+        batch_load: Callable[[list], Awaitable[dict]],
+        lock: asyncio.Lock | None = None,
+    ) -> None:
+        self.batch_load = batch_load
+        # Shared by the loaders of a session, which can only run one query at a time.
+        self.lock = lock or asyncio.Lock()
+        self._futures: dict[Hashable, asyncio.Future] = {}
+        self._queue: list[Hashable] = []
+        self._dispatches: set[asyncio.Task] = set()
+
+    def load(self, key: Hashable) -> Awaitable[Any]:
+        """
+        Parameters:
+        - key (Hashable): The key of the entity.
+
+        Returns:
+        - Awaitable[Any]: The entity, or None if it doesn't exist.
+        """
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._futures[key] = loop.create_future()
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                # Let the other ready coroutines queue their keys first.
+                loop.call_soon(self._start_dispatch)
+        return future
+
+    async def load_many(self, keys: list[Hashable]) -> list[Any]:
+        """
+        Parameters:
+        - keys (list[Hashable]): The keys of the entities.
+
+        Returns:
+        - list[Any]: The entities in the order of `keys`, None for missing ones.
+        """
+        return await asyncio.gather(*(self.load(key) for key in keys))
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """
+        Memoises an entity obtained otherwise, unless its key is already loaded.
+
+        Parameters:
+        - key (Hashable): The key of the entity.
+        - value (Any): The entity.
+        """
+        if key not in self._futures:
+            future = self._futures[key] = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+
+    def clear(self, key: Hashable) -> None:
+        """
+        Forgets a memoised entity, e.g. after changing it.
+
+        Parameters:
+        - key (Hashable): The key of the entity.
+        """
+        self._futures.pop(key, None)
+
+    def _start_dispatch(self) -> None:
+        task = asyncio.ensure_future(self._dispatch())
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        futures = [self._futures[key] for key in keys]
+        try:
+            async with self.lock:
+                values = await self.batch_load(keys)
+        except Exception as ex:
+            for key, future in zip(keys, futures):
+                # Failed lookups are retried by the next load.
+                if self._futures.get(key) is future:
+                    del self._futures[key]
+                future.set_exception(ex)
+            return
+        for key, future in zip(keys, futures):
+            if not future.done():
+                future.set_result(values.get(key))
+
+
+class Loaders:
+    """
+    The data loaders of a database session.
+
+    Routes get one session per request, shared by all their dependencies, so the
+    loaders of a session memoise lookups for the lifetime of a request.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        lock = asyncio.Lock()
+        self.user_by_id = DataLoader(self._load_users_by_id, lock)
+        self.user_by_email = DataLoader(self._load_users_by_email, lock)
+        self.book = DataLoader(self._load_books, lock)
+
+    async def _load_users_by_id(self, ids: list[int]) -> dict[int, User]:
+        statement = select(User).where(
+            User.id == any_(literal(ids, pg.ARRAY(pg.INTEGER)))
+        )
+        results = await self.session.exec(statement)
+        users = {user.id: user for user in results.all()}
+        for user in users.values():
+            self.user_by_email.prime(user.email, user)
+        return users
+
+    async def _load_users_by_email(self, emails: list[str]) -> dict[str, User]:
+        statement = select(User).where(
+            User.email == any_(literal(emails, pg.ARRAY(pg.VARCHAR)))
+        )
+        results = await self.session.exec(statement)
+        # Emails match exactly, like the unique index on them.
+        users = {user.email: user for user in results.all()}
+        for user in users.values():
+            self.user_by_id.prime(user.id, user)
+        return users
+
+    async def _load_books(self, ids: list) -> dict:
+        statement = select(Book).where(
+            Book.id == any_(literal(ids, pg.ARRAY(pg.UUID))),
+            Book.deleted_at.is_(None),
+        )
+        results = await self.session.exec(statement)
+        return {book.id: book for book in results.all()}
+
+
+def get_loaders(session: AsyncSession) -> Loaders:
+    """
+    Parameters:
+    - session (AsyncSession): The database session.
+
+    Returns:
+    - Loaders: The data loaders of the session, created on first use.
+    """
+    loaders = session.info.get("loaders")
+    if loaders is None:
+        loaders = session.info["loaders"] = Loaders(session)
+    return loaders
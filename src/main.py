@@ -1,14 +1,24 @@
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Request, Response
 from fastapi.exceptions import HTTPException
+from fastapi.responses import JSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from src.admission import admission_controller
 from src.app_logging import LoggingConfig
 from src.books.routes import book_router
+from src.circuit_breaker import circuit_breakers
+from src.config import settings
+from src.db.invalidation import CacheInvalidationListener
 from src.db.main import check_db_connection, get_session
+from src.exceptions import ServiceUnavailableException
 from src.middleware import register_middleware
+from src.reviews.ingestion import ReviewIngestionWorker
 from src.reviews.routes import review_router
+from src.singleflight import single_flights
+from src.users.keyring import keyring
 from src.users.routes import user_router
 
 logger = LoggingConfig.get_logger(__name__)
@@ -17,7 +27,25 @@ logger = LoggingConfig.get_logger(__name__)
 @asynccontextmanager
 async def life_span(app: FastAPI):
     logger.info("Server is starting")
+
+    review_worker_task = None
+    if settings.REVIEW_INGESTION_ASYNC and settings.REVIEW_INGESTION_IN_PROCESS_WORKER:
+        review_worker = ReviewIngestionWorker()
+        review_worker_task = asyncio.create_task(review_worker.run())
+
+    invalidation_listener_task = None
+    if settings.CACHE_INVALIDATION_ENABLED:
+        invalidation_listener = CacheInvalidationListener()
+        invalidation_listener_task = asyncio.create_task(invalidation_listener.run())
+
     yield
+
+    if invalidation_listener_task is not None:
+        invalidation_listener.stop()
+        await invalidation_listener_task
+    if review_worker_task is not None:
+        review_worker.stop()
+        await review_worker_task
     logger.info("Server has stopped")
 
 
@@ -32,8 +60,27 @@ app.include_router(user_router, prefix="/api/users", tags=["Users"])
 app.include_router(review_router, prefix="/api/reviews", tags=["Reviews"])
 
 
+@app.exception_handler(ServiceUnavailableException)
+async def service_unavailable(
+    request: Request, ex: ServiceUnavailableException
+) -> JSONResponse:
+    """
+    Answers requests failed by an unavailable database or Redis with a 503.
+
+    Returns:
+        JSONResponse: A 503 with a `Retry-After` header, in seconds until the circuit
+        breaker of the unavailable dependency lets a call through again.
+    """
+    logger.warning(f"{request.method} - {request.url.path} - {ex}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service is temporarily unavailable, please retry later"},
+        headers={"Retry-After": str(ex.retry_after)},
+    )
+
+
 @app.get("/health")
-async def health(session: AsyncSession = Depends(get_session)):
+async def health(session: AsyncSession = Depends(get_session, scope="function")):
     """
     Health check endpoint that checks if the app and database are functioning.
 
@@ -50,3 +97,43 @@ async def health(session: AsyncSession = Depends(get_session)):
         raise HTTPException(status_code=500, detail="Database connection failed")
 
     return {"status": "OK"}
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Runtime metrics of this worker.
+
+    Returns:
+        dict: The admission control load, with admitted and shed request counts per
+        priority class, the executions and coalesced calls of every coalesced
+        service method, and the state of the database and Redis circuit breakers.
+    """
+    return {
+        "admission": admission_controller.metrics(),
+        "single_flight": {
+            name: group.metrics() for name, group in single_flights.items()
+        },
+        "circuit_breakers": {
+            name: breaker.metrics() for name, breaker in circuit_breakers.items()
+        },
+    }
+
+
+@app.get("/.well-known/jwks.json")
+async def jwks(response: Response):
+    """
+    The public keys tokens are signed with, as a JSON Web Key Set.
+
+    Other services verify tokens with these keys instead of sharing a secret. The set
+    is empty when tokens are signed with HS256.
+
+    Returns:
+        dict: The JSON Web Key Set.
+    """
+    response.headers["Cache-Control"] = (
+        f"public, max-age={settings.JWT_KEYS_RELOAD_INTERVAL}"
+    )
+    if settings.JWT_ALGORITHM == "HS256":
+        return {"keys": []}
+    return keyring.jwks()
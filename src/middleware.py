@@ -4,9 +4,13 @@ import time
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.requests import Request
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, Response
 
+from src.admission import admission_controller, request_priority
 from src.app_logging import LoggingConfig
+from src.compression import CompressionMiddleware
+from src.config import settings
+from src.exceptions import RequestShedException
 
 logging.getLogger("uvicorn.access").disabled = True
 
@@ -14,6 +18,48 @@ logger = LoggingConfig.get_logger(__name__)
 
 
 def register_middleware(app: FastAPI):
+    # Added first so it runs innermost, within the admission control slot of the
+    # request: compressing large bodies takes CPU too.
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware)
+
+    @app.middleware("http")
+    async def admission_control(request: Request, call_next) -> Response:
+        """
+        Admission control middleware shedding load when the worker is saturated.
+
+        Every request needs one of the worker's in-flight slots. Requests queue for a
+        slot by priority class (see `request_priority`) and are answered with a 503
+        and a `Retry-After` header once they have queued longer than the budget of
+        their class.
+
+        Parameters:
+        - request (Request): The incoming HTTP request object.
+        - call_next: The function to pass the request to the next middleware or route handler.
+
+        Returns:
+        - response: The response of the route handler, or a 503 if the request was shed.
+        """
+        if not settings.ADMISSION_CONTROL_ENABLED:
+            return await call_next(request)
+
+        try:
+            await admission_controller.acquire(
+                request_priority(request.method, request.url.path)
+            )
+        except RequestShedException as ex:
+            logger.warning(f"{request.method} - {request.url.path} - {ex}")
+            return JSONResponse(
+                status_code=503,
+                content={"detail": "Server is overloaded, please retry later"},
+                headers={"Retry-After": "1"},
+            )
+
+        try:
+            return await call_next(request)
+        finally:
+            admission_controller.release()
+
     @app.middleware("http")
     async def custom_logging(request: Request, call_next) -> Response:
         """
@@ -0,0 +1,157 @@
+from typing import Any, Callable
+
+import msgpack
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.routing import APIRoute, get_request_handler
+from pydantic_core import from_json
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+JSON_MEDIA_RANGES = ("application/json", "application/*", "*/*")
+
+
+class MsgPackResponse(Response):
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content)
+
+
+class MsgPackRequest(Request):
+    """
+    A request with a MessagePack body, decoded where FastAPI decodes JSON bodies.
+    """
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = msgpack.unpackb(await self.body())
+        return self._json
+
+
+def accepts_msgpack(accept: str) -> bool:
+    """
+    Parameters:
+    - accept (str): The `Accept` request header.
+
+    Returns:
+    - bool: Whether the client asks for MessagePack at least as much as for JSON.
+    """
+    qualities = {}
+    for item in accept.split(","):
+        media_range, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[media_range.strip().lower()] = quality
+
+    msgpack_quality = max(
+        qualities.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES
+    )
+    json_quality = next(
+        (
+            qualities[media_range]
+            for media_range in JSON_MEDIA_RANGES
+            if media_range in qualities
+        ),
+        0.0,
+    )
+    return msgpack_quality > 0 and msgpack_quality >= json_quality
+
+
+def to_msgpack(response: Response) -> Response:
+    """
+    Re-encodes a JSON response as MessagePack.
+
+    Parameters:
+    - response (Response): A response with a complete JSON body.
+
+    Returns:
+    - Response: The same response, status and headers with a MessagePack body.
+    """
+    msgpack_response = MsgPackResponse(
+        from_json(response.body),
+        status_code=response.status_code,
+        background=response.background,
+    )
+    msgpack_response.raw_headers.extend(
+        (name, value)
+        for name, value in response.raw_headers
+        if name not in (b"content-type", b"content-length")
+    )
+    return msgpack_response
+
+
+class NegotiatedRoute(APIRoute):
+    """
+    A route answering in JSON or in MessagePack, as the `Accept` header asks, and
+    reading request bodies sent as either.
+
+    Both formats go through the same pydantic schemas, UUIDs and dates are strings in
+    MessagePack too. The route has two request handlers: JSON clients keep FastAPI's
+    direct JSON serialisation, while for MessagePack clients the response model dumps
+    the return value to Python objects packed straight into MessagePack. Responses
+    built by the endpoint itself as JSON are re-encoded. Errors raised as
+    `HTTPException` or request validation errors are still answered in JSON.
+
+    The MessagePack handler is built from the route alone, so declare dependencies on
+    the route or its `APIRouter`, not in `include_router`.
+    """
+
+    def get_route_handler(self) -> Callable:
+        json_route_handler = super().get_route_handler()
+        msgpack_route_handlers = {}
+
+        def get_msgpack_route_handler(request: Request) -> Callable:
+            # Routes included in an app take its dependency overrides, like FastAPI
+            # does for the JSON handler.
+            provider = self.dependency_overrides_provider or request.app
+            handler = msgpack_route_handlers.get(provider)
+            if handler is None:
+                handler = msgpack_route_handlers[provider] = get_request_handler(
+                    dependant=self.dependant,
+                    body_field=self.body_field,
+                    status_code=self.status_code,
+                    response_class=MsgPackResponse,
+                    response_field=self.response_field,
+                    response_model_include=self.response_model_include,
+                    response_model_exclude=self.response_model_exclude,
+                    response_model_by_alias=self.response_model_by_alias,
+                    response_model_exclude_unset=self.response_model_exclude_unset,
+                    response_model_exclude_defaults=self.response_model_exclude_defaults,
+                    response_model_exclude_none=self.response_model_exclude_none,
+                    dependency_overrides_provider=provider,
+                    embed_body_fields=self._embed_body_fields,
+                )
+            return handler
+
+        async def negotiated_route_handler(request: Request) -> Response:
+            content_type = request.headers.get("content-type", "")
+            if content_type.startswith(MSGPACK_MEDIA_TYPES):
+                # FastAPI only parses bodies declared as JSON, with `request.json()`.
+                headers = [
+                    (name, b"application/json" if name == b"content-type" else value)
+                    for name, value in request.scope["headers"]
+                ]
+                request = MsgPackRequest(
+                    {**request.scope, "headers": headers}, request.receive
+                )
+
+            if not accepts_msgpack(request.headers.get("accept", "")):
+                response = await json_route_handler(request)
+                response.headers.add_vary_header("Accept")
+                return response
+
+            response = await get_msgpack_route_handler(request)(request)
+            response.headers.add_vary_header("Accept")
+            if response.headers.get("content-type") == "application/json" and (
+                response.body
+            ):
+                return to_msgpack(response)
+            return response
+
+        return negotiated_route_handler
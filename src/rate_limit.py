@@ -0,0 +1,252 @@
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import Request, Response, status
+from fastapi.exceptions import HTTPException
+
+from src.app_logging import LoggingConfig
+from src.config import settings
+from src.exceptions import ServiceUnavailableException
+from src.redis import call_redis, redis_client
+from src.users.domains import UserProfile
+
+logger = LoggingConfig.get_logger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+# Upper bound on the number of keys tracked locally per route, least recently used
+# keys are forgotten first.
+LOCAL_MAX_KEYS = 10_000
+
+# GCRA (generic cell rate algorithm) in one round trip. The key holds the theoretical
+# arrival time (TAT) in milliseconds; a request is allowed as long as the TAT does not
+# run more than one full period ahead of now. The Redis clock is used so that all app
+# instances agree on the time. A request costing several requests moves the TAT by as
+# many intervals.
+# Returns {allowed, remaining, retry after ms, reset ms}.
+GCRA_SCRIPT = redis_client.register_script(
+    """
+    local interval = tonumber(ARGV[1])
+    local period = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local clock = redis.call('TIME')
+    local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+
+    local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+    if tat < now then
+        tat = now
+    end
+    local new_tat = tat + interval * cost
+    local allow_at = new_tat - period
+
+    if now < allow_at then
+        return {0, 0, allow_at - now, tat - now}
+    end
+
+    redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+    return {1, math.floor((now - allow_at) / interval), 0, new_tat - now}
+    """
+)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """A number of requests allowed per period (in seconds)."""
+
+    limit: int
+    period: int
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """
+        Parses a limit written as `<count>/<second|minute|hour|day>`, e.g. `10/minute`.
+
+        Parameters:
+        - value (str): The limit to parse.
+
+        Returns:
+        - RateLimit: The parsed limit.
+
+        Raises:
+        - ValueError: If the value is not a valid limit.
+        """
+        count, _, unit = value.partition("/")
+        if unit not in PERIODS or not count.isdigit() or int(count) < 1:
+            raise ValueError(f"Invalid rate limit '{value}'")
+        return cls(limit=int(count), period=PERIODS[unit])
+
+
+class TokenBucket:
+    """
+    A local token bucket holding up to `capacity` tokens, refilled at `rate` per second.
+    """
+
+    def __init__(self, capacity: int, rate: float) -> None:
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def take(self, cost: int = 1) -> bool:
+        """
+        Takes `cost` tokens if they are available.
+
+        Returns:
+        - bool: True if the tokens were taken, False if the bucket holds fewer.
+        """
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+    def retry_after(self, cost: int = 1) -> float:
+        """
+        Returns:
+        - float: The number of seconds until `cost` tokens are available.
+        """
+        return max(0.0, (cost - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """
+    Dependency limiting how often a route can be called, per user or per client IP.
+
+    The limit is shared by all app instances through a GCRA script in Redis. In front
+    of it, every process keeps a local token bucket per key with the same limit: a
+    client bursting past its limit is turned away locally without a round trip to
+    Redis, and so is a client Redis already rejected, until its retry time. If Redis
+    is unavailable, only the local buckets apply.
+
+    Limits are read from `settings.RATE_LIMITS` by route name. Allowed responses carry
+    `RateLimit-Limit`, `RateLimit-Remaining` and `RateLimit-Reset` headers, rejected
+    ones (429) also carry `Retry-After`.
+    """
+
+    def __init__(self, name: str, per_user: bool = False) -> None:
+        self.name = name
+        self.per_user = per_user
+        self.rate_limit = RateLimit.parse(settings.RATE_LIMITS[name])
+        self._buckets = OrderedDict()
+        self._blocked_until = {}
+
+    def get_key(self, request: Request) -> str:
+        """
+        Identifies the client: by user id when `per_user` is set and the request
+        carries a valid access token, by client IP otherwise.
+
+        Parameters:
+        - request (Request): The incoming request.
+
+        Returns:
+        - str: The Redis key of the client for this route.
+        """
+        if self.per_user:
+            scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+            token_data = UserProfile.decode_token(token) if scheme == "Bearer" else None
+            if token_data is not None and "id" in token_data["user"]:
+                return f"ratelimit:{self.name}:user:{token_data['user']['id']}"
+
+        client_ip = request.client.host if request.client else "unknown"
+        return f"ratelimit:{self.name}:ip:{client_ip}"
+
+    def _local_bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(
+                self.rate_limit.limit, self.rate_limit.limit / self.rate_limit.period
+            )
+            self._buckets[key] = bucket
+            if len(self._buckets) > LOCAL_MAX_KEYS:
+                evicted_key, _ = self._buckets.popitem(last=False)
+                self._blocked_until.pop(evicted_key, None)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _reject(self, retry_after: float) -> HTTPException:
+        retry_after = max(1, math.ceil(retry_after))
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={
+                "Retry-After": str(retry_after),
+                "RateLimit-Limit": str(self.rate_limit.limit),
+                "RateLimit-Remaining": "0",
+                "RateLimit-Reset": str(retry_after),
+            },
+        )
+
+    async def __call__(self, request: Request, response: Response) -> None:
+        """
+        Counts the request against the limit of its client.
+
+        Parameters:
+        - request (Request): The incoming request.
+        - response (Response): The response the rate limit headers are added to.
+
+        Raises:
+        - HTTPException (429): If the client has exceeded the limit.
+        """
+        await self.charge(request, response)
+
+    async def charge(self, request: Request, response: Response, cost: int = 1) -> None:
+        """
+        Counts the request against the limit of its client as `cost` requests, e.g.
+        one per item of a batch. A cost above the limit is never allowed.
+
+        Parameters:
+        - request (Request): The incoming request.
+        - response (Response): The response the rate limit headers are added to.
+        - cost (int): The number of requests the request counts for.
+
+        Raises:
+        - HTTPException (429): If the client has exceeded the limit.
+        """
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        key = self.get_key(request)
+        now = time.monotonic()
+
+        blocked_until = self._blocked_until.get(key)
+        if blocked_until is not None:
+            if now < blocked_until:
+                raise self._reject(blocked_until - now)
+            del self._blocked_until[key]
+
+        bucket = self._local_bucket(key)
+        if not bucket.take(cost):
+            raise self._reject(bucket.retry_after(cost))
+
+        try:
+            allowed, remaining, retry_after_ms, reset_ms = await call_redis(
+                lambda: GCRA_SCRIPT(
+                    keys=[key],
+                    args=[
+                        self.rate_limit.period * 1000 / self.rate_limit.limit,
+                        self.rate_limit.period * 1000,
+                        cost,
+                    ],
+                )
+            )
+        except ServiceUnavailableException:
+            # Redis is unavailable, or not even tried while its circuit breaker is
+            # open: only the local bucket applies.
+            return
+        except Exception as ex:
+            logger.error(f"Rate limit check for {key} failed, allowing request: {ex}")
+            return
+
+        if not allowed:
+            self._blocked_until[key] = now + int(retry_after_ms) / 1000
+            raise self._reject(int(retry_after_ms) / 1000)
+
+        response.headers["RateLimit-Limit"] = str(self.rate_limit.limit)
+        response.headers["RateLimit-Remaining"] = str(int(remaining))
+        response.headers["RateLimit-Reset"] = str(math.ceil(int(reset_ms) / 1000))
@@ -1,12 +1,66 @@
+import time
+from typing import Any, Awaitable, Callable
+
 import redis.asyncio as redis
+
+from src.circuit_breaker import redis_breaker
 from src.config import settings
+from src.exceptions import ServiceUnavailableException
 
-JTI_EXPIRY = 3600
+TOKEN_VERSION_CACHE_TTL = 30
+TOKEN_VERSION_CACHE_MAX_SIZE = 10_000
+REVOKED_JTI_CACHE_MAX_SIZE = 100_000
 
-redis_client = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
+redis_client = redis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=0,
+    socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT_SECONDS,
+)
 
 
-async def add_jti_to_blocklist(jti: str) -> None:
+async def call_redis(command: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Sends a command to Redis through the Redis circuit breaker.
+
+    Parameters:
+    - command (Callable[[], Awaitable[Any]]): Sends the command.
+
+    Returns:
+    - Any: The reply to the command.
+
+    Raises:
+    - ServiceUnavailableException: If Redis can't be reached or the breaker is open.
+    """
+    redis_breaker.check()
+    try:
+        reply = await command()
+    except (redis.ConnectionError, redis.TimeoutError, OSError) as ex:
+        redis_breaker.record_failure()
+        raise ServiceUnavailableException(
+            f"Redis is unavailable: {ex!r}", retry_after=redis_breaker.retry_after
+        ) from ex
+    redis_breaker.record_success()
+    return reply
+
+
+# Token IDs known to be revoked by this worker, with the expiry of their token. A
+# revoked token stays revoked, so these are checked without Redis, and still rejected
+# while Redis is unavailable.
+_revoked_jtis: dict[str, float] = {}
+
+
+def _remember_revoked_jti(jti: str, exp: float) -> None:
+    if len(_revoked_jtis) >= REVOKED_JTI_CACHE_MAX_SIZE:
+        now = time.time()
+        for expired in [key for key, value in _revoked_jtis.items() if value <= now]:
+            del _revoked_jtis[expired]
+        if len(_revoked_jtis) >= REVOKED_JTI_CACHE_MAX_SIZE:
+            del _revoked_jtis[next(iter(_revoked_jtis))]
+    _revoked_jtis[jti] = exp
+
+
+async def add_jti_to_blocklist(jti: str, exp: int) -> None:
     """
     Adds a JWT ID (JTI) to the blocklist in Redis.
 
@@ -15,15 +69,22 @@ async def add_jti_to_blocklist(jti: str) -> None:
 
     Parameters:
     - jti (str): The JWT ID that uniquely identifies the token to be revoked.
+    - exp (int): The expiry of the token, as a Unix timestamp.
 
     Returns:
     - None: This function does not return any value. It performs an asynchronous operation
       to store the JTI in Redis with an expiry time.
 
     Notes:
-    - The JTI is stored with an empty value, and the expiry time is defined by the `JTI_EXPIRY` constant.
+    - The JTI is stored with an empty value until the token itself expires; an expired
+      token is rejected anyway, so the entry isn't needed any longer than that.
+    - The JTI is also remembered by this worker, so it is rejected here even if Redis
+      is unavailable.
     """
-    await redis_client.set(name=jti, value="", ex=JTI_EXPIRY)
+    _remember_revoked_jti(jti, exp)
+    await call_redis(
+        lambda: redis_client.set(name=jti, value="", ex=max(1, int(exp - time.time())))
+    )
 
 
 async def is_jti_in_blocklist(jti: str) -> bool:
@@ -39,6 +100,87 @@ async def is_jti_in_blocklist(jti: str) -> bool:
     Returns:
     - bool: Returns `True` if the JTI is found in the blocklist (indicating the token is revoked),
             or `False` if the JTI is not present.
+
+    Raises:
+    - ServiceUnavailableException: If Redis is unavailable and `JTI_CHECK_FAILURE_POLICY`
+      is `fail_closed`.
+
+    Notes:
+    - JTIs revoked through this worker or already found in the blocklist are checked
+      locally. When Redis is unavailable and `JTI_CHECK_FAILURE_POLICY` is
+      `fail_open`, only those are considered revoked.
     """
-    jti = await redis_client.get(jti)
-    return jti is not None
+    if jti in _revoked_jtis:
+        return True
+
+    try:
+        # The time to live of the entry, -2 if there is none.
+        ttl = await call_redis(lambda: redis_client.ttl(jti))
+    except ServiceUnavailableException:
+        if settings.JTI_CHECK_FAILURE_POLICY == "fail_open":
+            return False
+        raise
+    if ttl == -2:
+        return False
+    _remember_revoked_jti(jti, time.time() + max(1, ttl))
+    return True
+
+
+_token_versions: dict[int, tuple[int, float]] = {}
+
+
+async def get_token_version(user_id: int, use_cache: bool = True) -> int:
+    """
+    Returns the current token version of a user.
+
+    Versions are cached in the process for `TOKEN_VERSION_CACHE_TTL` seconds, so most
+    calls need no round trip to Redis. A revocation done by another process can thus
+    take up to that long to be seen by this one.
+
+    Parameters:
+    - user_id (int): The ID of the user.
+    - use_cache (bool): Whether the version may be served from the cache. Tokens are
+      issued with the version read from Redis, otherwise a token issued after a
+      revocation by another process could carry the revoked version.
+
+    Returns:
+    - int: The token version; tokens carrying a lower version are revoked.
+
+    Raises:
+    - ServiceUnavailableException: If Redis is unavailable, the version isn't cached,
+      even expired, and `JTI_CHECK_FAILURE_POLICY` is `fail_closed`.
+    """
+    now = time.monotonic()
+    cached = _token_versions.get(user_id)
+    if use_cache and cached is not None and cached[1] > now:
+        return cached[0]
+
+    try:
+        version = await call_redis(lambda: redis_client.get(f"token_version:{user_id}"))
+    except ServiceUnavailableException:
+        if cached is not None:
+            return cached[0]
+        if settings.JTI_CHECK_FAILURE_POLICY == "fail_open":
+            return 0
+        raise
+    version = int(version or 0)
+    if len(_token_versions) >= TOKEN_VERSION_CACHE_MAX_SIZE:
+        _token_versions.clear()
+    _token_versions[user_id] = (version, now + TOKEN_VERSION_CACHE_TTL)
+    return version
+
+
+async def revoke_user_tokens(user_id: int) -> int:
+    """
+    Revokes every token issued to a user so far, by incrementing their token version.
+
+    Parameters:
+    - user_id (int): The ID of the user.
+
+    Returns:
+    - int: The new token version.
+    """
+    version = await call_redis(lambda: redis_client.incr(f"token_version:{user_id}"))
+
+    _token_versions[user_id] = (version, time.monotonic() + TOKEN_VERSION_CACHE_TTL)
+    return version
@@ -0,0 +1,346 @@
+import asyncio
+import json
+import os
+import socket
+import time
+from datetime import datetime
+from uuid import UUID
+
+from redis.exceptions import ResponseError
+
+from src.app_logging import LoggingConfig
+from src.config import settings
+from src.db.main import async_session
+from src.exceptions import ServiceUnavailableException
+from src.redis import call_redis, redis_client
+from src.reviews.schemas import ReviewCreateModel
+from src.reviews.service import review_service
+
+logger = LoggingConfig.get_logger(__name__)
+
+REVIEW_STREAM = "reviews:ingest"
+REVIEW_CONSUMER_GROUP = "review-writers"
+# Entries that can't be written, with the error, for inspection and manual replay.
+REVIEW_DEAD_LETTER_STREAM = "reviews:ingest:dead"
+IDEMPOTENCY_KEY_EXPIRY = 24 * 3600
+# Entries left unacknowledged for longer than this (e.g. by a crashed consumer or a
+# failed flush) are claimed again by any running consumer.
+RECLAIM_MIN_IDLE_MS = 60 * 1000
+
+# Reserves the idempotency key and appends the review to the stream atomically, so a
+# key can never be reserved for a review that was not enqueued.
+ENQUEUE_SCRIPT = redis_client.register_script(
+    """
+    if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then
+        return redis.call('XADD', KEYS[2], '*', 'payload', ARGV[1])
+    end
+    return false
+    """
+)
+
+
+async def enqueue_review(
+    user_id: int,
+    book_id: UUID,
+    review_data: ReviewCreateModel,
+    idempotency_key: str,
+) -> bool:
+    """
+    Adds a validated review to the ingestion stream.
+
+    Parameters:
+    - user_id (int): The ID of the user submitting the review.
+    - book_id (UUID): The unique identifier of the book being reviewed.
+    - review_data (ReviewCreateModel): The review content.
+    - idempotency_key (str): Client supplied key identifying this review submission.
+
+    Returns:
+    - bool: True if the review was enqueued, False if a review with the same
+      idempotency key was already accepted for this user.
+
+    Raises:
+    - ServiceUnavailableException: If Redis can't be reached or its circuit breaker
+      is open.
+    """
+    payload = json.dumps(
+        {
+            **review_data.model_dump(),
+            "user_id": user_id,
+            "book_id": str(book_id),
+            "created_at": datetime.now().isoformat(),
+            "idempotency_key": idempotency_key,
+        }
+    )
+    entry_id = await call_redis(
+        lambda: ENQUEUE_SCRIPT(
+            keys=[f"review:idempotency:{user_id}:{idempotency_key}", REVIEW_STREAM],
+            args=[payload, IDEMPOTENCY_KEY_EXPIRY],
+        )
+    )
+    return entry_id is not None
+
+
+def parse_review_entry(fields: dict) -> dict:
+    """
+    Turns a stream entry back into a review row.
+
+    Parameters:
+    - fields (dict): The raw stream entry fields.
+
+    Returns:
+    - dict: The review row, ready to be inserted.
+    """
+    review = json.loads(fields[b"payload"])
+    review["book_id"] = UUID(review["book_id"])
+    review["created_at"] = datetime.fromisoformat(review["created_at"])
+    return review
+
+
+class ReviewIngestionWorker:
+    """
+    Drains the review ingestion stream and writes reviews to Postgres in batches.
+
+    A batch is flushed when it reaches `batch_size` entries or when its oldest entry
+    has waited `flush_interval_ms`, whichever comes first. Entries are only
+    acknowledged once they are committed; entries that failed stay pending and are
+    claimed again after `RECLAIM_MIN_IDLE_MS`, until they are dead lettered.
+    """
+
+    def __init__(
+        self,
+        consumer_name: str | None = None,
+        batch_size: int = settings.REVIEW_INGESTION_BATCH_SIZE,
+        flush_interval_ms: int = settings.REVIEW_INGESTION_FLUSH_INTERVAL_MS,
+    ) -> None:
+        self.consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self._stopped = asyncio.Event()
+
+    def stop(self) -> None:
+        """
+        Asks the worker to flush what it has buffered and exit.
+        """
+        self._stopped.set()
+
+    async def ensure_consumer_group(self) -> None:
+        """
+        Creates the stream and its consumer group if they do not exist yet.
+        """
+        try:
+            await redis_client.xgroup_create(
+                REVIEW_STREAM, REVIEW_CONSUMER_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as ex:
+            if "BUSYGROUP" not in str(ex):
+                raise
+
+    async def reclaim_stale_entries(self) -> list:
+        """
+        Claims entries that other consumers (or failed flushes) left unacknowledged.
+
+        Returns:
+        - list: The claimed stream entries.
+        """
+        _, entries, _ = await redis_client.xautoclaim(
+            REVIEW_STREAM,
+            REVIEW_CONSUMER_GROUP,
+            self.consumer_name,
+            min_idle_time=RECLAIM_MIN_IDLE_MS,
+            count=self.batch_size,
+        )
+        return entries
+
+    async def flush(self, entries: list) -> None:
+        """
+        Writes a batch of stream entries to the database and acknowledges them.
+
+        When the batch fails, its entries are written one by one, so that one bad
+        entry doesn't hold back the others, see `flush_one_by_one`. While the
+        database is unavailable the whole batch is left pending instead.
+
+        Parameters:
+        - entries (list): The stream entries as (entry id, fields) pairs.
+        """
+        try:
+            reviews = await self.write(entries)
+        except ServiceUnavailableException as ex:
+            logger.error(
+                f"Failed to write a batch of {len(entries)} reviews, it will be retried. Exception is: {ex}"
+            )
+            return
+        except Exception as ex:
+            logger.error(
+                f"Failed to write a batch of {len(entries)} reviews, writing them one by one. Exception is: {ex}"
+            )
+            await self.flush_one_by_one(entries)
+            return
+
+        await self.acknowledge(entries)
+        logger.info(
+            f"Wrote {len(reviews)} reviews from a batch of {len(entries)} queued reviews"
+        )
+
+    async def flush_one_by_one(self, entries: list) -> None:
+        """
+        Writes the entries of a failed batch one at a time.
+
+        Written entries are acknowledged. Malformed entries, and entries that failed
+        on their own in `REVIEW_INGESTION_MAX_DELIVERIES` deliveries, are moved to the
+        dead letter stream. Other failed entries stay pending, to be retried.
+
+        Parameters:
+        - entries (list): The stream entries as (entry id, fields) pairs.
+        """
+        written, dead_letters = [], []
+        for entry_id, fields in entries:
+            try:
+                parse_review_entry(fields)
+            except (KeyError, TypeError, ValueError) as ex:
+                dead_letters.append((entry_id, fields, f"Malformed entry: {ex!r}"))
+                continue
+
+            try:
+                await self.write([(entry_id, fields)])
+            except ServiceUnavailableException as ex:
+                logger.error(f"Stopped writing queued reviews one by one: {ex}")
+                break
+            except Exception as ex:
+                if await self.delivery_count(entry_id) >= (
+                    settings.REVIEW_INGESTION_MAX_DELIVERIES
+                ):
+                    dead_letters.append((entry_id, fields, repr(ex)))
+                else:
+                    logger.error(
+                        f"Failed to write queued review {entry_id}, it will be retried. Exception is: {ex}"
+                    )
+                continue
+            written.append((entry_id, fields))
+
+        for entry_id, _, error in dead_letters:
+            logger.error(
+                f"Moving queued review {entry_id} to the dead letters: {error}"
+            )
+        await self.acknowledge(written, dead_letters)
+        logger.info(
+            f"Wrote {len(written)} and dead lettered {len(dead_letters)} of a failed batch of {len(entries)} queued reviews"
+        )
+
+    async def write(self, entries: list) -> list:
+        """
+        Parameters:
+        - entries (list): The stream entries as (entry id, fields) pairs.
+
+        Returns:
+        - list: The reviews inserted, see `write_review_batch`.
+        """
+        reviews_data = [parse_review_entry(fields) for _, fields in entries]
+        async with async_session() as session:
+            return await review_service.write_review_batch(reviews_data, session)
+
+    async def delivery_count(self, entry_id: bytes) -> int:
+        """
+        Parameters:
+        - entry_id (bytes): The ID of a pending stream entry.
+
+        Returns:
+        - int: How many times the entry was delivered to a consumer, 0 if unknown.
+        """
+        try:
+            pending = await redis_client.xpending_range(
+                REVIEW_STREAM,
+                REVIEW_CONSUMER_GROUP,
+                min=entry_id,
+                max=entry_id,
+                count=1,
+            )
+        except Exception as ex:
+            logger.error(
+                f"Failed to get the deliveries of queued review {entry_id}: {ex}"
+            )
+            return 0
+        return pending[0]["times_delivered"] if pending else 0
+
+    async def acknowledge(
+        self, entries: list, dead_letters: list | None = None
+    ) -> None:
+        """
+        Acknowledges and deletes entries, after moving the dead letters to the dead
+        letter stream.
+
+        Parameters:
+        - entries (list): The written stream entries as (entry id, fields) pairs.
+        - dead_letters (list | None): The stream entries that can't be written, as
+          (entry id, fields, error) triples.
+        """
+        dead_letters = dead_letters or []
+        entry_ids = [entry[0] for entry in [*entries, *dead_letters]]
+        if not entry_ids:
+            return
+
+        # If acknowledging fails the entries are redelivered later; the idempotency
+        # key makes the second write a no-op.
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for entry_id, fields, error in dead_letters:
+                    pipe.xadd(
+                        REVIEW_DEAD_LETTER_STREAM,
+                        {**fields, b"entry_id": entry_id, b"error": error},
+                    )
+                pipe.xack(REVIEW_STREAM, REVIEW_CONSUMER_GROUP, *entry_ids)
+                pipe.xdel(REVIEW_STREAM, *entry_ids)
+                await pipe.execute()
+        except Exception as ex:
+            logger.error(f"Failed to acknowledge {len(entry_ids)} queued reviews: {ex}")
+
+    async def run(self) -> None:
+        """
+        Consumes the stream until `stop` is called.
+        """
+        await self.ensure_consumer_group()
+        logger.info(f"Review ingestion worker {self.consumer_name} started")
+
+        buffer = []
+        flush_at = None
+        reclaim_at = 0.0
+
+        while not self._stopped.is_set():
+            try:
+                now = time.monotonic()
+                if now >= reclaim_at:
+                    buffer.extend(await self.reclaim_stale_entries())
+                    reclaim_at = now + RECLAIM_MIN_IDLE_MS / 1000
+
+                if flush_at is None:
+                    block_ms = self.flush_interval_ms
+                else:
+                    block_ms = max(1, int((flush_at - now) * 1000))
+
+                response = await redis_client.xreadgroup(
+                    REVIEW_CONSUMER_GROUP,
+                    self.consumer_name,
+                    {REVIEW_STREAM: ">"},
+                    count=max(1, self.batch_size - len(buffer)),
+                    block=block_ms,
+                )
+            except Exception as ex:
+                logger.error(f"Failed to read the review ingestion stream: {ex}")
+                await asyncio.sleep(self.flush_interval_ms / 1000)
+                continue
+
+            for _, entries in response or []:
+                buffer.extend(entries)
+
+            if buffer and flush_at is None:
+                flush_at = time.monotonic() + self.flush_interval_ms / 1000
+
+            if buffer and (
+                len(buffer) >= self.batch_size or time.monotonic() >= flush_at
+            ):
+                await self.flush(buffer)
+                buffer = []
+                flush_at = None
+
+        if buffer:
+            await self.flush(buffer)
+        logger.info(f"Review ingestion worker {self.consumer_name} stopped")
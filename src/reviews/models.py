@@ -3,18 +3,59 @@ from typing import Optional
 from uuid import UUID
 
 import sqlalchemy.dialects.postgresql as pg
-from sqlmodel import Column, Field, Relationship, SQLModel
+from sqlmodel import Column, Field, Index, Relationship, SQLModel, func, text
 
 
 class Review(SQLModel, table=True):
     __tablename__ = "review"
+    # The table is partitioned by month on created_at (see src.db.partitions), so
+    # unique constraints, the primary key included, have to contain created_at.
+    __table_args__ = (
+        # Redelivered ingestion entries carry the created_at of their first delivery,
+        # so the key still deduplicates them with created_at added.
+        Index(
+            "ix_review_user_id_idempotency_key",
+            "user_id",
+            "idempotency_key",
+            "created_at",
+            unique=True,
+            postgresql_where=text("idempotency_key IS NOT NULL"),
+        ),
+        Index(
+            "ix_review_deleted_at",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+        ),
+        # Rows are appended in created_at order, so a tiny BRIN index serves range scans.
+        Index("ix_review_created_at", "created_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id: int = Field(default=None, primary_key=True, nullable=False)
+    id: int = Field(
+        default=None,
+        primary_key=True,
+        nullable=False,
+        sa_column_kwargs={"autoincrement": True},
+    )
     text: str
     rating: int = Field(ge=0, lt=5)
-    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
-    user_id: int | None = Field(default=None, foreign_key="user.id")
-    book_id: UUID | None = Field(default=None, foreign_key="book.id")
+    created_at: datetime = Field(
+        sa_column=Column(
+            pg.TIMESTAMP,
+            primary_key=True,
+            nullable=False,
+            default=datetime.now,
+            server_default=func.now(),
+        )
+    )
+    deleted_at: datetime | None = Field(
+        default=None, sa_column=Column(pg.TIMESTAMP, nullable=True)
+    )
+    user_id: int | None = Field(default=None, foreign_key="user.id", index=True)
+    book_id: UUID | None = Field(
+        default=None, foreign_key="book.id", index=True, ondelete="CASCADE"
+    )
+    idempotency_key: str | None = Field(default=None, nullable=True)
     user: Optional["User"] = Relationship(back_populates="reviews")
     book: Optional["Book"] = Relationship(back_populates="reviews")
 
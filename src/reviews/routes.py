@@ -1,39 +1,55 @@
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.app_logging import LoggingConfig
+from src.config import settings
 from src.db.main import get_session
 from src.exceptions import (
     BookNotFoundException,
+    ServiceUnavailableException,
     UserNotFoundException,
 )
-from src.reviews.schemas import ReviewCreateModel, ReviewModel
+from src.negotiation import NegotiatedRoute
+from src.rate_limit import RateLimiter
+from src.reviews.ingestion import enqueue_review
+from src.reviews.schemas import (
+    ReviewBatchCreateModel,
+    ReviewCreateModel,
+    ReviewModel,
+)
 from src.reviews.service import ReviewService, get_review_service
 from src.users.dependencies import AccessTokenBearer, RoleChecker
 
-review_router = APIRouter()
+review_router = APIRouter(route_class=NegotiatedRoute)
 access_token_bearer = AccessTokenBearer()
 role_checker = RoleChecker(["admin", "user"])
+review_rate_limiter = RateLimiter("create_review", per_user=True)
+# Charged once per review of the batch, see `create_reviews`.
+review_batch_rate_limiter = RateLimiter("create_reviews", per_user=True)
 logger = LoggingConfig.get_logger(__name__)
 
 
 @review_router.post(
     "/create-review/{book_id}",
-    dependencies=[Depends(role_checker)],
+    dependencies=[Depends(review_rate_limiter), Depends(role_checker)],
     status_code=status.HTTP_201_CREATED,
     responses={
+        202: {"description": "Review accepted for asynchronous ingestion"},
         403: {"description": "Not Authenticated"},
         400: {"description": "Bad Request"},
+        429: {"description": "Too many requests"},
         500: {"description": "Internal Server Error"},
     },
 )
 async def create_review(
     book_id: UUID,
     review_data: ReviewCreateModel,
+    idempotency_key: str | None = Header(default=None, max_length=128),
     review_service: ReviewService = Depends(get_review_service),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_session, scope="function"),
     token_details: dict = Depends(access_token_bearer),
 ) -> ReviewModel:
     """
@@ -42,12 +58,19 @@ async def create_review(
     This endpoint allows an authenticated user to submit a review for a book identified by `book_id`.
     The review details should be provided in the request body.
 
+    When asynchronous ingestion is enabled (`REVIEW_INGESTION_ASYNC`), the review is
+    validated and queued instead of written, and a 202 is returned. In that mode only,
+    resubmitting with the same `Idempotency-Key` header never creates a second review;
+    the key is ignored when reviews are written synchronously.
+
     Args:
         book_id (UUID): The unique identifier of the book being reviewed.
         review_data: The review content
+        idempotency_key (str | None): Optional client key identifying this submission,
+            used with asynchronous ingestion only.
 
     Returns:
-        ReviewModel: The created review.
+        ReviewModel: The created review (201), or an acknowledgement (202) in asynchronous mode.
 
     Raises:
         HTTPException (400): If the user or book does not exist.
@@ -57,8 +80,25 @@ async def create_review(
     logger.info(f"Attempting to create a review for book {book_id}")
 
     try:
+        if settings.REVIEW_INGESTION_ASYNC:
+            user_id = token_details["user"]["id"]
+            idempotency_key = idempotency_key or str(uuid4())
+
+            await review_service.validate_review_targets(user_id, [book_id], session)
+            if not await enqueue_review(user_id, book_id, review_data, idempotency_key):
+                logger.info(
+                    f"Review for book {book_id} with idempotency key {idempotency_key} was already accepted"
+                )
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={
+                    "message": "Review accepted",
+                    "idempotency_key": idempotency_key,
+                },
+            )
+
         review = await review_service.add_new_review(
-            token_details["user"]["email"], book_id, review_data, session
+            token_details["user"]["id"], book_id, review_data, session
         )
         return review
 
@@ -76,6 +116,8 @@ async def create_review(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Book doesn't exist"
         )
+    except ServiceUnavailableException:
+        raise
     except Exception as ex:
         logger.error(
             f"An exception occurred while creating a review for book {book_id}. Exception is: {ex}"
@@ -84,3 +126,76 @@ async def create_review(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Something went wrong",
         )
+
+
+@review_router.post(
+    "/batch",
+    dependencies=[Depends(role_checker)],
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        403: {"description": "Not Authenticated"},
+        400: {"description": "Bad Request"},
+        429: {"description": "Too many requests"},
+        500: {"description": "Internal Server Error"},
+    },
+)
+async def create_reviews(
+    reviews_data: ReviewBatchCreateModel,
+    request: Request,
+    response: Response,
+    review_service: ReviewService = Depends(get_review_service),
+    session: AsyncSession = Depends(get_session, scope="function"),
+    token_details: dict = Depends(access_token_bearer),
+) -> list[ReviewModel]:
+    """
+    Creates several reviews, possibly for different books, in one request.
+
+    The reviewing user is taken from the access token. All referenced books are
+    validated together and the reviews are inserted in a single statement; if any
+    book does not exist, none of the reviews are created. Each review counts against
+    the `create_reviews` rate limit of the user.
+
+    Args:
+        reviews_data (ReviewBatchCreateModel): The reviews to create, each with its `book_id`.
+
+    Returns:
+        list[ReviewModel]: The created reviews, in request order.
+
+    Raises:
+        HTTPException (400): If the user or any of the books does not exist.
+        HTTPException (403): If the user is not authenticated.
+        HTTPException (429): If the user has created too many reviews.
+        HTTPException (500): If an unexpected error occurs.
+    """
+    await review_batch_rate_limiter.charge(
+        request, response, cost=len(reviews_data.reviews)
+    )
+    logger.info(f"Attempting to create {len(reviews_data.reviews)} reviews")
+
+    try:
+        reviews = await review_service.add_new_reviews(
+            token_details["user"]["id"], reviews_data.reviews, session
+        )
+        return reviews
+
+    except UserNotFoundException:
+        logger.warning("Failed to create a batch of reviews: user does not exist.")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="User doesn't exist"
+        )
+    except BookNotFoundException as ex:
+        logger.warning(f"Failed to create a batch of reviews: {ex}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="One or more books don't exist",
+        )
+    except ServiceUnavailableException:
+        raise
+    except Exception as ex:
+        logger.error(
+            f"An exception occurred while creating a batch of reviews. Exception is: {ex}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Something went wrong",
+        )
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import List
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -15,3 +16,11 @@ class ReviewModel(BaseModel):
 class ReviewCreateModel(BaseModel):
     text: str
     rating: int = Field(ge=0, lt=5)
+
+
+class ReviewBatchItemModel(ReviewCreateModel):
+    book_id: UUID
+
+
+class ReviewBatchCreateModel(BaseModel):
+    reviews: List[ReviewBatchItemModel] = Field(min_length=1, max_length=100)
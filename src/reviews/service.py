@@ -1,19 +1,30 @@
+from datetime import datetime
 from uuid import UUID
 
-from pydantic import EmailStr
+import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import (
+    Integer,
+    any_,
+    column,
+    exists,
+    func,
+    insert,
+    literal,
+    update,
+    values,
+)
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.books.service import BookService
+from src.books.models import Book
+from src.cache import book_cache
 from src.exceptions import (
     BookNotFoundException,
     UserNotFoundException,
 )
 from src.reviews.models import Review
-from src.reviews.schemas import ReviewCreateModel
-from src.users.service import UserService
-
-book_service = BookService()
-user_service = UserService()
+from src.reviews.schemas import ReviewBatchItemModel, ReviewCreateModel
+from src.users.models import User
 
 
 class ReviewService:
@@ -24,9 +35,54 @@ class ReviewService:
     for books.
     """
 
+    async def validate_review_targets(
+        self, user_id: int, book_ids: list[UUID], session: AsyncSession
+    ) -> None:
+        """
+        Validates that a user and a set of books exist, using a single query.
+
+        Only the ids are read; neither the user nor the books (and their
+        `selectin` relationships) are loaded into the session.
+
+        Args:
+            user_id (int): The ID of the user submitting the reviews.
+            book_ids (list[UUID]): The IDs of the books being reviewed.
+            session (AsyncSession): The database session for executing queries.
+
+        Raises:
+            BookNotFoundException: If any of the books does not exist in the database
+                or is soft deleted.
+            UserNotFoundException: If the user does not exist in the database.
+        """
+        requested_ids = set(book_ids)
+
+        user_exists = exists().where(User.id == user_id)
+        existing_book_ids = (
+            select(func.array_agg(Book.id))
+            .where(
+                Book.id == any_(literal(list(requested_ids), pg.ARRAY(pg.UUID))),
+                Book.deleted_at.is_(None),
+            )
+            .scalar_subquery()
+        )
+        statement = select(
+            user_exists.label("user_exists"),
+            existing_book_ids.label("book_ids"),
+        )
+        results = await session.exec(statement)
+        user_found, found_ids = results.one()
+
+        missing_ids = requested_ids - set(found_ids or [])
+        if missing_ids:
+            raise BookNotFoundException(
+                f"Book(s) {', '.join(sorted(str(id) for id in missing_ids))} don't exist"
+            )
+        if not user_found:
+            raise UserNotFoundException(f"User {user_id} doesn't exist")
+
     async def add_new_review(
         self,
-        user_email: EmailStr,
+        user_id: int,
         book_id: UUID,
         review_data: ReviewCreateModel,
         session: AsyncSession,
@@ -35,7 +91,7 @@ class ReviewService:
         Adds a new review for a book by a user.
 
         Args:
-            user_email (EmailStr): The email of the user submitting the review.
+            user_id (int): The ID of the user submitting the review.
             book_id (UUID): The unique identifier of the book being reviewed.
             review_data (ReviewCreateModel): The data for the new review.
             session (AsyncSession): The database session for executing queries.
@@ -47,23 +103,169 @@ class ReviewService:
             BookNotFoundException: If the specified book does not exist in the database.
             UserNotFoundException: If the specified user does not exist in the database.
         """
-        user = await user_service.get_user_by_email(email=user_email, session=session)
-        book = await book_service.get_book(book_id=book_id, session=session)
-
-        if book is None:
-            raise BookNotFoundException(f"Book {book_id} doesn't exist")
-        if user is None:
-            raise UserNotFoundException(f"User {user_email} doesn't exist")
+        await self.validate_review_targets(user_id, [book_id], session)
 
         review = Review(**review_data.model_dump())
-        review.user_id = user.id
+        review.user_id = user_id
         review.book_id = book_id
 
         session.add(review)
+        await self.update_rating_aggregates([review], session)
         await session.commit()
 
         return review
 
+    async def add_new_reviews(
+        self,
+        user_id: int,
+        reviews_data: list[ReviewBatchItemModel],
+        session: AsyncSession,
+    ) -> list[Review]:
+        """
+        Adds several reviews by a user in one go.
+
+        All referenced books are validated with a single query and the reviews are
+        written with one multi-row `INSERT ... RETURNING`. The batch is
+        all-or-nothing: if any book is missing, no review is inserted.
+
+        Args:
+            user_id (int): The ID of the user submitting the reviews.
+            reviews_data (list[ReviewBatchItemModel]): The reviews to create.
+            session (AsyncSession): The database session for executing queries.
+
+        Returns:
+            list[Review]: The newly created reviews, in request order.
+
+        Raises:
+            BookNotFoundException: If any of the books does not exist in the database
+                or is soft deleted.
+            UserNotFoundException: If the user does not exist in the database.
+        """
+        await self.validate_review_targets(
+            user_id, [review.book_id for review in reviews_data], session
+        )
+
+        created_at = datetime.now()
+        statement = (
+            insert(Review)
+            .values(
+                [
+                    {
+                        **review.model_dump(),
+                        "user_id": user_id,
+                        "created_at": created_at,
+                    }
+                    for review in reviews_data
+                ]
+            )
+            .returning(*Review.__table__.columns)
+        )
+        results = await session.exec(statement)
+        reviews = [Review(**row._mapping) for row in results.all()]
+        await self.update_rating_aggregates(reviews, session)
+        await session.commit()
+
+        return reviews
+
+    async def write_review_batch(
+        self, reviews_data: list[dict], session: AsyncSession
+    ) -> list[Review]:
+        """
+        Writes a batch of already validated reviews, as drained from the ingestion queue.
+
+        Reviews whose book was deleted after they were accepted are dropped. Reviews
+        carrying an idempotency key that was already written are skipped through
+        `ON CONFLICT DO NOTHING`, so redelivered queue entries are never duplicated.
+        Rating aggregates are updated once for the whole batch.
+
+        Args:
+            reviews_data (list[dict]): Review rows (text, rating, created_at, user_id,
+                book_id and idempotency_key).
+            session (AsyncSession): The database session for executing queries.
+
+        Returns:
+            list[Review]: The reviews that were actually inserted.
+        """
+        book_ids = list({review["book_id"] for review in reviews_data})
+        statement = select(Book.id).where(
+            Book.id == any_(literal(book_ids, pg.ARRAY(pg.UUID))),
+            Book.deleted_at.is_(None),
+        )
+        results = await session.exec(statement)
+        existing_book_ids = set(results.all())
+
+        rows = [
+            review for review in reviews_data if review["book_id"] in existing_book_ids
+        ]
+        if not rows:
+            return []
+
+        statement = (
+            pg.insert(Review)
+            .values(rows)
+            .on_conflict_do_nothing(
+                index_elements=["user_id", "idempotency_key", "created_at"],
+                index_where=Review.idempotency_key.isnot(None),
+            )
+            .returning(*Review.__table__.columns)
+        )
+        results = await session.exec(statement)
+        reviews = [Review(**row._mapping) for row in results.all()]
+        await self.update_rating_aggregates(reviews, session)
+        await session.commit()
+
+        return reviews
+
+    async def update_rating_aggregates(
+        self, reviews: list[Review], session: AsyncSession
+    ) -> None:
+        """
+        Adds a set of new reviews to the per-book rating aggregates.
+
+        All affected books are updated with one `UPDATE ... FROM (VALUES ...)`
+        statement, regardless of how many reviews or books are involved. The caller
+        is responsible for committing.
+
+        Args:
+            reviews (list[Review]): The newly written reviews.
+            session (AsyncSession): The database session for executing queries.
+        """
+        totals: dict[UUID, list[int]] = {}
+        for review in reviews:
+            book_totals = totals.setdefault(review.book_id, [0, 0])
+            book_totals[0] += 1
+            book_totals[1] += review.rating
+
+        if not totals:
+            return
+
+        batch = values(
+            column("book_id", pg.UUID),
+            column("review_count", Integer),
+            column("rating_sum", Integer),
+            name="batch",
+        ).data(
+            [
+                (book_id, count, rating_sum)
+                for book_id, (count, rating_sum) in totals.items()
+            ]
+        )
+        statement = (
+            update(Book)
+            .where(Book.id == batch.c.book_id)
+            .values(
+                review_count=Book.review_count + batch.c.review_count,
+                rating_sum=Book.rating_sum + batch.c.rating_sum,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await session.exec(statement)
+
+        # The cached books miss the new reviews. A copy cached again before the commit
+        # is evicted once the commit is notified.
+        for book_id in totals:
+            book_cache.evict(str(book_id))
+
 
 review_service = ReviewService()
 
@@ -0,0 +1,107 @@
+import asyncio
+import functools
+import inspect
+from typing import Any, Awaitable, Callable, Hashable
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.config import settings
+
+
+class SingleFlight:
+    """
+    Shares one in-flight call between concurrent identical calls.
+
+    The first call for a key runs in its own task, later calls for the same key
+    wait for that task instead of running again, until it finishes. The task isn't
+    cancelled with the call that started it, so the others still get its result.
+    """
+
+    def __init__(self) -> None:
+        self.executions = 0
+        self.coalesced = 0
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Parameters:
+        - key (Hashable): Identifies identical calls.
+        - call (Callable[[], Awaitable[Any]]): Runs the call.
+
+        Returns:
+        - Any: The result of the call, shared by all the calls with the same key
+          made while it ran.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(call())
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def metrics(self) -> dict:
+        """
+        Returns:
+        - dict: The number of executions, of calls served by another call's
+          execution and their share of all calls, and the calls in flight.
+        """
+        calls = self.executions + self.coalesced
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalescing_rate": round(self.coalesced / calls, 4) if calls else 0.0,
+            "in_flight": len(self._calls),
+        }
+
+
+# The single flight group of every coalesced function, by qualified name.
+single_flights: dict[str, SingleFlight] = {}
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+def coalesce(function: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Coalesces concurrent calls of an async service method with the same arguments.
+
+    Calls are keyed by the method and its arguments, except `self` and the database
+    session: the first call runs with its own arguments, its session included, so
+    it takes no other connection, and the other callers share its result. The
+    method must detach the entities it returns from that session, which the first
+    caller keeps using and closes, and load eagerly what the callers need from
+    them. Only use it for reads whose result depends on nothing but the arguments,
+    with the user passed explicitly when it matters, and don't mutate the result,
+    which is shared.
+
+    Parameters:
+    - function (Callable[..., Awaitable[Any]]): The method to coalesce.
+
+    Returns:
+    - Callable[..., Awaitable[Any]]: The coalescing method.
+    """
+    signature = inspect.signature(function)
+    group = single_flights[function.__qualname__] = SingleFlight()
+
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return await function(*args, **kwargs)
+
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        key = tuple(
+            (name, _freeze(value))
+            for name, value in arguments.arguments.items()
+            if name != "self" and not isinstance(value, AsyncSession)
+        )
+        return await group.do(key, lambda: function(*args, **kwargs))
+
+    return wrapper
@@ -6,12 +6,16 @@ from fastapi.security import HTTPBearer
 from fastapi.security.http import HTTPAuthorizationCredentials
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from src.app_logging import LoggingConfig
+from src.config import settings
 from src.db.main import get_session
-from src.redis import is_jti_in_blocklist
+from src.exceptions import ServiceUnavailableException
+from src.redis import get_token_version, is_jti_in_blocklist
 from src.users.domains import UserProfile
 from src.users.models import User
 from src.users.service import UserService
 
+logger = LoggingConfig.get_logger(__name__)
 user_service = UserService()
 
 
@@ -62,6 +66,31 @@ class TokenBearer(HTTPBearer):
         else:
             return False
 
+    async def is_revoked(self, token_data: dict) -> bool:
+        """
+        Check whether the token has been revoked.
+
+        A token is revoked when its version is lower than the current token version of
+        its user (see `revoke_user_tokens`) or, in `blocklist` revocation mode, when its
+        JTI is in the blocklist. The version lookup is usually served from a local
+        cache, so in `token_version` mode the check rarely needs a network call.
+
+        Parameters:
+        - token_data (dict): The decoded token payload.
+
+        Returns:
+        - bool: True if the token has been revoked, otherwise False.
+        """
+        user = token_data["user"]
+        if "id" in user:
+            current_version = await get_token_version(user["id"])
+            if user.get("token_version", 0) < current_version:
+                return True
+
+        if settings.TOKEN_REVOCATION_MODE == "blocklist":
+            return await is_jti_in_blocklist(token_data["jti"])
+        return False
+
     async def __call__(self, request: Request) -> HTTPAuthorizationCredentials | None:
         """
         Process authentication for incoming requests.
@@ -89,7 +118,7 @@ class TokenBearer(HTTPBearer):
                 detail="Token is invalid or has expired.",
             )
 
-        if await is_jti_in_blocklist(token_data["jti"]):
+        if await self.is_revoked(token_data):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail={
@@ -159,7 +188,7 @@ class RefreshTokenBearer(TokenBearer):
 
 async def get_current_user(
     token_details: dict = Depends(AccessTokenBearer()),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_session, scope="function"),
 ) -> User:
     """
     Retrieve the current authenticated user based on the provided access token.
@@ -186,6 +215,42 @@ async def get_current_user(
     return user
 
 
+async def get_current_user_or_claims(
+    token_details: dict = Depends(AccessTokenBearer()),
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> User:
+    """
+    Retrieve the current user, or the user described by the access token while the
+    database is unavailable.
+
+    The user built from the token only carries the ID, email and role it was issued
+    with, so only use it to authorise requests, e.g. in `RoleChecker`: reads that
+    can be served without the database, like stale books, then stay available.
+
+    Parameters:
+    - token_details (dict): The details extracted from the access token.
+    - session (AsyncSession): The database session to query for the user.
+
+    Returns:
+    - User: The current user, see `get_current_user`.
+
+    Raises:
+    - HTTPException (404): If the user does not exist in the database.
+    - ServiceUnavailableException: If the database is unavailable and the token has
+      no role claim.
+    """
+    try:
+        return await get_current_user(token_details, session)
+    except ServiceUnavailableException:
+        claims = token_details["user"]
+        if "role" not in claims:
+            raise
+        logger.warning(
+            f"Authorising {claims['email']} from the token claims, the database is unavailable"
+        )
+        return User(id=claims.get("id"), email=claims["email"], role=claims["role"])
+
+
 class RoleChecker:
     """
     A class to check if the current user has one of the allowed roles.
@@ -198,7 +263,7 @@ class RoleChecker:
         self.allowed_roles = allowed_roles
 
     def __call__(
-        self, current_user: User = Depends(get_current_user)
+        self, current_user: User = Depends(get_current_user_or_claims)
     ) -> Union[bool, Exception]:
         """
         Check if the current user has one of the allowed roles.
@@ -209,7 +274,8 @@ class RoleChecker:
         to access the resource. Otherwise, an HTTPException is raised.
 
         Parameters:
-        - current_user (User): The current authenticated user.
+        - current_user (User): The current authenticated user, or the user described
+          by the access token while the database is unavailable.
 
         Returns:
         - bool: True if the current user has a valid role.
@@ -6,6 +6,7 @@ from passlib.context import CryptContext
 
 from src.app_logging import LoggingConfig
 from src.config import settings
+from src.users.keyring import keyring
 
 logger = LoggingConfig.get_logger(__name__)
 
@@ -17,7 +18,7 @@ class UserProfile:
 
     Attributes:
         myctx (CryptContext): A cryptographic context for password hashing and verification.
-        JWT_ALGORITHM (str): The algorithm used for JWT token encoding and decoding.
+        JWT_ALGORITHM (str): The algorithm used for JWT tokens signed with a shared secret.
     """
 
     myctx = CryptContext(schemes=["sha256_crypt"])
@@ -56,15 +57,20 @@ class UserProfile:
         user_data: dict,
         expiry: datetime.timedelta = 3600,
         refresh: bool = False,
-        secret_key: str = settings.JWT_SECRET,
+        secret_key: str | None = None,
     ) -> str:
         """
         Creates a JWT token for authentication.
 
+        With an asymmetric `JWT_ALGORITHM` (and no `secret_key`), the token is signed
+        with the current signing key of the keyring and carries its `kid` header.
+
         Args:
             user_data (dict): The user-related data to be included in the token.
             expiry (datetime.timedelta, optional): Token expiry time in seconds. Defaults to 3600 seconds (1 hour).
             refresh (bool, optional): Indicates if the token is a refresh token. Defaults to False.
+            secret_key (str, optional): Signs the token with HS256 and this secret. Defaults to
+                `JWT_SECRET` when `JWT_ALGORITHM` is HS256.
 
         Returns:
             str: The generated JWT token.
@@ -77,20 +83,36 @@ class UserProfile:
             "refresh": refresh,
         }
 
-        token = jwt.encode(
+        if (
+            secret_key is not None
+            or settings.JWT_ALGORITHM == UserProfile.JWT_ALGORITHM
+        ):
+            return jwt.encode(
+                payload=payload,
+                key=secret_key or settings.JWT_SECRET,
+                algorithm=UserProfile.JWT_ALGORITHM,
+            )
+
+        kid, private_key = keyring.signing_key()
+        return jwt.encode(
             payload=payload,
-            key=secret_key,
-            algorithm=UserProfile.JWT_ALGORITHM,
+            key=private_key,
+            algorithm=settings.JWT_ALGORITHM,
+            headers={"kid": kid},
         )
-        return token
 
     @staticmethod
-    def decode_token(token: str, secret_key: str = settings.JWT_SECRET) -> dict | None:
+    def decode_token(token: str, secret_key: str | None = None) -> dict | None:
         """
         Decodes and validates a JWT token.
 
+        With an asymmetric `JWT_ALGORITHM` (and no `secret_key`), the token is verified
+        with the keyring's public key named by its `kid` header.
+
         Args:
             token (str): The JWT token to decode.
+            secret_key (str, optional): Verifies the token with HS256 and this secret.
+                Defaults to `JWT_SECRET` when `JWT_ALGORITHM` is HS256.
 
         Returns:
             dict: The decoded token data if valid.
@@ -101,12 +123,24 @@ class UserProfile:
             jwt.PyJWTError: If the token is invalid.
         """
         try:
-            token_data = jwt.decode(
-                jwt=token,
-                key=secret_key,
-                algorithms=[UserProfile.JWT_ALGORITHM],
+            if (
+                secret_key is not None
+                or settings.JWT_ALGORITHM == UserProfile.JWT_ALGORITHM
+            ):
+                return jwt.decode(
+                    jwt=token,
+                    key=secret_key or settings.JWT_SECRET,
+                    algorithms=[UserProfile.JWT_ALGORITHM],
+                )
+
+            kid = jwt.get_unverified_header(token).get("kid")
+            public_key = keyring.verification_key(kid)
+            if public_key is None:
+                logger.warning(f"No JWT key {kid} to verify the token with")
+                return None
+            return jwt.decode(
+                jwt=token, key=public_key, algorithms=[settings.JWT_ALGORITHM]
             )
-            return token_data
         except jwt.exceptions.ExpiredSignatureError:
             logger.warning(f"Token is Expired: {token}")
         except jwt.PyJWTError as ex:
@@ -0,0 +1,186 @@
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+from src.app_logging import LoggingConfig
+from src.config import settings
+
+logger = LoggingConfig.get_logger(__name__)
+
+# The key types accepted for each asymmetric algorithm, with the PyJWT algorithm used
+# to export their public part as a JWK.
+KEY_TYPES = {
+    "RS256": ((rsa.RSAPrivateKey, rsa.RSAPublicKey), RSAAlgorithm),
+    "EdDSA": ((ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey), OKPAlgorithm),
+}
+
+
+@dataclass
+class KeyEntry:
+    """A parsed key of the keyring, with the modification time of its file."""
+
+    mtime_ns: int
+    public_key: rsa.RSAPublicKey | ed25519.Ed25519PublicKey
+    private_key: rsa.RSAPrivateKey | ed25519.Ed25519PrivateKey | None = None
+
+
+class Keyring:
+    """
+    The JWT signing and verification keys, loaded from a directory of PEM files.
+
+    Every `<kid>.pem` file is a key identified by `kid`. Private keys can sign and
+    verify, public keys only verify, so a rotated out key can be kept (as its public
+    half) until the last token it signed has expired. Tokens are signed with the
+    private key named by `signing_kid`, or with the last private key in `kid` order.
+
+    The directory is scanned again at most every `reload_interval` seconds, so keys
+    can be added, rotated and removed without a restart. Parsed keys are cached per
+    `kid` and only parsed again when their file changes.
+    """
+
+    def __init__(
+        self,
+        directory: str | None,
+        algorithm: str,
+        signing_kid: str | None = None,
+        reload_interval: float = 60,
+    ) -> None:
+        self.directory = Path(directory) if directory else None
+        self.algorithm = algorithm
+        self.signing_kid = signing_kid
+        self.reload_interval = reload_interval
+        self._keys: dict[str, KeyEntry] = {}
+        self._reload_at = 0.0
+
+    def _parse(self, path: Path) -> KeyEntry:
+        key_types, _ = KEY_TYPES[self.algorithm]
+        pem = path.read_bytes()
+        if b"PRIVATE KEY" in pem:
+            private_key = serialization.load_pem_private_key(pem, password=None)
+            public_key = private_key.public_key()
+        else:
+            private_key = None
+            public_key = serialization.load_pem_public_key(pem)
+
+        if not isinstance(public_key, key_types):
+            raise ValueError(f"{path.name} is not a {self.algorithm} key")
+        return KeyEntry(path.stat().st_mtime_ns, public_key, private_key)
+
+    def reload(self) -> None:
+        """
+        Scans the key directory, parsing new and changed key files only.
+
+        A key file that can't be parsed is skipped (and its previous version kept),
+        so a half written file doesn't take the keyring down.
+        """
+        if self.directory is None:
+            raise RuntimeError("JWT_KEYS_DIR has to be set for asymmetric JWT signing")
+
+        keys = {}
+        for path in sorted(self.directory.glob("*.pem")):
+            kid = path.stem
+            entry = self._keys.get(kid)
+            try:
+                if entry is None or entry.mtime_ns != path.stat().st_mtime_ns:
+                    entry = self._parse(path)
+                    logger.info(f"Loaded JWT key {kid}")
+            except Exception as ex:
+                logger.error(f"Failed to load JWT key {kid}: {ex}")
+                if entry is None:
+                    continue
+            keys[kid] = entry
+
+        self._keys = keys
+        self._reload_at = time.monotonic() + self.reload_interval
+
+    def _current_keys(self) -> dict[str, KeyEntry]:
+        if time.monotonic() >= self._reload_at:
+            self.reload()
+        return self._keys
+
+    def signing_key(
+        self,
+    ) -> tuple[str, rsa.RSAPrivateKey | ed25519.Ed25519PrivateKey]:
+        """
+        Returns:
+            tuple: The `kid` and private key to sign new tokens with.
+
+        Raises:
+            RuntimeError: If there is no private key to sign with.
+        """
+        keys = self._current_keys()
+        if self.signing_kid is not None:
+            entry = keys.get(self.signing_kid)
+            if entry is None or entry.private_key is None:
+                raise RuntimeError(f"No private JWT key {self.signing_kid}")
+            return self.signing_kid, entry.private_key
+
+        private_kids = [kid for kid, entry in keys.items() if entry.private_key]
+        if not private_kids:
+            raise RuntimeError("No private JWT key to sign tokens with")
+        kid = max(private_kids)
+        return kid, keys[kid].private_key
+
+    def verification_key(
+        self, kid: str
+    ) -> rsa.RSAPublicKey | ed25519.Ed25519PublicKey | None:
+        """
+        Args:
+            kid (str): The `kid` header of the token to verify.
+
+        Returns:
+            The public key with that `kid`, or None if there is none.
+        """
+        entry = self._current_keys().get(kid)
+        return entry.public_key if entry is not None else None
+
+    def jwks(self) -> dict:
+        """
+        Returns:
+            dict: The public verification keys as a JSON Web Key Set.
+        """
+        _, jwk_algorithm = KEY_TYPES[self.algorithm]
+        return {
+            "keys": [
+                {
+                    **jwk_algorithm.to_jwk(entry.public_key, as_dict=True),
+                    "kid": kid,
+                    "use": "sig",
+                    "alg": self.algorithm,
+                }
+                for kid, entry in self._current_keys().items()
+            ]
+        }
+
+
+def generate_key(algorithm: str) -> bytes:
+    """
+    Generates a new private key for `algorithm`.
+
+    Args:
+        algorithm (str): `RS256` or `EdDSA`.
+
+    Returns:
+        bytes: The private key in PEM format.
+    """
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+
+
+keyring = Keyring(
+    settings.JWT_KEYS_DIR,
+    settings.JWT_ALGORITHM,
+    settings.JWT_SIGNING_KID,
+    settings.JWT_KEYS_RELOAD_INTERVAL,
+)
@@ -10,7 +10,7 @@ class User(SQLModel, table=True):
 
     id: int = Field(default=None, primary_key=True, nullable=False)
     username: str
-    email: str
+    email: str = Field(unique=True, index=True)
     first_name: str = Field(nullable=True)
     last_name: str = Field(nullable=True)
     password_hash: str = Field(exclude=True)
@@ -19,10 +19,18 @@ class User(SQLModel, table=True):
     created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
     updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
     books: List["Book"] = Relationship(
-        back_populates="user", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="user",
+        sa_relationship_kwargs={
+            "lazy": "selectin",
+            "primaryjoin": "and_(User.id == Book.user_id, Book.deleted_at == None)",
+        },
     )
     reviews: List["Review"] = Relationship(
-        back_populates="user", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="user",
+        sa_relationship_kwargs={
+            "lazy": "selectin",
+            "primaryjoin": "and_(User.id == Review.user_id, Review.deleted_at == None)",
+        },
     )
 
     def __repr__(self):
@@ -4,9 +4,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.app_logging import LoggingConfig
+from src.config import settings
 from src.db.main import get_session
 from src.exceptions import InvalidCredentials, UserAlreadyExists, UserNotFoundException
-from src.redis import add_jti_to_blocklist
+from src.negotiation import NegotiatedRoute
+from src.rate_limit import RateLimiter
+from src.redis import add_jti_to_blocklist, revoke_user_tokens
 from src.users.dependencies import (
     AccessTokenBearer,
     RefreshTokenBearer,
@@ -15,8 +18,10 @@ from src.users.dependencies import (
 from src.users.schemas import UserAuthModel, UserBookModel, UserCreateModel, UserModel
 from src.users.service import UserService
 
-user_router = APIRouter()
+user_router = APIRouter(route_class=NegotiatedRoute)
 role_checker = RoleChecker(["admin", "user"])
+signup_rate_limiter = RateLimiter("signup")
+login_rate_limiter = RateLimiter("login")
 logger = LoggingConfig.get_logger(__name__)
 
 
@@ -30,7 +35,7 @@ logger = LoggingConfig.get_logger(__name__)
     },
 )
 async def get_current_logged_in_user(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_session, scope="function"),
     token_details: dict = Depends(AccessTokenBearer()),
     user_service: UserService = Depends(UserService),
     _: Union[bool, Exception] = Depends(role_checker),
@@ -79,16 +84,18 @@ async def get_current_logged_in_user(
 
 @user_router.post(
     "/signup",
+    dependencies=[Depends(signup_rate_limiter)],
     status_code=status.HTTP_201_CREATED,
     response_model=UserModel,
     responses={
         409: {"description": "User already exists"},
+        429: {"description": "Too many requests"},
     },
 )
 async def create_user(
     user_data: UserCreateModel,
     user_service: UserService = Depends(UserService),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_session, scope="function"),
 ):
     """
     Creates a new user.
@@ -132,17 +139,19 @@ async def create_user(
 
 @user_router.post(
     "/auth/token",
+    dependencies=[Depends(login_rate_limiter)],
     status_code=status.HTTP_200_OK,
     responses={
         404: {"description": "User not found"},
         401: {"description": "Incorrect password"},
         400: {"description": "Bad Request"},
+        429: {"description": "Too many requests"},
     },
 )
 async def generate_token(
     auth_data: UserAuthModel,
     user_service: UserService = Depends(UserService),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_session, scope="function"),
 ) -> dict:
     """
     Generates an authentication token for a user.
@@ -244,8 +253,9 @@ async def revoke_token(token_data: dict = Depends(AccessTokenBearer())) -> dict:
     """
     Revoke access token to log out a user.
 
-    This endpoint invalidates the provided access token by adding its unique identifier (JTI)
-    to the blocklist, effectively logging the user out.
+    In `blocklist` revocation mode, this endpoint invalidates the provided access token by
+    adding its unique identifier (JTI) to the blocklist until the token expires, effectively
+    logging the user out. In `token_version` mode, all sessions of the user are revoked.
 
     Parameters:
     - token_data (dict): The decoded access token data, containing the JTI (unique token identifier).
@@ -259,8 +269,10 @@ async def revoke_token(token_data: dict = Depends(AccessTokenBearer())) -> dict:
     - HTTPException (500): If an unexpected error occurs while revoking the token.
     """
     try:
-        jti = token_data["jti"]
-        await add_jti_to_blocklist(jti)
+        if settings.TOKEN_REVOCATION_MODE == "token_version":
+            await revoke_user_tokens(token_data["user"]["id"])
+        else:
+            await add_jti_to_blocklist(token_data["jti"], token_data["exp"])
         return {"Message": "Logged out successfuly"}
     except Exception as ex:
         logger.error(
@@ -270,3 +282,38 @@ async def revoke_token(token_data: dict = Depends(AccessTokenBearer())) -> dict:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Something went wrong, couldn't revoke token",
         )
+
+
+@user_router.get(
+    "/auth/token/revoke-all",
+    status_code=status.HTTP_200_OK,
+    responses={
+        403: {"description": "Not authenticated"},
+        400: {"description": "Bad Request"},
+    },
+)
+async def revoke_all_tokens(token_data: dict = Depends(AccessTokenBearer())) -> dict:
+    """
+    Revoke all access and refresh tokens of the user, logging out all their sessions.
+
+    Parameters:
+    - token_data (dict): The decoded access token data.
+
+    Returns:
+    - dict: A message indicating successful logout.
+
+    Raises:
+    - HTTPException (403): If the user is not authenticated.
+    - HTTPException (500): If an unexpected error occurs while revoking the tokens.
+    """
+    try:
+        await revoke_user_tokens(token_data["user"]["id"])
+        return {"Message": "Logged out of all sessions successfully"}
+    except Exception as ex:
+        logger.error(
+            f"An error occurred while revoking all tokens for user '{token_data['user']['email']}'. Exception details: {ex}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Something went wrong, couldn't revoke tokens",
+        )
@@ -1,8 +1,9 @@
 from pydantic import EmailStr
-from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.exceptions import InvalidCredentials, UserAlreadyExists, UserNotFoundException
+from src.loaders import get_loaders
+from src.redis import get_token_version
 from src.users.domains import UserProfile
 from src.users.models import User
 from src.users.schemas import UserCreateModel
@@ -18,6 +19,9 @@ class UserService:
         """
         Retrieve a user by their email address.
 
+        Lookups are batched and memoised for the session (see `Loaders`), so the
+        dependencies and the route of a request share a single query.
+
         Parameters:
         - email (EmailStr): The email of the user to fetch.
         - session (AsyncSession): The database session.
@@ -25,14 +29,15 @@ class UserService:
         Returns:
         - User: The user object if found, otherwise None.
         """
-        statement = select(User).where(User.email == email)
-        results = await session.exec(statement)
-        return results.first()
+        return await get_loaders(session).user_by_email.load(email)
 
     async def get_user_by_id(self, id: int, session: AsyncSession) -> User:
         """
         Retrieve a user by their unique ID.
 
+        Lookups are batched and memoised for the session (see `Loaders`), users
+        already fetched by email included.
+
         Parameters:
         - id (int): The ID of the user.
         - session (AsyncSession): The database session.
@@ -40,9 +45,7 @@ class UserService:
         Returns:
         - User: The user object if found, otherwise None.
         """
-        statement = select(User).where(User.id == id)
-        results = await session.exec(statement)
-        return results.first()
+        return await get_loaders(session).user_by_id.load(id)
 
     async def create_new_user(
         self, user_data: UserCreateModel, session: AsyncSession
@@ -76,6 +79,8 @@ class UserService:
         user = User(**user_dict)
         session.add(user)
         await session.commit()
+        # Memoised as missing by the check above.
+        get_loaders(session).user_by_email.clear(user.email)
 
         return user
 
@@ -99,6 +104,9 @@ class UserService:
         """
         Authenticate a user and generate a token if credentials are valid.
 
+        The session is closed once the user is fetched, so no database connection is
+        held while the password is verified.
+
         Parameters:
         - email (EmailStr): The user's email.
         - password (str): The user's password.
@@ -112,6 +120,11 @@ class UserService:
         - InvalidCredentials: If the provided password is incorrect.
         """
         user = await self.get_user_by_email(email, session)
+
+        # Return the connection to the pool before the (deliberately slow) password
+        # check, so it's only held for the duration of the query.
+        await session.close()
+
         if not user:
             raise UserNotFoundException
 
@@ -119,7 +132,12 @@ class UserService:
         if not is_password_verified:
             raise InvalidCredentials
 
-        user_data = {"id": user.id, "email": email, "role": user.role}
+        user_data = {
+            "id": user.id,
+            "email": email,
+            "role": user.role,
+            "token_version": await get_token_version(user.id, use_cache=False),
+        }
         token = await self.create_auth_tokens(user_data)
 
         return token
@@ -0,0 +1,51 @@
+import asyncio
+from datetime import date, datetime
+from uuid import uuid4
+
+import pytest
+
+from src.books.models import Book
+from src.reviews.models import Review
+from src.users.models import User  # noqa:F401
+
+BOOK_COUNT = 1000
+REVIEWS_PER_BOOK = 10
+
+
+@pytest.fixture
+def run_async():
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def many_books():
+    now = datetime.now()
+    books = []
+    for index in range(BOOK_COUNT):
+        book = Book(
+            id=uuid4(),
+            title=f"Benchmark Book {index}",
+            author="John Doe",
+            publisher="Fictional Press",
+            published_date=date(2023, 5, 15),
+            page_count=250,
+            language="English",
+            created_at=now,
+            updated_at=now,
+            user_id=10,
+        )
+        book.reviews = [
+            Review(
+                id=index * REVIEWS_PER_BOOK + review_index,
+                text="Great book! Would’ve been 5 stars if it had pictures.",
+                rating=4,
+                created_at=now,
+                user_id=10,
+                book_id=book.id,
+            )
+            for review_index in range(REVIEWS_PER_BOOK)
+        ]
+        books.append(book)
+    return books
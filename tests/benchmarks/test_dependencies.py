@@ -0,0 +1,40 @@
+from starlette.requests import Request
+
+from src.users.dependencies import AccessTokenBearer
+from src.users.domains import UserProfile
+
+
+def build_request(token: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/books/",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+
+class TestTokenBearerBenchmarks:
+    def test_access_token_bearer_call(self, benchmark, run_async, monkeypatch):
+        async def mock_is_jti_in_blocklist(jti):
+            return False
+
+        async def mock_get_token_version(user_id):
+            return 0
+
+        monkeypatch.setattr(
+            "src.users.dependencies.is_jti_in_blocklist", mock_is_jti_in_blocklist
+        )
+        monkeypatch.setattr(
+            "src.users.dependencies.get_token_version", mock_get_token_version
+        )
+        token = UserProfile.generate_jwt_token(
+            {"id": 10, "email": "example@example.de", "role": "user"}
+        )
+        request = build_request(token)
+        token_bearer = AccessTokenBearer()
+
+        token_data = benchmark(lambda: run_async(token_bearer(request)))
+
+        assert token_data["user"]["email"] == "example@example.de"
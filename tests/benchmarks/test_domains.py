@@ -0,0 +1,41 @@
+import pytest
+
+from src.users.domains import UserProfile
+
+USER_DATA = {"id": 10, "email": "fake.user.potato@example.com", "role": "admin"}
+JWT_SECRET = "TacoTuesdayJWTSecretThatIsLongEnough"
+PASSWORD = "PineappleOnPizza!"
+PASSWORD_HASH = (
+    "$5$rounds=535000$VQoaVTVn3DuHQYTC$APDkEnrQm.hdgILd4rlRVNIZskJuNDOC/ONSQm7iTm7"
+)
+
+
+class TestUserProfileBenchmarks:
+    def test_generate_jwt_token(self, benchmark):
+        token = benchmark(
+            UserProfile.generate_jwt_token, user_data=USER_DATA, secret_key=JWT_SECRET
+        )
+
+        assert token.count(".") == 2
+
+    def test_decode_token(self, benchmark):
+        token = UserProfile.generate_jwt_token(
+            user_data=USER_DATA, secret_key=JWT_SECRET
+        )
+
+        token_data = benchmark(UserProfile.decode_token, token, secret_key=JWT_SECRET)
+
+        assert token_data["user"] == USER_DATA
+
+    def test_hash_password(self, benchmark):
+        password_hash = benchmark.pedantic(
+            UserProfile.hash_password, args=(PASSWORD,), rounds=5
+        )
+
+        assert password_hash.startswith("$5$")
+
+    @pytest.mark.parametrize("password", [PASSWORD, "WrongPassword!"])
+    def test_verify_password(self, benchmark, password):
+        benchmark.pedantic(
+            UserProfile.verify_password, args=(password, PASSWORD_HASH), rounds=5
+        )
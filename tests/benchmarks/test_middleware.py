@@ -0,0 +1,63 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+
+from src.middleware import register_middleware
+
+
+def build_app(with_middleware: bool) -> FastAPI:
+    app = FastAPI()
+    if with_middleware:
+        register_middleware(app)
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "OK"}
+
+    return app
+
+
+async def call_app(app: FastAPI) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("testserver", 80),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages[0]["status"]
+
+
+class TestMiddlewareBenchmarks:
+    @pytest.fixture(autouse=True)
+    def silence_request_logs(self):
+        logger = logging.getLogger("BookHive")
+        level = logger.level
+        logger.setLevel(logging.WARNING)
+        yield
+        logger.setLevel(level)
+
+    @pytest.mark.parametrize("with_middleware", [False, True])
+    def test_request_overhead(self, benchmark, run_async, with_middleware):
+        app = build_app(with_middleware)
+
+        status = benchmark(lambda: run_async(call_app(app)))
+
+        assert status == 200
@@ -0,0 +1,66 @@
+import json
+
+import msgpack
+from pydantic import TypeAdapter
+
+from src.books.schemas import BookDetailModel, BookModel
+
+
+def serialise(adapter: TypeAdapter, value) -> bytes:
+    # What FastAPI does with a route's return value: validate it against the
+    # response model from the ORM objects' attributes, then dump it to JSON.
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def serialise_msgpack(adapter: TypeAdapter, value) -> bytes:
+    # What `NegotiatedRoute` does for `Accept: application/msgpack`: dump the
+    # validated value to JSON compatible Python objects and pack them.
+    validated = adapter.validate_python(value, from_attributes=True)
+    return msgpack.packb(adapter.dump_python(validated, mode="json"))
+
+
+class TestSchemaBenchmarks:
+    def test_book_model_list(self, benchmark, many_books):
+        adapter = TypeAdapter(list[BookModel])
+
+        payload = benchmark(serialise, adapter, many_books)
+
+        assert payload.startswith(b"[")
+
+    def test_book_detail_model_list(self, benchmark, many_books):
+        adapter = TypeAdapter(list[BookDetailModel])
+
+        payload = benchmark(serialise, adapter, many_books)
+
+        assert b"reviews" in payload
+
+    def test_book_detail_model(self, benchmark, many_books):
+        adapter = TypeAdapter(BookDetailModel)
+
+        payload = benchmark(serialise, adapter, many_books[0])
+
+        assert b"reviews" in payload
+
+    def test_book_detail_model_list_msgpack(self, benchmark, many_books):
+        # The server side encoding time, to compare with test_book_detail_model_list.
+        adapter = TypeAdapter(list[BookDetailModel])
+
+        payload = benchmark(serialise_msgpack, adapter, many_books)
+
+        json_size = len(serialise(adapter, many_books))
+        benchmark.extra_info.update(json_bytes=json_size, msgpack_bytes=len(payload))
+        assert len(payload) < json_size
+
+    def test_book_detail_model_list_json_decode(self, benchmark, many_books):
+        payload = serialise(TypeAdapter(list[BookDetailModel]), many_books)
+
+        books = benchmark(json.loads, payload)
+
+        assert len(books) == len(many_books)
+
+    def test_book_detail_model_list_msgpack_decode(self, benchmark, many_books):
+        payload = serialise_msgpack(TypeAdapter(list[BookDetailModel]), many_books)
+
+        books = benchmark(msgpack.unpackb, payload)
+
+        assert len(books) == len(many_books)
@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from datetime import date, datetime
+from uuid import uuid4
+
+import pytest
+
+from src.books.models import Book
+from src.books.routes import STALE_WARNING
+from src.cache import book_cache, stale_book_cache
+from src.circuit_breaker import CircuitBreaker
+from src.db import main as db_main
+from src.db.main import get_session
+from src.main import app
+from src.users.domains import UserProfile
+
+books_prefix = "/api/books"
+
+
+class TestRoutes:
+    @pytest.mark.asyncio
+    async def test_get_book_serves_a_stale_book_while_the_database_is_down(
+        self, mocker, test_client
+    ):
+        # The real session, rejected by the open breaker as soon as it connects.
+        mocker.patch.dict(app.dependency_overrides)
+        app.dependency_overrides.pop(get_session, None)
+        breaker = CircuitBreaker("database", failure_threshold=1)
+        breaker.record_failure()
+        mocker.patch.object(db_main, "database_breaker", new=breaker)
+        mocker.patch("src.users.dependencies.get_token_version", return_value=0)
+        mocker.patch("src.users.dependencies.is_jti_in_blocklist", return_value=False)
+        mocker.patch.object(book_cache, "enabled", False)
+        mocker.patch.object(stale_book_cache, "_entries", OrderedDict())
+        book = Book(
+            id=uuid4(),
+            title="The Dummy Book",
+            author="John Doe",
+            publisher="Fictional Press",
+            published_date=date(2023, 5, 15),
+            page_count=250,
+            language="English",
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+            user_id=10,
+            reviews=[],
+        )
+        stale_book_cache.set(str(book.id), book)
+        token = UserProfile.generate_jwt_token(
+            {"id": 10, "email": "test.user@bookhive.de", "role": "user"}
+        )
+
+        response = test_client.get(
+            f"{books_prefix}/get-book/{book.id}",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["Warning"] == STALE_WARNING
+        assert response.json()["title"] == "The Dummy Book"
+        assert breaker.rejected >= 2
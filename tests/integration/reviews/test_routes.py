@@ -0,0 +1,93 @@
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+
+from src.exceptions import ServiceUnavailableException
+from src.main import app
+from src.reviews.routes import role_checker
+from src.reviews.service import ReviewService, get_review_service
+from src.users.domains import UserProfile
+
+reviews_prefix = "/api/reviews"
+
+
+@pytest.fixture
+def review_service(mocker):
+    mocker.patch("src.reviews.routes.settings.RATE_LIMIT_ENABLED", False)
+    mocker.patch("src.reviews.routes.settings.REVIEW_INGESTION_ASYNC", False)
+    mocker.patch("src.users.dependencies.get_token_version", return_value=0)
+    mocker.patch("src.users.dependencies.is_jti_in_blocklist", return_value=False)
+    service = AsyncMock(spec=ReviewService)
+    mocker.patch.dict(
+        app.dependency_overrides,
+        {role_checker: lambda: True, get_review_service: lambda: service},
+    )
+    return service
+
+
+@pytest.fixture
+def auth_headers():
+    token = UserProfile.generate_jwt_token(
+        {"id": 10, "email": "test.user@bookhive.de", "role": "user"}
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestRoutes:
+    @pytest.mark.asyncio
+    async def test_create_review_while_the_database_is_down(
+        self, test_client, review_service, auth_headers
+    ):
+        review_service.add_new_review.side_effect = ServiceUnavailableException(
+            "The database circuit breaker is open", retry_after=3
+        )
+
+        response = test_client.post(
+            f"{reviews_prefix}/create-review/{uuid4()}",
+            json={"text": "Great book", "rating": 4},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
+
+    @pytest.mark.asyncio
+    async def test_create_reviews_while_the_database_is_down(
+        self, test_client, review_service, auth_headers
+    ):
+        review_service.add_new_reviews.side_effect = ServiceUnavailableException(
+            "The database circuit breaker is open", retry_after=3
+        )
+
+        response = test_client.post(
+            f"{reviews_prefix}/batch",
+            json={
+                "reviews": [
+                    {"text": "Great book", "rating": 4, "book_id": str(uuid4())}
+                ]
+            },
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
+
+    @pytest.mark.asyncio
+    async def test_create_reviews_charges_the_rate_limit_per_review(
+        self, mocker, test_client, review_service, auth_headers
+    ):
+        charge = mocker.patch(
+            "src.reviews.routes.review_batch_rate_limiter.charge", AsyncMock()
+        )
+        review_service.add_new_reviews.return_value = []
+        review = {"text": "Great book", "rating": 4, "book_id": str(uuid4())}
+
+        response = test_client.post(
+            f"{reviews_prefix}/batch",
+            json={"reviews": [review] * 3},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 201
+        assert charge.call_args.kwargs["cost"] == 3
@@ -0,0 +1,258 @@
+"""
+Fixtures for the database-backed performance tier.
+
+The tier runs the app against a real, disposable Postgres and Redis. By default both
+are started from local binaries (`initdb`/`pg_ctl` and `redis-server`) in a temporary
+directory and torn down at the end of the session. Set `TEST_DATABASE_URL` and/or
+`TEST_REDIS_URL` to use already running servers instead; the database behind
+`TEST_DATABASE_URL` is wiped. The tier is skipped when neither is available.
+"""
+
+import asyncio
+import os
+import pwd
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+import redis.asyncio as redis
+from alembic import command
+from alembic.config import Config
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.config import settings
+from src.db.main import get_session
+from src.db.seed import SEED_EMAIL_TEMPLATE, seed_database
+from src.main import app
+from src.users.domains import UserProfile
+
+ROOT = Path(__file__).resolve().parents[2]
+POSTGRES_BIN_DIRS = sorted(Path("/usr/lib/postgresql").glob("*/bin"), reverse=True)
+
+SEED_USERS = 50
+SEED_BOOKS = 1000
+SEED_REVIEWS_PER_BOOK = 5
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def find_binary(name: str) -> str | None:
+    for directory in POSTGRES_BIN_DIRS:
+        if (directory / name).exists():
+            return str(directory / name)
+    return shutil.which(name)
+
+
+def as_postgres_user(cmd: list[str]) -> list[str]:
+    # initdb and postgres refuse to run as root.
+    if os.geteuid() != 0:
+        return cmd
+    try:
+        pwd.getpwnam("postgres")
+    except KeyError:
+        pytest.skip("Postgres cannot run as root and there is no postgres user")
+    return ["runuser", "-u", "postgres", "--", *cmd]
+
+
+@pytest.fixture(scope="session")
+def postgres_url():
+    if os.environ.get("TEST_DATABASE_URL"):
+        yield os.environ["TEST_DATABASE_URL"]
+        return
+
+    initdb, pg_ctl = find_binary("initdb"), find_binary("pg_ctl")
+    if initdb is None or pg_ctl is None:
+        pytest.skip("No local Postgres binaries and TEST_DATABASE_URL is not set")
+
+    directory = tempfile.mkdtemp(prefix="bookhive-pg-")
+    if os.geteuid() == 0:
+        shutil.chown(directory, "postgres")
+    data_dir = os.path.join(directory, "data")
+    port = free_port()
+
+    subprocess.run(
+        as_postgres_user(
+            [initdb, "-D", data_dir, "-U", "postgres", "--auth=trust", "-E", "UTF8"]
+        ),
+        check=True,
+        capture_output=True,
+    )
+    subprocess.run(
+        as_postgres_user(
+            [
+                pg_ctl,
+                "-D",
+                data_dir,
+                "-w",
+                "-l",
+                os.path.join(directory, "postgres.log"),
+                "-o",
+                f"-p {port} -k {directory} -c listen_addresses=127.0.0.1 "
+                "-c fsync=off -c synchronous_commit=off -c full_page_writes=off",
+                "start",
+            ]
+        ),
+        check=True,
+        capture_output=True,
+    )
+    try:
+        yield f"postgresql+asyncpg://postgres@127.0.0.1:{port}/postgres"
+    finally:
+        subprocess.run(
+            as_postgres_user([pg_ctl, "-D", data_dir, "-m", "immediate", "stop"]),
+            capture_output=True,
+        )
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def redis_url():
+    if os.environ.get("TEST_REDIS_URL"):
+        yield os.environ["TEST_REDIS_URL"]
+        return
+
+    redis_server = shutil.which("redis-server")
+    if redis_server is None:
+        pytest.skip("No local redis-server binary and TEST_REDIS_URL is not set")
+
+    port = free_port()
+    process = subprocess.Popen(
+        [redis_server, "--port", str(port), "--save", "", "--appendonly", "no"],
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                break
+        time.sleep(0.05)
+    try:
+        yield f"redis://127.0.0.1:{port}/0"
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@pytest.fixture(scope="session")
+def migrated_database(postgres_url):
+    """Resets the public schema and applies all Alembic migrations."""
+    database_url = settings.DATABASE_URL
+    settings.DATABASE_URL = postgres_url
+    try:
+        # migrations/env.py reads the URL from the settings.
+        async def reset_schema():
+            engine = create_async_engine(postgres_url)
+            async with engine.begin() as connection:
+                await connection.execute(text("DROP SCHEMA public CASCADE"))
+                await connection.execute(text("CREATE SCHEMA public"))
+            await engine.dispose()
+
+        asyncio.run(reset_schema())
+
+        config = Config(str(ROOT / "alembic.ini"))
+        config.set_main_option("script_location", str(ROOT / "migrations"))
+        command.upgrade(config, "head")
+        yield postgres_url
+    finally:
+        settings.DATABASE_URL = database_url
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def test_engine(migrated_database):
+    engine = create_async_engine(migrated_database)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def seeded_data(test_engine):
+    counts = await seed_database(
+        SEED_USERS,
+        SEED_BOOKS,
+        SEED_REVIEWS_PER_BOOK,
+        "zipf",
+        seed=42,
+        engine=test_engine,
+    )
+    user_id = counts["first_user_id"]
+    async with test_engine.connect() as connection:
+        book_id = (
+            await connection.execute(
+                text("SELECT id FROM book WHERE user_id = :user_id LIMIT 1"),
+                {"user_id": user_id},
+            )
+        ).scalar_one()
+
+    return {
+        "user_id": user_id,
+        "email": SEED_EMAIL_TEMPLATE.format(user_id),
+        "book_id": book_id,
+    }
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def test_redis_client(redis_url):
+    client = redis.Redis.from_url(redis_url)
+    yield client
+    await client.aclose()
+
+
+class QueryCounter:
+    """Counts the SQL statements sent to the database."""
+
+    def __init__(self) -> None:
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture
+def query_counter(test_engine):
+    counter = QueryCounter()
+    event.listen(test_engine.sync_engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(test_engine.sync_engine, "before_cursor_execute", counter)
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def perf_client(test_engine, test_redis_client, seeded_data, monkeypatch):
+    test_session = sessionmaker(
+        bind=test_engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    async def get_test_session():
+        async with test_session() as session:
+            yield session
+
+    monkeypatch.setattr("src.redis.redis_client", test_redis_client)
+    app.dependency_overrides[get_session] = get_test_session
+
+    token = UserProfile.generate_jwt_token(
+        {"id": seeded_data["user_id"], "email": seeded_data["email"], "role": "user"}
+    )
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://testserver",
+        headers={"Authorization": f"Bearer {token}"},
+    ) as client:
+        yield client
+
+    app.dependency_overrides.pop(get_session, None)
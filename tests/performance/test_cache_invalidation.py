@@ -0,0 +1,83 @@
+"""
+Cross-worker cache invalidation, against a local Postgres.
+
+The other workers are simulated by writing through a separate connection, the
+listener only learns about the change from the database.
+"""
+
+import asyncio
+
+import asyncpg
+import pytest
+from sqlalchemy import text
+
+from src.cache import LocalCache, LocalCaches
+from src.db.invalidation import CacheInvalidationListener, listener_dsn
+
+TIMEOUT = 5
+
+
+async def wait_until(condition) -> None:
+    async with asyncio.timeout(TIMEOUT):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+async def touch_book(test_engine, book_id) -> None:
+    async with test_engine.begin() as connection:
+        await connection.execute(
+            text("UPDATE book SET updated_at = now() WHERE id = :id"), {"id": book_id}
+        )
+
+
+@pytest.fixture
+def book_cache():
+    return LocalCache("book")
+
+
+@pytest.fixture
+def listener(migrated_database, book_cache):
+    caches = LocalCaches()
+    caches.register(book_cache)
+    return CacheInvalidationListener(listener_dsn(migrated_database), caches)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_committed_update_evicts_book(
+    test_engine, seeded_data, listener, book_cache
+):
+    key = str(seeded_data["book_id"])
+    task = asyncio.create_task(listener.run())
+    try:
+        await wait_until(lambda: book_cache.enabled)
+        book_cache.set(key, "cached book")
+
+        await touch_book(test_engine, seeded_data["book_id"])
+
+        await wait_until(lambda: book_cache.get(key) is None)
+    finally:
+        listener.stop()
+        await task
+
+    assert not book_cache.enabled
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_invalidation_missed_while_disconnected_is_backfilled(
+    test_engine, seeded_data, listener, book_cache
+):
+    key = str(seeded_data["book_id"])
+    connection = await asyncpg.connect(listener.dsn)
+    try:
+        listener.synced_at = await connection.fetchval("SELECT LOCALTIMESTAMP")
+        # Changed while the listener was away, the notification is lost.
+        await touch_book(test_engine, seeded_data["book_id"])
+
+        listener.caches.enable()
+        book_cache.set(key, "stale book")
+        replayed = await listener.backfill(connection)
+    finally:
+        await connection.close()
+
+    assert replayed >= 1
+    assert book_cache.get(key) is None
@@ -0,0 +1,62 @@
+"""
+Pool occupancy per request, against a seeded Postgres.
+
+A login spends most of its time hashing the password. The connection it borrowed
+for the user lookup has to be back in the pool by then, or a burst of logins
+exhausts the pool while the database sits idle.
+"""
+
+import time
+
+import pytest
+from sqlalchemy import event
+
+from src.db.seed import SEED_PASSWORD
+from src.users.domains import UserProfile
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_login_releases_connection_before_password_check(
+    perf_client, test_engine, seeded_data, monkeypatch
+):
+    pool = test_engine.sync_engine.pool
+    verify_password = UserProfile.verify_password
+    checked_out_during_verify = []
+
+    def tracking_verify_password(password: str, password_hash: str) -> bool:
+        checked_out_during_verify.append(pool.checkedout())
+        return verify_password(password, password_hash)
+
+    monkeypatch.setattr(
+        UserProfile, "verify_password", staticmethod(tracking_verify_password)
+    )
+
+    occupancy = []
+    checkout_times = {}
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checkout_times[id(connection_record)] = time.perf_counter()
+
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out_at = checkout_times.pop(id(connection_record), None)
+        if checked_out_at is not None:
+            occupancy.append(time.perf_counter() - checked_out_at)
+
+    event.listen(pool, "checkout", on_checkout)
+    event.listen(pool, "checkin", on_checkin)
+    try:
+        start_time = time.perf_counter()
+        response = await perf_client.post(
+            "/api/users/auth/token",
+            json={"email": seeded_data["email"], "password": SEED_PASSWORD},
+        )
+        request_time = time.perf_counter() - start_time
+    finally:
+        event.remove(pool, "checkout", on_checkout)
+        event.remove(pool, "checkin", on_checkin)
+
+    assert response.status_code == 200, response.text
+    assert checked_out_during_verify == [0]
+    assert not checkout_times
+    # The connection is held for the user lookup only, not for the password hash.
+    assert sum(occupancy) < request_time / 2
@@ -0,0 +1,133 @@
+"""
+Query count and latency budgets per endpoint, against a seeded Postgres.
+
+A failing query budget usually means an N+1 regression, e.g. a lazy loaded
+relationship like `Book.reviews` being touched once per row. Latency budgets can be
+scaled for slow machines with `PERF_LATENCY_FACTOR`.
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+LATENCY_FACTOR = float(os.environ.get("PERF_LATENCY_FACTOR", "1"))
+RUNS = 5
+
+BOOK = {
+    "title": "Performance Budget",
+    "author": "Perf Tester",
+    "publisher": "Bookhive Press",
+    "published_date": "2024-01-01",
+    "page_count": 321,
+    "language": "English",
+}
+
+
+def endpoint_requests(seeded_data: dict) -> dict:
+    book_id = seeded_data["book_id"]
+    return {
+        "list_books": ("GET", "/api/books/", {}),
+        "list_books_sparse": (
+            "GET",
+            "/api/books/",
+            {"params": {"fields": "id,title,author"}},
+        ),
+        "list_user_books": ("GET", "/api/books/current-user", {}),
+        "get_book": ("GET", f"/api/books/get-book/{book_id}", {}),
+        "batch_get_books": (
+            "POST",
+            "/api/books/batch-get",
+            {"json": {"ids": [str(book_id)] * 50, "include_ratings": True}},
+        ),
+        "book_changes": ("GET", "/api/books/changes", {"params": {"limit": 1000}}),
+        "get_current_user": ("GET", "/api/users/me", {}),
+        "update_book": ("PUT", f"/api/books/update-book/{book_id}", {"json": BOOK}),
+        "create_review": (
+            "POST",
+            f"/api/reviews/create-review/{book_id}",
+            {"json": {"text": "Within budget", "rating": 4}},
+        ),
+        "create_reviews": (
+            "POST",
+            "/api/reviews/batch",
+            {
+                "json": {
+                    "reviews": [
+                        {"text": "Within budget", "rating": 3, "book_id": str(book_id)}
+                    ]
+                    * 20
+                }
+            },
+        ),
+    }
+
+
+# endpoint, expected status, maximum queries per request, maximum latency in ms
+BUDGETS = [
+    ("list_books", 200, 8, 500),
+    ("list_books_sparse", 200, 7, 250),
+    ("list_user_books", 200, 7, 250),
+    ("get_book", 200, 7, 100),
+    ("batch_get_books", 200, 6, 100),
+    ("book_changes", 200, 6, 150),
+    ("get_current_user", 200, 6, 100),
+    ("update_book", 200, 6, 100),
+    ("create_review", 201, 8, 100),
+    ("create_reviews", 201, 8, 150),
+]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize("endpoint, status, max_queries, max_latency_ms", BUDGETS)
+async def test_endpoint_budget(
+    perf_client,
+    query_counter,
+    seeded_data,
+    endpoint,
+    status,
+    max_queries,
+    max_latency_ms,
+):
+    method, url, kwargs = endpoint_requests(seeded_data)[endpoint]
+
+    # Warm up connections, prepared statements and caches.
+    response = await perf_client.request(method, url, **kwargs)
+    assert response.status_code == status, response.text
+
+    latencies = []
+    for _ in range(RUNS):
+        query_counter.statements.clear()
+        start_time = time.perf_counter()
+        response = await perf_client.request(method, url, **kwargs)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+
+        assert response.status_code == status, response.text
+        assert query_counter.count <= max_queries, "\n\n".join(query_counter.statements)
+
+    assert max(latencies) <= max_latency_ms * LATENCY_FACTOR
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_concurrent_get_book_budget(
+    perf_client, query_counter, seeded_data, monkeypatch
+):
+    """Concurrent requests for an uncached book share the query of the first one."""
+    monkeypatch.setattr("src.books.service.book_cache.enabled", False)
+    method, url, kwargs = endpoint_requests(seeded_data)["get_book"]
+    budget = dict((endpoint, queries) for endpoint, _, queries, _ in BUDGETS)
+    requests = 10
+
+    responses = await asyncio.gather(
+        *(perf_client.request(method, url, **kwargs) for _ in range(requests))
+    )
+
+    assert [response.status_code for response in responses] == [200] * requests
+    book_loads = [
+        statement
+        for statement in query_counter.statements
+        if statement.lstrip().startswith("SELECT book.")
+    ]
+    assert len(book_loads) < requests, "\n\n".join(book_loads)
+    assert query_counter.count <= budget["get_book"] * requests
@@ -0,0 +1,438 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.books.models import Book
+from src.books.schemas import BookCreateModel, BookUpdateModel
+from src.books.service import BookService
+from src.cache import book_cache, stale_book_cache
+from src.exceptions import (
+    BookNotFoundException,
+    BookVersionMismatchException,
+    ChangesTokenExpiredException,
+    InvalidChangesTokenException,
+    ServiceUnavailableException,
+)
+from src.reviews.models import Review
+from src.users.models import User
+
+book_service = BookService()
+
+
+@pytest.fixture
+def book_update_data(dummy_book):
+    return BookUpdateModel(
+        title="The Updated Dummy Book",
+        author=dummy_book.author,
+        publisher=dummy_book.publisher,
+        published_date=dummy_book.published_date,
+        page_count=dummy_book.page_count,
+        language=dummy_book.language,
+    )
+
+
+class TestBookService:
+    @pytest.mark.asyncio
+    async def test_update_book_success(
+        self, mocker, dummy_book, book_update_data, mock_async_db_session
+    ):
+        row = mocker.MagicMock()
+        row._mapping = {
+            **dummy_book.model_dump(),
+            "title": book_update_data.title,
+            "version": 2,
+        }
+        mock_query = mocker.MagicMock()
+        mock_query.first.return_value = row
+        mock_async_db_session.exec.return_value = mock_query
+
+        book = await book_service.update_book(
+            dummy_book.id, book_update_data, mock_async_db_session
+        )
+
+        assert book.id == dummy_book.id
+        assert book.title == "The Updated Dummy Book"
+        assert book.version == 2
+        mock_async_db_session.exec.assert_called_once()
+        mock_async_db_session.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_update_book_not_found(
+        self, mocker, dummy_book, book_update_data, mock_async_db_session
+    ):
+        mock_query = mocker.MagicMock()
+        mock_query.first.return_value = None
+        mock_async_db_session.exec.return_value = mock_query
+
+        with pytest.raises(BookNotFoundException):
+            await book_service.update_book(
+                dummy_book.id, book_update_data, mock_async_db_session
+            )
+
+        mock_async_db_session.exec.assert_called_once()
+        mock_async_db_session.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_update_book_version_mismatch(
+        self, mocker, dummy_book, book_update_data, mock_async_db_session
+    ):
+        mock_update_query = mocker.MagicMock()
+        mock_update_query.first.return_value = None
+        mock_exists_query = mocker.MagicMock()
+        mock_exists_query.first.return_value = dummy_book.id
+        mock_async_db_session.exec.side_effect = [mock_update_query, mock_exists_query]
+
+        with pytest.raises(BookVersionMismatchException):
+            await book_service.update_book(
+                dummy_book.id,
+                book_update_data,
+                mock_async_db_session,
+                expected_version=1,
+            )
+
+        mock_async_db_session.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_delete_book_success(self, mocker, dummy_book, mock_async_db_session):
+        mock_query = mocker.MagicMock()
+        mock_query.scalar_one_or_none.return_value = dummy_book.id
+        mock_async_db_session.exec.return_value = mock_query
+
+        result = await book_service.delete_book(dummy_book.id, mock_async_db_session)
+
+        assert result is True
+        mock_async_db_session.exec.assert_called_once()
+        statement = mock_async_db_session.exec.call_args.args[0]
+        # The deletion is stamped in updated_at too, so the changes feed sees it.
+        assert str(statement).startswith(
+            "UPDATE book SET updated_at=now(), deleted_at=now()"
+        )
+        assert "book.deleted_at IS NULL" in str(statement)
+        mock_async_db_session.delete.assert_not_called()
+        mock_async_db_session.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_delete_book_not_found(
+        self, mocker, dummy_book, mock_async_db_session
+    ):
+        mock_query = mocker.MagicMock()
+        mock_query.scalar_one_or_none.return_value = None
+        mock_async_db_session.exec.return_value = mock_query
+
+        with pytest.raises(BookNotFoundException):
+            await book_service.delete_book(dummy_book.id, mock_async_db_session)
+
+        mock_async_db_session.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_all_books_skips_deleted_books(
+        self, mocker, dummy_book, mock_async_db_session
+    ):
+        mock_query = mocker.MagicMock()
+        mock_query.all.return_value = [dummy_book]
+        mock_async_db_session.exec.return_value = mock_query
+
+        result = await book_service.get_all_books(mock_async_db_session)
+
+        assert result == [dummy_book]
+        statement = mock_async_db_session.exec.call_args.args[0]
+        assert "book.deleted_at IS NULL" in str(statement)
+
+    def test_deleted_reviews_are_not_loaded_with_their_book(self):
+        assert "review.deleted_at IS NULL" in str(Book.reviews.property.primaryjoin)
+
+    def test_deleted_books_and_reviews_are_not_loaded_with_their_user(self):
+        assert "book.deleted_at IS NULL" in str(User.books.property.primaryjoin)
+        assert "review.deleted_at IS NULL" in str(User.reviews.property.primaryjoin)
+
+    def test_reviews_are_deleted_by_the_database(self):
+        (foreign_key,) = Review.__table__.c.book_id.foreign_keys
+
+        assert foreign_key.ondelete == "CASCADE"
+        assert Book.reviews.property.passive_deletes is True
+
+    @pytest.mark.asyncio
+    async def test_changes_token_round_trip(self, dummy_book):
+        token = book_service.encode_changes_token(dummy_book.updated_at, dummy_book.id)
+
+        assert book_service.decode_changes_token(token) == (
+            dummy_book.updated_at,
+            dummy_book.id,
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_book_changes_rejects_invalid_token(self, mock_async_db_session):
+        with pytest.raises(InvalidChangesTokenException):
+            await book_service.get_book_changes(
+                "not a token", 10, mock_async_db_session
+            )
+
+        mock_async_db_session.exec.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_book_changes_rejects_expired_token(
+        self, dummy_book, mock_async_db_session
+    ):
+        dummy_book.updated_at = datetime.now() - timedelta(days=31)
+        token = book_service.encode_changes_token(dummy_book.updated_at, dummy_book.id)
+
+        with pytest.raises(ChangesTokenExpiredException):
+            await book_service.get_book_changes(token, 10, mock_async_db_session)
+
+    @pytest.mark.asyncio
+    async def test_get_book_changes_resumes_after_token(
+        self, mocker, dummy_book, mock_async_db_session
+    ):
+        mock_query = mocker.MagicMock()
+        mock_query.all.return_value = [dummy_book, dummy_book, dummy_book]
+        mock_async_db_session.exec.return_value = mock_query
+        token = book_service.encode_changes_token(dummy_book.updated_at, dummy_book.id)
+
+        books, next_token, has_more = await book_service.get_book_changes(
+            token, 2, mock_async_db_session
+        )
+
+        assert books == [dummy_book, dummy_book]
+        assert next_token == token
+        assert has_more is True
+        statement = str(mock_async_db_session.exec.call_args.args[0])
+        assert "(book.updated_at, book.id) > (" in statement
+        assert "deleted_at" not in statement.split("WHERE")[1]
+        assert "ORDER BY book.updated_at, book.id" in statement
+
+    @pytest.mark.asyncio
+    async def test_get_book_changes_without_changes_moves_the_token_to_the_cutoff(
+        self, mocker, dummy_book, mock_async_db_session
+    ):
+        cutoff = datetime.now()
+        changes_query = mocker.MagicMock()
+        changes_query.all.return_value = []
+        cutoff_query = mocker.MagicMock()
+        cutoff_query.one.return_value = cutoff
+        mock_async_db_session.exec.side_effect = [changes_query, cutoff_query]
+        token = book_service.encode_changes_token(
+            datetime.now() - timedelta(days=29), dummy_book.id
+        )
+
+        books, next_token, has_more = await book_service.get_book_changes(
+            token, 10, mock_async_db_session
+        )
+
+        assert (books, has_more) == ([], False)
+        assert book_service.decode_changes_token(next_token) == (cutoff, UUID(int=0))
+        statement = str(mock_async_db_session.exec.call_args.args[0])
+        assert "localtimestamp" in statement
+
+    @pytest.mark.asyncio
+    async def test_create_book_is_stamped_by_the_database(
+        self, mocker, dummy_book, dummy_user, mock_async_db_session
+    ):
+        mocker.patch(
+            "src.books.service.user_service.get_user_by_id", return_value=dummy_user
+        )
+        mock_query = mocker.MagicMock()
+        mock_query.first.return_value = mocker.MagicMock(
+            _mapping=dummy_book.model_dump(exclude={"reviews"})
+        )
+        mock_async_db_session.exec.return_value = mock_query
+        book_data = BookCreateModel(
+            **dummy_book.model_dump(include=set(BookCreateModel.model_fields))
+        )
+
+        book = await book_service.create_book(
+            book_data, dummy_user.id, mock_async_db_session
+        )
+
+        assert book.id == dummy_book.id
+        statement = str(mock_async_db_session.exec.call_args.args[0])
+        assert statement.startswith("INSERT INTO book")
+        assert "now()" in statement
+        mock_async_db_session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_get_book_is_served_from_the_cache(
+        self, mocker, dummy_book, mock_async_db_session
+    ):
+        mocker.patch.object(book_cache, "enabled", True)
+        mocker.patch.object(book_cache, "_entries", OrderedDict())
+        mock_query = mocker.MagicMock()
+        mock_query.all.return_value = [dummy_book]
+        mock_async_db_session.exec.return_value = mock_query
+
+        first = await book_service.get_book(dummy_book.id, mock_async_db_session)
+        second = await book_service.get_book(dummy_book.id, mock_async_db_session)
+
+        assert first is second is dummy_book
+        mock_async_db_session.exec.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_book_detaches_the_shared_book(
+        self, mocker, dummy_book, mock_async_db_session
+    ):
+        mocker.patch.object(book_cache, "enabled", False)
+        mock_query = mocker.MagicMock()
+        mock_query.all.return_value = [dummy_book]
+        mock_async_db_session.exec.return_value = mock_query
+        mock_async_db_session.__contains__.return_value = True
+
+        book = await book_service.get_book(dummy_book.id, mock_async_db_session)
+
+        assert book is dummy_book
+        mock_async_db_session.expunge.assert_called_once_with(dummy_book)
+
+    @pytest.mark.asyncio
+    async def test_get_book_or_stale_serves_the_last_version_when_unavailable(
+        self, mocker, dummy_book, mock_async_db_session
+    ):
+        mocker.patch.object(stale_book_cache, "_entries", OrderedDict())
+        mock_query = mocker.MagicMock()
+        mock_query.all.return_value = [dummy_book]
+        mock_async_db_session.exec.return_value = mock_query
+        mock_async_db_session.execute.side_effect = ServiceUnavailableException(
+            "The database circuit breaker is open"
+        )
+
+        fresh = await book_service.get_book_or_stale(
+            dummy_book.id, mock_async_db_session
+        )
+        stale = await book_service.get_book_or_stale(
+            dummy_book.id, mock_async_db_session, ["id", "title"]
+        )
+
+        assert fresh == (dummy_book, False)
+        assert stale == (
+            {
+                "id": dummy_book.id,
+                "title": dummy_book.title,
+                "version": dummy_book.version,
+            },
+            True,
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_book_or_stale_raises_without_a_stale_version(
+        self, mocker, dummy_book, mock_async_db_session
+    ):
+        mocker.patch.object(stale_book_cache, "_entries", OrderedDict())
+        mock_async_db_session.exec.side_effect = ServiceUnavailableException(
+            "The database circuit breaker is open"
+        )
+
+        with pytest.raises(ServiceUnavailableException):
+            await book_service.get_book_or_stale(dummy_book.id, mock_async_db_session)
+
+    @pytest.mark.asyncio
+    async def test_delete_book_evicts_it_from_the_cache(
+        self, mocker, dummy_book, mock_async_db_session
+    ):
+        mocker.patch.object(book_cache, "enabled", True)
+        mocker.patch.object(book_cache, "_entries", OrderedDict())
+        book_cache.set(str(dummy_book.id), dummy_book)
+        mock_query = mocker.MagicMock()
+        mock_query.scalar_one_or_none.return_value = dummy_book.id
+        mock_async_db_session.exec.return_value = mock_query
+
+        await book_service.delete_book(dummy_book.id, mock_async_db_session)
+
+        assert book_cache.get(str(dummy_book.id)) is None
+
+    @pytest.mark.asyncio
+    async def test_get_all_books_selects_only_the_requested_fields(
+        self, mocker, dummy_book, mock_async_db_session
+    ):
+        row = mocker.MagicMock()
+        row._asdict.return_value = {"id": dummy_book.id, "title": dummy_book.title}
+        mock_query = mocker.MagicMock()
+        mock_query.all.return_value = [row]
+        mock_async_db_session.execute.return_value = mock_query
+
+        result = await book_service.get_all_books(
+            mock_async_db_session, ["id", "title"]
+        )
+
+        assert result == [{"id": dummy_book.id, "title": dummy_book.title}]
+        statement = str(mock_async_db_session.execute.call_args.args[0])
+        assert statement.startswith("SELECT book.id, book.title \nFROM book")
+        mock_async_db_session.exec.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_book_with_fields_selects_reviews_separately(
+        self, mocker, dummy_book, mock_async_db_session
+    ):
+        mocker.patch.object(book_cache, "enabled", False)
+        book_row = mocker.MagicMock()
+        book_row._asdict.return_value = {"id": dummy_book.id, "version": 1}
+        book_query = mocker.MagicMock()
+        book_query.first.return_value = book_row
+        review_query = mocker.MagicMock()
+        review_query.all.return_value = []
+        mock_async_db_session.execute.side_effect = [book_query, review_query]
+
+        result = await book_service.get_book(
+            dummy_book.id, mock_async_db_session, ["id", "reviews"]
+        )
+
+        assert result == {"id": dummy_book.id, "version": 1, "reviews": []}
+        book_statement, review_statement = (
+            str(call.args[0]) for call in mock_async_db_session.execute.call_args_list
+        )
+        assert book_statement.startswith("SELECT book.id, book.version \nFROM book")
+        assert "FROM review" in review_statement
+        assert "review.deleted_at IS NULL" in review_statement
+
+    @pytest.mark.asyncio
+    async def test_get_book_with_fields_projects_the_cached_book(
+        self, mocker, dummy_book, mock_async_db_session
+    ):
+        mocker.patch.object(book_cache, "enabled", True)
+        mocker.patch.object(book_cache, "_entries", OrderedDict())
+        book_cache.set(str(dummy_book.id), dummy_book)
+
+        result = await book_service.get_book(
+            dummy_book.id, mock_async_db_session, ["id", "title"]
+        )
+
+        assert result == {
+            "id": dummy_book.id,
+            "title": dummy_book.title,
+            "version": dummy_book.version,
+        }
+        mock_async_db_session.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_books_fetches_missing_books_in_one_query(
+        self, mocker, dummy_book, mock_async_db_session
+    ):
+        mocker.patch.object(book_cache, "enabled", True)
+        mocker.patch.object(book_cache, "_entries", OrderedDict())
+        cached_book = Book(**dummy_book.model_dump(exclude={"id"}), id=uuid4())
+        book_cache.set(str(cached_book.id), cached_book)
+        missing_id = uuid4()
+        mock_query = mocker.MagicMock()
+        mock_query.all.return_value = [dummy_book]
+        mock_async_db_session.exec.return_value = mock_query
+
+        books = await book_service.get_books(
+            [dummy_book.id, cached_book.id, missing_id, dummy_book.id],
+            mock_async_db_session,
+        )
+
+        assert books == {dummy_book.id: dummy_book, cached_book.id: cached_book}
+        statement = mock_async_db_session.exec.call_args.args[0]
+        assert "book.id = ANY (" in str(statement)
+        assert statement.compile().params["param_1"] == [dummy_book.id, missing_id]
+
+    @pytest.mark.asyncio
+    async def test_get_books_skips_the_query_when_all_are_cached(
+        self, mocker, dummy_book, mock_async_db_session
+    ):
+        mocker.patch.object(book_cache, "enabled", True)
+        mocker.patch.object(book_cache, "_entries", OrderedDict())
+        book_cache.set(str(dummy_book.id), dummy_book)
+
+        books = await book_service.get_books([dummy_book.id], mock_async_db_session)
+
+        assert books == {dummy_book.id: dummy_book}
+        mock_async_db_session.exec.assert_not_called()
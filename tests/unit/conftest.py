@@ -12,7 +12,9 @@ from src.users.models import User
 
 @pytest_asyncio.fixture
 async def mock_async_db_session():
-    yield AsyncMock(spec=AsyncSession)
+    session = AsyncMock(spec=AsyncSession)
+    session.info = {}
+    yield session
 
 
 @pytest_asyncio.fixture
@@ -0,0 +1,41 @@
+import pytest
+
+from src.db.audit import QueryRecorder, find_seq_scans
+
+
+class TestIndexAudit:
+    @pytest.mark.asyncio
+    async def test_find_seq_scans_nested_plan(self):
+        plan = {
+            "Node Type": "Hash Join",
+            "Plans": [
+                {"Node Type": "Seq Scan", "Relation Name": "review"},
+                {
+                    "Node Type": "Hash",
+                    "Plans": [
+                        {"Node Type": "Index Scan", "Relation Name": "book"},
+                    ],
+                },
+            ],
+        }
+
+        assert find_seq_scans(plan) == {"review"}
+
+    @pytest.mark.asyncio
+    async def test_find_seq_scans_index_only(self):
+        plan = {"Node Type": "Index Scan", "Relation Name": "user"}
+
+        assert find_seq_scans(plan) == set()
+
+    @pytest.mark.asyncio
+    async def test_query_recorder_only_records_labelled_statements(self):
+        recorder = QueryRecorder()
+
+        recorder(None, None, "SELECT 1", (), None, False)
+        recorder.label = "UserService.get_user_by_id"
+        recorder(None, None, "SAVEPOINT sa_savepoint_1", (), None, False)
+        recorder(None, None, 'SELECT * FROM "user" WHERE id = $1', (1,), None, False)
+
+        assert recorder.queries == [
+            ("UserService.get_user_by_id", 'SELECT * FROM "user" WHERE id = $1', (1,))
+        ]
@@ -0,0 +1,56 @@
+import time
+from uuid import UUID
+
+import pytest
+
+from src.db.ids import uuid7
+
+
+@pytest.fixture(autouse=True)
+def reset_uuid7_state(mocker):
+    mocker.patch("src.db.ids._last_timestamp_ms", 0)
+    mocker.patch("src.db.ids._last_counter", 0)
+
+
+class TestIds:
+    @pytest.mark.asyncio
+    async def test_uuid7_version_and_timestamp(self):
+        before_ms = time.time_ns() // 1_000_000
+        id = uuid7()
+        after_ms = time.time_ns() // 1_000_000
+
+        assert isinstance(id, UUID)
+        assert id.version == 7
+        assert id.variant == "specified in RFC 4122"
+        assert before_ms <= id.int >> 80 <= after_ms
+
+    @pytest.mark.asyncio
+    async def test_uuid7_is_monotonic_within_a_millisecond(self, mocker):
+        mocker.patch("src.db.ids.time.time_ns", return_value=1_700_000_000_000_000_000)
+
+        ids = [uuid7() for _ in range(1000)]
+
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+        assert {id.int >> 80 for id in ids} == {1_700_000_000_000}
+
+    @pytest.mark.asyncio
+    async def test_uuid7_stays_monotonic_when_the_clock_goes_back(self, mocker):
+        time_ns = mocker.patch(
+            "src.db.ids.time.time_ns", return_value=1_800_000_000_000_000_000
+        )
+        first = uuid7()
+        time_ns.return_value = 1_799_999_999_000_000_000
+
+        assert uuid7() > first
+
+    @pytest.mark.asyncio
+    async def test_uuid7_counter_overflow_moves_to_next_millisecond(self, mocker):
+        mocker.patch("src.db.ids.time.time_ns", return_value=1_900_000_000_000_000_000)
+        first = uuid7()
+        mocker.patch("src.db.ids._last_counter", (1 << 74) - 1)
+
+        second = uuid7()
+
+        assert second > first
+        assert second.int >> 80 == (first.int >> 80) + 1
@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import pytest
+
+from src.cache import LocalCache, LocalCaches
+from src.db.invalidation import (
+    BACKFILL_SLACK,
+    CacheInvalidationListener,
+    listener_dsn,
+)
+
+
+@pytest.fixture
+def book_cache():
+    return LocalCache("book")
+
+
+@pytest.fixture
+def listener(book_cache):
+    caches = LocalCaches()
+    caches.register(book_cache)
+    caches.enable()
+    return CacheInvalidationListener(dsn="postgresql://test", caches=caches)
+
+
+class TestCacheInvalidationListener:
+    def test_listener_dsn_drops_the_driver(self):
+        assert (
+            listener_dsn("postgresql+asyncpg://user:pass@db:5432/bookhive")
+            == "postgresql://user:pass@db:5432/bookhive"
+        )
+
+    def test_notification_evicts_entity(self, mocker, listener, book_cache):
+        book_cache.set("1", "book")
+        book_cache.set("2", "other book")
+
+        listener.handle_notification(
+            mocker.MagicMock(),
+            1,
+            "cache_invalidation",
+            '{"entity": "book", "key": "1"}',
+        )
+
+        assert book_cache.get("1") is None
+        assert book_cache.get("2") == "other book"
+
+    def test_malformed_notification_is_ignored(self, mocker, listener):
+        listener.handle_notification(
+            mocker.MagicMock(), 1, "cache_invalidation", "not json"
+        )
+
+    @pytest.mark.asyncio
+    async def test_backfill_without_sync_point_clears_caches(
+        self, mocker, listener, book_cache
+    ):
+        book_cache.set("1", "book")
+        connection = mocker.AsyncMock()
+
+        assert await listener.backfill(connection) == -1
+
+        assert book_cache.get("1") is None
+        connection.fetch.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_backfill_replays_missed_invalidations(
+        self, mocker, listener, book_cache
+    ):
+        listener.synced_at = datetime(2026, 10, 19, 12, 0)
+        book_cache.set("1", "book")
+        book_cache.set("2", "other book")
+        connection = mocker.AsyncMock()
+        connection.fetchval.return_value = False
+        connection.fetch.return_value = [{"entity": "book", "key": "1"}]
+
+        assert await listener.backfill(connection) == 1
+
+        assert book_cache.get("1") is None
+        assert book_cache.get("2") == "other book"
+        assert connection.fetch.call_args.args[1] == listener.synced_at - BACKFILL_SLACK
+
+    @pytest.mark.asyncio
+    async def test_caches_are_only_enabled_while_listening(
+        self, mocker, listener, book_cache
+    ):
+        connection = mocker.AsyncMock()
+        mocker.patch("src.db.invalidation.asyncpg.connect", return_value=connection)
+
+        async def heartbeat(query, *args):
+            # The caches serve entries once the listener has caught up.
+            assert book_cache.enabled
+            listener.stop()
+            return datetime(2026, 10, 19, 12, 0)
+
+        connection.fetchval.side_effect = heartbeat
+
+        await listener.run()
+
+        connection.add_listener.assert_called_once_with(
+            "cache_invalidation", listener.handle_notification
+        )
+        assert listener.synced_at == datetime(2026, 10, 19, 12, 0)
+        assert not book_cache.enabled
+        connection.close.assert_called_once()
@@ -0,0 +1,43 @@
+from datetime import date
+
+import pytest
+
+from src.db.partitions import add_months, create_partitions, partition_name
+
+
+class TestPartitions:
+    @pytest.mark.asyncio
+    async def test_add_months_wraps_years(self):
+        assert add_months(date(2026, 11, 1), 1) == date(2026, 12, 1)
+        assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+        assert add_months(date(2026, 1, 1), 25) == date(2028, 2, 1)
+
+    @pytest.mark.asyncio
+    async def test_partition_name(self):
+        assert partition_name("review", date(2026, 3, 1)) == "review_2026_03"
+
+    @pytest.mark.asyncio
+    async def test_create_partitions_skips_existing(
+        self, mocker, mock_async_db_session
+    ):
+        existing = mocker.MagicMock()
+        existing.scalars.return_value.all.return_value = [
+            "review_2026_11",
+            "review_2026_12",
+        ]
+        mock_async_db_session.execute.return_value = existing
+        session_factory = mocker.patch("src.db.partitions.async_session")
+        session_factory.return_value.__aenter__.return_value = mock_async_db_session
+
+        created = await create_partitions("review", 3, today=date(2026, 11, 19))
+
+        assert created == ["review_2027_01", "review_2027_02"]
+        statements = [
+            str(call.args[0]) for call in mock_async_db_session.execute.call_args_list
+        ]
+        assert (
+            "CREATE TABLE IF NOT EXISTS review_2027_01 PARTITION OF review "
+            "FOR VALUES FROM ('2027-01-01') TO ('2027-02-01')"
+        ) in statements
+        assert statements.count("SET LOCAL lock_timeout = '5s'") == 2
+        assert mock_async_db_session.commit.call_count == 2
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+import pytest
+import sqlalchemy.dialects.postgresql as pg
+
+from src.books.models import Book
+from src.db.purge import purge_batch, purge_deleted_rows, purge_orphan_reviews
+from src.reviews.models import Review
+
+
+class TestPurge:
+    @pytest.mark.asyncio
+    async def test_purge_batch_deletes_a_limited_batch(
+        self, mocker, mock_async_db_session
+    ):
+        mock_async_db_session.exec.return_value = mocker.MagicMock(rowcount=2)
+        session_factory = mocker.patch("src.db.purge.async_session")
+        session_factory.return_value.__aenter__.return_value = mock_async_db_session
+
+        deleted = await purge_batch(Book, datetime(2026, 1, 1), 100)
+
+        assert deleted == 2
+        statement = str(
+            mock_async_db_session.exec.call_args.args[0].compile(dialect=pg.dialect())
+        )
+        assert statement.startswith("DELETE FROM book")
+        assert "LIMIT" in statement
+        assert "FOR UPDATE SKIP LOCKED" in statement
+        mock_async_db_session.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_purge_deleted_rows_runs_until_a_batch_is_short(self, mocker):
+        purge_batch = mocker.patch(
+            "src.db.purge.purge_batch", side_effect=[10, 10, 3, 0]
+        )
+        delete_batch = mocker.patch("src.db.purge.delete_batch", side_effect=[10, 1])
+        sleep = mocker.patch("src.db.purge.asyncio.sleep")
+
+        purged = await purge_deleted_rows(timedelta(days=30), 10, 0.5)
+
+        assert purged == {"review": 34, "book": 0}
+        assert [call.args[0] for call in purge_batch.call_args_list] == [
+            Review,
+            Review,
+            Review,
+            Book,
+        ]
+        assert delete_batch.call_count == 2
+        assert sleep.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_reviews_of_purged_books_are_deleted_in_batches(
+        self, mocker, mock_async_db_session
+    ):
+        mock_async_db_session.exec.return_value = mocker.MagicMock(rowcount=0)
+        session_factory = mocker.patch("src.db.purge.async_session")
+        session_factory.return_value.__aenter__.return_value = mock_async_db_session
+
+        await purge_deleted_rows(timedelta(days=30), 10, 0)
+
+        statements = [
+            str(call.args[0].compile(dialect=pg.dialect()))
+            for call in mock_async_db_session.exec.call_args_list
+        ]
+        assert [statement.split()[2] for statement in statements] == [
+            "review",
+            "review",
+            "book",
+        ]
+        assert "review.book_id IN (SELECT book.id" in statements[1]
+        assert "LIMIT" in statements[1]
+
+    @pytest.mark.asyncio
+    async def test_purge_orphan_reviews(self, mocker, mock_async_db_session):
+        mock_async_db_session.exec.side_effect = [
+            mocker.MagicMock(rowcount=10),
+            mocker.MagicMock(rowcount=4),
+        ]
+        session_factory = mocker.patch("src.db.purge.async_session")
+        session_factory.return_value.__aenter__.return_value = mock_async_db_session
+        mocker.patch("src.db.purge.asyncio.sleep")
+
+        purged = await purge_orphan_reviews(10, 0)
+
+        assert purged == 14
+        statement = str(
+            mock_async_db_session.exec.call_args.args[0].compile(dialect=pg.dialect())
+        )
+        assert statement.startswith("DELETE FROM review")
+        assert "review.book_id IS NULL" in statement
@@ -0,0 +1,31 @@
+import random
+
+import pytest
+
+from src.db.seed import generate_reviews, reviews_per_book
+
+
+class TestSeed:
+    @pytest.mark.asyncio
+    async def test_reviews_per_book_zipf_is_skewed(self):
+        counts = reviews_per_book(1000, 5, "zipf", random.Random(42))
+
+        assert len(counts) == 1000
+        assert abs(sum(counts) - 5000) < 100
+        assert counts[0] > 100 * counts[-1]
+
+    @pytest.mark.asyncio
+    async def test_reviews_per_book_uniform(self):
+        counts = reviews_per_book(1000, 5, "uniform", random.Random(42))
+
+        assert set(counts) == {5}
+
+    @pytest.mark.asyncio
+    async def test_generate_reviews_follows_counts(self, dummy_book):
+        reviews = list(
+            generate_reviews([dummy_book.id], [3], range(1, 10), random.Random(42))
+        )
+
+        assert len(reviews) == 3
+        assert all(review[4] == dummy_book.id for review in reviews)
+        assert all(0 <= review[1] < 5 for review in reviews)
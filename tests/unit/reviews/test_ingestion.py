@@ -0,0 +1,178 @@
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src import redis
+from src.circuit_breaker import CircuitBreaker
+from src.exceptions import ServiceUnavailableException
+from src.reviews import ingestion
+from src.reviews.ingestion import (
+    ReviewIngestionWorker,
+    enqueue_review,
+    parse_review_entry,
+)
+
+
+class TestEnqueueReview:
+    @pytest.mark.asyncio
+    async def test_enqueue_review_success(self, mocker, dummy_book, dummy_review_data):
+        mock_script = mocker.patch.object(
+            ingestion, "ENQUEUE_SCRIPT", AsyncMock(return_value=b"1-0")
+        )
+
+        enqueued = await enqueue_review(1, dummy_book.id, dummy_review_data, "key-1")
+
+        assert enqueued is True
+        keys = mock_script.call_args.kwargs["keys"]
+        payload = json.loads(mock_script.call_args.kwargs["args"][0])
+        assert keys == ["review:idempotency:1:key-1", ingestion.REVIEW_STREAM]
+        assert payload["book_id"] == str(dummy_book.id)
+        assert payload["idempotency_key"] == "key-1"
+
+    @pytest.mark.asyncio
+    async def test_enqueue_review_duplicate(
+        self, mocker, dummy_book, dummy_review_data
+    ):
+        mocker.patch.object(ingestion, "ENQUEUE_SCRIPT", AsyncMock(return_value=None))
+
+        enqueued = await enqueue_review(1, dummy_book.id, dummy_review_data, "key-1")
+
+        assert enqueued is False
+
+    @pytest.mark.asyncio
+    async def test_enqueue_review_with_the_redis_breaker_open(
+        self, mocker, dummy_book, dummy_review_data
+    ):
+        breaker = CircuitBreaker("redis", failure_threshold=1)
+        breaker.record_failure()
+        mocker.patch.object(redis, "redis_breaker", new=breaker)
+        mock_script = mocker.patch.object(ingestion, "ENQUEUE_SCRIPT", AsyncMock())
+
+        with pytest.raises(ServiceUnavailableException):
+            await enqueue_review(1, dummy_book.id, dummy_review_data, "key-1")
+
+        mock_script.assert_not_called()
+
+
+class TestReviewIngestionWorker:
+    @pytest.fixture
+    def entries(self, dummy_book):
+        payload = json.dumps(
+            {
+                "text": "Loved it.",
+                "rating": 4,
+                "user_id": 1,
+                "book_id": str(dummy_book.id),
+                "created_at": "2026-10-19T10:00:00",
+                "idempotency_key": "key-1",
+            }
+        )
+        return [(b"1-0", {b"payload": payload.encode()})]
+
+    @pytest.mark.asyncio
+    async def test_parse_review_entry(self, dummy_book, entries):
+        review = parse_review_entry(entries[0][1])
+
+        assert review["book_id"] == dummy_book.id
+        assert review["created_at"].year == 2026
+
+    @pytest.mark.asyncio
+    async def test_flush_acknowledges_written_batch(
+        self, mocker, entries, mock_async_db_session
+    ):
+        mocker.patch.object(
+            ingestion, "async_session", return_value=mock_async_db_session
+        )
+        mock_async_db_session.__aenter__.return_value = mock_async_db_session
+        mock_write = mocker.patch.object(
+            ingestion.review_service, "write_review_batch", return_value=[]
+        )
+        mock_pipe = mocker.MagicMock()
+        mock_pipe.execute = AsyncMock()
+        mock_redis = mocker.patch.object(ingestion, "redis_client")
+        mock_redis.pipeline = mocker.MagicMock()
+        mock_redis.pipeline.return_value.__aenter__.return_value = mock_pipe
+
+        await ReviewIngestionWorker(consumer_name="test").flush(entries)
+
+        mock_write.assert_called_once()
+        mock_pipe.xack.assert_called_once_with(
+            ingestion.REVIEW_STREAM, ingestion.REVIEW_CONSUMER_GROUP, b"1-0"
+        )
+        mock_pipe.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_flush_leaves_failed_batch_pending(
+        self, mocker, entries, mock_async_db_session
+    ):
+        mocker.patch.object(
+            ingestion, "async_session", return_value=mock_async_db_session
+        )
+        mock_async_db_session.__aenter__.return_value = mock_async_db_session
+        mocker.patch.object(
+            ingestion.review_service,
+            "write_review_batch",
+            side_effect=Exception("Database Error"),
+        )
+        mock_redis = mocker.patch.object(ingestion, "redis_client")
+        mock_redis.xpending_range = AsyncMock(return_value=[])
+
+        await ReviewIngestionWorker(consumer_name="test").flush(entries)
+
+        mock_redis.pipeline.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_flush_dead_letters_malformed_entries(
+        self, mocker, entries, mock_async_db_session
+    ):
+        mocker.patch.object(
+            ingestion, "async_session", return_value=mock_async_db_session
+        )
+        mock_async_db_session.__aenter__.return_value = mock_async_db_session
+        mock_write = mocker.patch.object(
+            ingestion.review_service, "write_review_batch", return_value=[]
+        )
+        mock_pipe = mocker.MagicMock()
+        mock_pipe.execute = AsyncMock()
+        mock_redis = mocker.patch.object(ingestion, "redis_client")
+        mock_redis.pipeline = mocker.MagicMock()
+        mock_redis.pipeline.return_value.__aenter__.return_value = mock_pipe
+        malformed = (b"2-0", {b"payload": b"{"})
+
+        await ReviewIngestionWorker(consumer_name="test").flush([malformed, *entries])
+
+        mock_write.assert_called_once()
+        assert mock_pipe.xadd.call_args.args[0] == ingestion.REVIEW_DEAD_LETTER_STREAM
+        assert mock_pipe.xadd.call_args.args[1][b"entry_id"] == b"2-0"
+        mock_pipe.xack.assert_called_once_with(
+            ingestion.REVIEW_STREAM, ingestion.REVIEW_CONSUMER_GROUP, b"1-0", b"2-0"
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("times_delivered, dead_lettered", [(1, False), (5, True)])
+    async def test_flush_dead_letters_entries_failing_too_often(
+        self, mocker, entries, mock_async_db_session, times_delivered, dead_lettered
+    ):
+        mocker.patch.object(
+            ingestion, "async_session", return_value=mock_async_db_session
+        )
+        mock_async_db_session.__aenter__.return_value = mock_async_db_session
+        mocker.patch.object(
+            ingestion.review_service,
+            "write_review_batch",
+            side_effect=Exception("Database Error"),
+        )
+        mock_pipe = mocker.MagicMock()
+        mock_pipe.execute = AsyncMock()
+        mock_redis = mocker.patch.object(ingestion, "redis_client")
+        mock_redis.pipeline = mocker.MagicMock()
+        mock_redis.pipeline.return_value.__aenter__.return_value = mock_pipe
+        mock_redis.xpending_range = AsyncMock(
+            return_value=[{"message_id": b"1-0", "times_delivered": times_delivered}]
+        )
+
+        await ReviewIngestionWorker(consumer_name="test").flush(entries)
+
+        assert mock_pipe.xack.called is dead_lettered
+        assert mock_pipe.xadd.called is dead_lettered
@@ -1,25 +1,31 @@
+from uuid import uuid4
+
 import pytest
 
 from src.exceptions import BookNotFoundException, UserNotFoundException
+from src.reviews.schemas import ReviewBatchItemModel
 from src.reviews.service import ReviewService
 
 review_service = ReviewService()
 
 
+def mock_validation_result(mocker, user_exists, book_ids):
+    mock_query = mocker.MagicMock()
+    mock_query.one.return_value = (user_exists, book_ids)
+    return mock_query
+
+
 class TestReviewService:
     @pytest.mark.asyncio
     async def test_add_new_review_success(
         self, mocker, dummy_user, dummy_book, dummy_review_data, mock_async_db_session
     ):
-        mocker.patch(
-            "src.users.service.UserService.get_user_by_email",
-            return_value=dummy_user,
+        mock_async_db_session.exec.return_value = mock_validation_result(
+            mocker, True, [dummy_book.id]
         )
 
-        mocker.patch("src.books.service.BookService.get_book", return_value=dummy_book)
-
         review = await review_service.add_new_review(
-            "email@google.de", dummy_book.id, dummy_review_data, mock_async_db_session
+            dummy_user.id, dummy_book.id, dummy_review_data, mock_async_db_session
         )
 
         assert review is not None
@@ -27,6 +33,8 @@ class TestReviewService:
         assert review.rating == 4
         assert review.user_id == dummy_user.id
         assert review.book_id == dummy_book.id
+        # One query validates user and book, one updates the rating aggregates.
+        assert mock_async_db_session.exec.call_count == 2
         mock_async_db_session.add.assert_called_once()
         mock_async_db_session.commit.assert_called_once()
 
@@ -34,14 +42,13 @@ class TestReviewService:
     async def test_add_new_review_user_not_found(
         self, mocker, dummy_book, dummy_review_data, mock_async_db_session
     ):
-        mocker.patch(
-            "src.users.service.UserService.get_user_by_email",
-            return_value=None,
+        mock_async_db_session.exec.return_value = mock_validation_result(
+            mocker, False, [dummy_book.id]
         )
 
         with pytest.raises(UserNotFoundException):
             await review_service.add_new_review(
-                "email@google.de",
+                1,
                 dummy_book.id,
                 dummy_review_data,
                 mock_async_db_session,
@@ -54,16 +61,13 @@ class TestReviewService:
     async def test_add_new_review_book_not_found(
         self, mocker, dummy_user, dummy_book, dummy_review_data, mock_async_db_session
     ):
-        mocker.patch(
-            "src.users.service.UserService.get_user_by_email",
-            return_value=dummy_user,
+        mock_async_db_session.exec.return_value = mock_validation_result(
+            mocker, True, None
         )
 
-        mocker.patch("src.books.service.BookService.get_book", return_value=None)
-
         with pytest.raises(BookNotFoundException):
             await review_service.add_new_review(
-                "email@google.de",
+                dummy_user.id,
                 dummy_book.id,
                 dummy_review_data,
                 mock_async_db_session,
@@ -71,3 +75,102 @@ class TestReviewService:
 
         mock_async_db_session.add.assert_not_called()
         mock_async_db_session.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_add_new_reviews_success(
+        self, mocker, dummy_user, dummy_book, mock_async_db_session
+    ):
+        reviews_data = [
+            ReviewBatchItemModel(text="Loved it.", rating=4, book_id=dummy_book.id),
+            ReviewBatchItemModel(text="Meh.", rating=2, book_id=dummy_book.id),
+        ]
+        rows = []
+        for id, review in enumerate(reviews_data, start=1):
+            row = mocker.MagicMock()
+            row._mapping = {
+                "id": id,
+                **review.model_dump(),
+                "user_id": dummy_user.id,
+                "created_at": dummy_book.created_at,
+            }
+            rows.append(row)
+        mock_insert_query = mocker.MagicMock()
+        mock_insert_query.all.return_value = rows
+        mock_async_db_session.exec.side_effect = [
+            mock_validation_result(mocker, True, [dummy_book.id]),
+            mock_insert_query,
+            mocker.MagicMock(),
+        ]
+
+        reviews = await review_service.add_new_reviews(
+            dummy_user.id, reviews_data, mock_async_db_session
+        )
+
+        assert [review.text for review in reviews] == ["Loved it.", "Meh."]
+        assert all(review.user_id == dummy_user.id for review in reviews)
+        assert mock_async_db_session.exec.call_count == 3
+        mock_async_db_session.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_add_new_reviews_one_book_not_found(
+        self, mocker, dummy_user, dummy_book, mock_async_db_session
+    ):
+        reviews_data = [
+            ReviewBatchItemModel(text="Loved it.", rating=4, book_id=dummy_book.id),
+            ReviewBatchItemModel(text="Who wrote this?", rating=1, book_id=uuid4()),
+        ]
+        mock_async_db_session.exec.return_value = mock_validation_result(
+            mocker, True, [dummy_book.id]
+        )
+
+        with pytest.raises(BookNotFoundException):
+            await review_service.add_new_reviews(
+                dummy_user.id, reviews_data, mock_async_db_session
+            )
+
+        mock_async_db_session.exec.assert_called_once()
+        mock_async_db_session.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_write_review_batch_skips_deleted_books(
+        self, mocker, dummy_user, dummy_book, mock_async_db_session
+    ):
+        created_at = dummy_book.created_at
+        reviews_data = [
+            {
+                "text": "Loved it.",
+                "rating": 4,
+                "created_at": created_at,
+                "user_id": dummy_user.id,
+                "book_id": dummy_book.id,
+                "idempotency_key": "key-1",
+            },
+            {
+                "text": "Gone already.",
+                "rating": 1,
+                "created_at": created_at,
+                "user_id": dummy_user.id,
+                "book_id": uuid4(),
+                "idempotency_key": "key-2",
+            },
+        ]
+        mock_books_query = mocker.MagicMock()
+        mock_books_query.all.return_value = [dummy_book.id]
+        row = mocker.MagicMock()
+        row._mapping = {"id": 1, **reviews_data[0]}
+        mock_insert_query = mocker.MagicMock()
+        mock_insert_query.all.return_value = [row]
+        mock_async_db_session.exec.side_effect = [
+            mock_books_query,
+            mock_insert_query,
+            mocker.MagicMock(),
+        ]
+
+        reviews = await review_service.write_review_batch(
+            reviews_data, mock_async_db_session
+        )
+
+        assert [review.idempotency_key for review in reviews] == ["key-1"]
+        insert_statement = mock_async_db_session.exec.call_args_list[1].args[0]
+        assert "ON CONFLICT" in str(insert_statement)
+        mock_async_db_session.commit.assert_called_once()
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.admission import AdmissionController, request_priority
+from src.exceptions import RequestShedException
+from src.middleware import register_middleware
+
+BUDGETS = {"critical": 1000, "normal": 1000, "low": 20}
+
+
+class TestAdmission:
+    @pytest.mark.parametrize(
+        "method, path, priority",
+        [
+            ("GET", "/health", "critical"),
+            ("POST", "/api/users/auth/token", "critical"),
+            ("GET", "/api/books/", "low"),
+            ("GET", "/api/books/user/3", "low"),
+            ("POST", "/api/books/create-book", "normal"),
+            ("GET", "/api/books/get-book/1", "normal"),
+        ],
+    )
+    def test_request_priority(self, method, path, priority):
+        assert request_priority(method, path) == priority
+
+    @pytest.mark.asyncio
+    async def test_admits_up_to_the_share_of_the_class(self):
+        controller = AdmissionController(max_in_flight=4, queue_budgets_ms=BUDGETS)
+
+        for _ in range(2):
+            assert await controller.acquire("low") == 0.0
+
+        with pytest.raises(RequestShedException):
+            await controller.acquire("low")
+        assert await controller.acquire("critical") == 0.0
+        assert controller.in_flight == 3
+        assert controller.metrics()["classes"]["low"]["shed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_released_slot_goes_to_the_most_important_waiter(self):
+        controller = AdmissionController(max_in_flight=1, queue_budgets_ms=BUDGETS)
+        await controller.acquire("normal")
+
+        normal = asyncio.create_task(controller.acquire("normal"))
+        critical = asyncio.create_task(controller.acquire("critical"))
+        await asyncio.sleep(0)
+
+        controller.release()
+        await critical
+        assert not normal.done()
+
+        controller.release()
+        await normal
+        assert controller.in_flight == 1
+        assert controller.metrics()["classes"]["critical"]["admitted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        controller = AdmissionController(max_in_flight=1, queue_budgets_ms=BUDGETS)
+        await controller.acquire("normal")
+
+        waiter = asyncio.create_task(controller.acquire("normal"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        controller.release()
+        assert controller.in_flight == 0
+        assert controller.metrics()["classes"]["normal"]["queued"] == 0
+
+    def test_middleware_sheds_with_retry_after(self, mocker):
+        mocker.patch(
+            "src.middleware.admission_controller.acquire",
+            side_effect=RequestShedException("Shed a low request"),
+        )
+        app = FastAPI()
+        register_middleware(app)
+
+        @app.get("/api/books/")
+        async def list_books():
+            return []
+
+        response = TestClient(app).get("/api/books/")
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
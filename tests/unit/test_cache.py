@@ -0,0 +1,77 @@
+import pytest
+
+from src.cache import LocalCache, LocalCaches
+
+
+@pytest.fixture
+def caches():
+    caches = LocalCaches()
+    caches.register(LocalCache("book", max_size=2, ttl=60))
+    caches.register(LocalCache("user", max_size=2, ttl=60))
+    caches.enable()
+    return caches
+
+
+class TestLocalCache:
+    def test_disabled_cache_neither_stores_nor_serves(self):
+        cache = LocalCache("book")
+
+        cache.set("1", "book")
+
+        assert cache.get("1") is None
+        cache.enabled = True
+        assert cache.get("1") is None
+
+    def test_entries_expire(self, mocker):
+        monotonic = mocker.patch("src.cache.time.monotonic", return_value=100.0)
+        cache = LocalCache("book", ttl=10)
+        cache.enabled = True
+        cache.set("1", "book")
+
+        assert cache.get("1") == "book"
+        monotonic.return_value = 110.0
+        assert cache.get("1") is None
+
+    def test_least_recently_used_entry_is_dropped(self):
+        cache = LocalCache("book", max_size=2)
+        cache.enabled = True
+        cache.set("1", "first")
+        cache.set("2", "second")
+        cache.get("1")
+
+        cache.set("3", "third")
+
+        assert cache.get("1") == "first"
+        assert cache.get("2") is None
+        assert cache.get("3") == "third"
+
+
+class TestLocalCaches:
+    def test_invalidate_only_evicts_the_entity(self, caches):
+        book_cache, user_cache = caches._caches
+        book_cache.set("1", "book")
+        user_cache.set("1", "user")
+
+        caches.invalidate("book", "1")
+
+        assert book_cache.get("1") is None
+        assert user_cache.get("1") == "user"
+
+    def test_disable_drops_everything(self, caches):
+        book_cache, _ = caches._caches
+        book_cache.set("1", "book")
+
+        caches.disable()
+        caches.enable()
+
+        assert book_cache.get("1") is None
+
+    def test_stale_caches_survive_disable(self, caches):
+        stale_cache = caches.register(LocalCache("book", ttl=60, stale=True))
+        stale_cache.set("1", "book")
+
+        caches.disable()
+
+        assert stale_cache.get("1") == "book"
+        caches.invalidate("book", "1")
+        assert stale_cache.get("1") is None
@@ -0,0 +1,63 @@
+import pytest
+
+from src.circuit_breaker import CircuitBreaker
+from src.exceptions import ServiceUnavailableException
+
+
+@pytest.fixture
+def clock(mocker):
+    clock = mocker.patch("src.circuit_breaker.time.monotonic", return_value=100.0)
+    return clock
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("database", failure_threshold=2, reset_timeout=10)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self, breaker):
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.check()
+
+        breaker.record_failure()
+
+        with pytest.raises(ServiceUnavailableException) as ex:
+            breaker.check()
+        assert ex.value.retry_after == 10
+        assert breaker.metrics() == {
+            "state": "open",
+            "failures": 2,
+            "opened": 1,
+            "rejected": 1,
+        }
+
+    def test_lets_one_trial_through_after_the_reset_timeout(self, breaker, clock):
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.return_value = 110.0
+
+        breaker.check(trial=False)
+        breaker.check()
+
+        assert breaker.state == "half_open"
+        with pytest.raises(ServiceUnavailableException):
+            breaker.check()
+        breaker.record_success()
+        assert breaker.state == "closed"
+        breaker.check()
+
+    def test_failed_trial_reopens(self, breaker, clock):
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.return_value = 110.0
+        breaker.check()
+
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        assert breaker.opened == 1
+        with pytest.raises(ServiceUnavailableException):
+            breaker.check()
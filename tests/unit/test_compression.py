@@ -0,0 +1,96 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from src import compression
+from src.compression import CompressionMiddleware, negotiate_encoding
+
+BOOKS = [{"title": f"Book {index}", "author": "Bookhive"} for index in range(100)]
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/books")
+    async def books():
+        return BOOKS
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse(
+            iter([b"x" * 2048, b"y" * 2048]), media_type="text/plain"
+        )
+
+    @app.get("/image")
+    async def image():
+        return PlainTextResponse(b"\x89PNG" * 1024, media_type="image/png")
+
+    return TestClient(app)
+
+
+class TestCompression:
+    @pytest.mark.parametrize(
+        "accept_encoding, encoding",
+        [
+            ("gzip, deflate, br, zstd", "zstd"),
+            ("gzip, br", "br"),
+            ("gzip;q=1.0, br;q=0.5", "gzip"),
+            ("br;q=0, *", "zstd"),
+            ("zstd;q=0, br;q=0, *;q=0.1", "gzip"),
+            ("identity", None),
+            ("gzip;q=0", None),
+            ("", None),
+        ],
+    )
+    def test_negotiate_encoding(self, accept_encoding, encoding):
+        assert negotiate_encoding(accept_encoding) == encoding
+
+    @pytest.mark.parametrize("encoding", ["zstd", "br", "gzip"])
+    def test_compresses_large_responses(self, client, encoding):
+        response = client.get("/books", headers={"Accept-Encoding": encoding})
+
+        assert response.headers["content-encoding"] == encoding
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert response.json() == BOOKS
+
+    def test_skips_small_and_uncompressible_responses(self, client):
+        for path in ("/health", "/image", "/stream"):
+            response = client.get(path, headers={"Accept-Encoding": "gzip"})
+
+            assert "content-encoding" not in response.headers
+
+    def test_skips_clients_without_a_supported_coding(self, client):
+        response = client.get("/books", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert response.json() == BOOKS
+
+    def test_reuses_compressed_bodies(self, mocker, client):
+        compress = mocker.MagicMock(side_effect=compression.CODECS["gzip"])
+        mocker.patch.dict(compression.CODECS, {"gzip": compress})
+
+        for _ in range(3):
+            response = client.get("/books", headers={"Accept-Encoding": "gzip"})
+            assert response.json() == BOOKS
+
+        compress.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_compresses_large_bodies_in_a_thread(self, mocker):
+        to_thread = mocker.patch(
+            "src.compression.asyncio.to_thread", return_value=b"compressed"
+        )
+        middleware = CompressionMiddleware(
+            None, thread_minimum_size=10, cache_max_size=0
+        )
+
+        assert await middleware.compress(b"x" * 10, "gzip") == b"compressed"
+        to_thread.assert_called_once_with(compression.CODECS["gzip"], b"x" * 10)
@@ -0,0 +1,28 @@
+import pytest
+
+from src.load_test import LoadTestRecorder, percentile
+
+
+class TestLoadTest:
+    @pytest.mark.asyncio
+    async def test_percentile(self):
+        values = [float(value) for value in range(1, 101)]
+
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile(values, 100) == 100.0
+        assert percentile([], 50) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_report(self):
+        recorder = LoadTestRecorder()
+        recorder.latencies["login"] = [0.1, 0.2, 0.3, 0.4]
+        recorder.errors["login"] = 1
+
+        report = recorder.report(duration=2)
+
+        assert report["requests"] == 4
+        assert report["errors"] == 1
+        assert report["throughput_rps"] == 2.0
+        assert report["steps"]["login"]["latency_ms"]["p50"] == 200.0
+        assert report["steps"]["login"]["latency_ms"]["max"] == 400.0
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from src.loaders import DataLoader, get_loaders
+from src.users.service import UserService
+
+
+class TestDataLoader:
+    @pytest.mark.asyncio
+    async def test_coalesces_concurrent_lookups(self, mocker):
+        batch_load = mocker.AsyncMock(side_effect=lambda keys: {1: "one", 2: "two"})
+        loader = DataLoader(batch_load)
+
+        results = await asyncio.gather(
+            loader.load(1), loader.load(2), loader.load(1), loader.load(3)
+        )
+
+        assert results == ["one", "two", "one", None]
+        batch_load.assert_awaited_once_with([1, 2, 3])
+
+    @pytest.mark.asyncio
+    async def test_memoises_results(self, mocker):
+        batch_load = mocker.AsyncMock(return_value={1: "one"})
+        loader = DataLoader(batch_load)
+
+        assert await loader.load(1) == "one"
+        assert await loader.load_many([1, 2]) == ["one", None]
+        assert await loader.load(2) is None
+
+        assert batch_load.await_args_list == [mocker.call([1]), mocker.call([2])]
+
+    @pytest.mark.asyncio
+    async def test_clear_and_prime(self, mocker):
+        batch_load = mocker.AsyncMock(return_value={1: "new"})
+        loader = DataLoader(batch_load)
+        loader.prime(1, "old")
+
+        assert await loader.load(1) == "old"
+        loader.clear(1)
+        assert await loader.load(1) == "new"
+        batch_load.assert_awaited_once_with([1])
+
+    @pytest.mark.asyncio
+    async def test_retries_failed_lookups(self, mocker):
+        batch_load = mocker.AsyncMock(side_effect=[Exception("Database Error"), {}])
+        loader = DataLoader(batch_load)
+
+        with pytest.raises(Exception, match="Database Error"):
+            await loader.load(1)
+        assert await loader.load(1) is None
+
+
+class TestLoaders:
+    @pytest.mark.asyncio
+    async def test_loaders_are_scoped_to_the_session(self, mock_async_db_session):
+        assert get_loaders(mock_async_db_session) is get_loaders(mock_async_db_session)
+
+    @pytest.mark.asyncio
+    async def test_users_fetched_by_email_are_memoised_by_id(
+        self, mocker, dummy_user, mock_async_db_session
+    ):
+        mock_query = mocker.MagicMock()
+        mock_query.all.return_value = [dummy_user]
+        mock_async_db_session.exec.return_value = mock_query
+        user_service = UserService()
+
+        by_email = await user_service.get_user_by_email(
+            dummy_user.email, mock_async_db_session
+        )
+        by_id = await user_service.get_user_by_id(dummy_user.id, mock_async_db_session)
+
+        assert by_email is by_id is dummy_user
+        mock_async_db_session.exec.assert_called_once()
+        statement = str(mock_async_db_session.exec.call_args.args[0])
+        assert '"user".email = ANY (' in statement
+
+    @pytest.mark.asyncio
+    async def test_emails_differing_only_by_case_are_different_users(
+        self, mocker, mock_async_db_session
+    ):
+        lower = mocker.MagicMock(id=1, email="reader@example.com")
+        upper = mocker.MagicMock(id=2, email="Reader@example.com")
+        mock_query = mocker.MagicMock()
+        mock_query.all.return_value = [upper, lower]
+        mock_async_db_session.exec.return_value = mock_query
+        loader = get_loaders(mock_async_db_session).user_by_email
+
+        users = await loader.load_many(
+            ["reader@example.com", "Reader@example.com", "READER@example.com"]
+        )
+
+        assert users == [lower, upper, None]
+        mock_async_db_session.exec.assert_called_once()
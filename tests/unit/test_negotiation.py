@@ -0,0 +1,144 @@
+import uuid
+from datetime import date
+
+import msgpack
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, Response
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from src.negotiation import NegotiatedRoute, accepts_msgpack
+
+MSGPACK = "application/msgpack"
+BOOK_ID = uuid.UUID("0192b5a4-3c2e-7d10-8000-000000000001")
+
+
+class Book(BaseModel):
+    id: uuid.UUID
+    title: str
+    published_date: date
+
+
+def get_reader() -> str:
+    return "anonymous"
+
+
+@pytest.fixture
+def client():
+    router = APIRouter(route_class=NegotiatedRoute)
+
+    @router.get("/books", response_model=list[Book])
+    async def books():
+        return [Book(id=BOOK_ID, title="Dune", published_date=date(1965, 8, 1))]
+
+    @router.post("/books", response_model=Book, status_code=201)
+    async def create_book(book: Book):
+        return book
+
+    @router.get("/books/{book_id}", response_model=Book)
+    async def get_book(book_id: uuid.UUID, response: Response):
+        response.headers["ETag"] = '"1"'
+        return Book(id=book_id, title="Dune", published_date=date(1965, 8, 1))
+
+    @router.get("/reader")
+    async def reader(name: str = Depends(get_reader)):
+        return {"name": name}
+
+    @router.post("/reviews", status_code=202)
+    async def create_review():
+        return JSONResponse({"message": "Review accepted"}, status_code=202)
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+class TestNegotiation:
+    @pytest.mark.parametrize(
+        "accept, expected",
+        [
+            (MSGPACK, True),
+            ("application/x-msgpack", True),
+            ("application/msgpack, application/json", True),
+            ("application/json;q=0.5, application/msgpack", True),
+            ("application/msgpack;q=0.5, application/json", False),
+            ("application/msgpack;q=0.5, */*", False),
+            ("application/json", False),
+            ("*/*", False),
+            ("", False),
+        ],
+    )
+    def test_accepts_msgpack(self, accept, expected):
+        assert accepts_msgpack(accept) is expected
+
+    def test_responds_in_msgpack(self, client):
+        response = client.get("/books", headers={"Accept": MSGPACK})
+
+        assert response.headers["content-type"] == MSGPACK
+        assert response.headers["vary"] == "Accept"
+        assert msgpack.unpackb(response.content) == [
+            {"id": str(BOOK_ID), "title": "Dune", "published_date": "1965-08-01"}
+        ]
+
+    def test_serialises_response_models_straight_to_msgpack(self, mocker, client):
+        from_json = mocker.patch("src.negotiation.from_json")
+
+        response = client.get(f"/books/{BOOK_ID}", headers={"Accept": MSGPACK})
+
+        assert response.headers["content-type"] == MSGPACK
+        assert msgpack.unpackb(response.content)["published_date"] == "1965-08-01"
+        from_json.assert_not_called()
+
+    def test_applies_dependency_overrides_to_msgpack_requests(self, client):
+        client.app.dependency_overrides[get_reader] = lambda: "Paul"
+
+        response = client.get("/reader", headers={"Accept": MSGPACK})
+
+        assert msgpack.unpackb(response.content) == {"name": "Paul"}
+
+    def test_responds_in_json_by_default(self, client):
+        response = client.get("/books")
+
+        assert response.headers["content-type"] == "application/json"
+        assert response.json()[0]["id"] == str(BOOK_ID)
+
+    def test_reads_msgpack_bodies(self, client):
+        body = {"id": str(BOOK_ID), "title": "Dune", "published_date": "1965-08-01"}
+
+        response = client.post(
+            "/books",
+            content=msgpack.packb(body),
+            headers={"Content-Type": MSGPACK, "Accept": MSGPACK},
+        )
+
+        assert response.status_code == 201
+        assert msgpack.unpackb(response.content) == body
+
+    def test_rejects_invalid_msgpack_bodies(self, client):
+        response = client.post(
+            "/books", content=b"\xc1", headers={"Content-Type": MSGPACK}
+        )
+
+        assert response.status_code == 400
+
+    def test_validates_msgpack_bodies(self, client):
+        response = client.post(
+            "/books",
+            content=msgpack.packb({"title": "Dune"}),
+            headers={"Content-Type": MSGPACK},
+        )
+
+        assert response.status_code == 422
+
+    def test_keeps_headers_set_by_routes(self, client):
+        response = client.get(f"/books/{BOOK_ID}", headers={"Accept": MSGPACK})
+
+        assert response.headers["etag"] == '"1"'
+        assert msgpack.unpackb(response.content)["id"] == str(BOOK_ID)
+
+    def test_negotiates_responses_built_by_routes(self, client):
+        response = client.post("/reviews", headers={"Accept": MSGPACK})
+
+        assert response.status_code == 202
+        assert msgpack.unpackb(response.content) == {"message": "Review accepted"}
@@ -0,0 +1,149 @@
+import pytest
+from fastapi import Response
+from fastapi.exceptions import HTTPException
+
+from src import redis
+from src.circuit_breaker import CircuitBreaker
+from src.rate_limit import RateLimit, RateLimiter, TokenBucket
+from src.users.domains import UserProfile
+
+
+@pytest.fixture
+def mock_request(mocker):
+    request = mocker.MagicMock()
+    request.headers = {}
+    request.client.host = "10.0.0.1"
+    return request
+
+
+@pytest.fixture
+def mock_redis_breaker(mocker):
+    return mocker.patch.object(
+        redis, "redis_breaker", new=CircuitBreaker("redis", failure_threshold=1)
+    )
+
+
+@pytest.fixture
+def mock_gcra_script(mocker, mock_redis_breaker):
+    return mocker.patch("src.rate_limit.GCRA_SCRIPT", new_callable=mocker.AsyncMock)
+
+
+class TestRateLimit:
+    def test_parse(self):
+        assert RateLimit.parse("10/minute") == RateLimit(limit=10, period=60)
+
+    @pytest.mark.parametrize("value", ["10", "0/minute", "ten/minute", "10/week"])
+    def test_parse_invalid(self, value):
+        with pytest.raises(ValueError):
+            RateLimit.parse(value)
+
+    def test_token_bucket_runs_dry(self):
+        bucket = TokenBucket(capacity=2, rate=0.001)
+
+        assert bucket.take() is True
+        assert bucket.take() is True
+        assert bucket.take() is False
+        assert bucket.retry_after() > 0
+
+    def test_token_bucket_takes_the_cost(self):
+        bucket = TokenBucket(capacity=5, rate=1)
+
+        assert bucket.take(3) is True
+        assert bucket.take(3) is False
+        assert 0 < bucket.retry_after(3) <= 1
+
+
+class TestRateLimiter:
+    @pytest.mark.asyncio
+    async def test_allowed_request_gets_headers(self, mock_request, mock_gcra_script):
+        mock_gcra_script.return_value = [1, 9, 0, 6000]
+        response = Response()
+
+        await RateLimiter("login")(mock_request, response)
+
+        assert mock_gcra_script.call_args.kwargs["keys"] == [
+            "ratelimit:login:ip:10.0.0.1"
+        ]
+        assert response.headers["RateLimit-Limit"] == "10"
+        assert response.headers["RateLimit-Remaining"] == "9"
+        assert response.headers["RateLimit-Reset"] == "6"
+
+    @pytest.mark.asyncio
+    async def test_rejected_request_is_blocked_locally_afterwards(
+        self, mock_request, mock_gcra_script
+    ):
+        mock_gcra_script.return_value = [0, 0, 4500, 60000]
+        rate_limiter = RateLimiter("login")
+
+        for _ in range(2):
+            with pytest.raises(HTTPException) as ex:
+                await rate_limiter(mock_request, Response())
+            assert ex.value.status_code == 429
+            assert ex.value.headers["Retry-After"] == "5"
+
+        mock_gcra_script.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_burst_is_absorbed_by_local_bucket(
+        self, mock_request, mock_gcra_script
+    ):
+        mock_gcra_script.return_value = [1, 0, 0, 60000]
+        rate_limiter = RateLimiter("signup")
+
+        for _ in range(5):
+            await rate_limiter(mock_request, Response())
+        with pytest.raises(HTTPException) as ex:
+            await rate_limiter(mock_request, Response())
+
+        assert ex.value.status_code == 429
+        assert mock_gcra_script.call_count == 5
+
+    @pytest.mark.asyncio
+    async def test_charge_counts_the_cost(self, mock_request, mock_gcra_script):
+        mock_gcra_script.return_value = [1, 280, 0, 4000]
+        rate_limiter = RateLimiter("create_reviews")
+
+        await rate_limiter.charge(mock_request, Response(), cost=20)
+
+        assert mock_gcra_script.call_args.kwargs["args"] == [200, 60000, 20]
+        with pytest.raises(HTTPException) as ex:
+            await rate_limiter.charge(mock_request, Response(), cost=281)
+        assert ex.value.status_code == 429
+        mock_gcra_script.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_allows_request(self, mock_request, mock_gcra_script):
+        mock_gcra_script.side_effect = ConnectionError("Redis is down")
+
+        await RateLimiter("login")(mock_request, Response())
+
+    @pytest.mark.asyncio
+    async def test_open_redis_breaker_skips_the_check(
+        self, mock_request, mock_gcra_script, mock_redis_breaker
+    ):
+        mock_redis_breaker.record_failure()
+
+        await RateLimiter("login")(mock_request, Response())
+
+        mock_gcra_script.assert_not_called()
+        assert mock_redis_breaker.rejected == 1
+
+    @pytest.mark.asyncio
+    async def test_per_user_key(self, mock_request, mock_gcra_script):
+        mock_gcra_script.return_value = [1, 29, 0, 2000]
+        token = UserProfile.generate_jwt_token({"id": 7, "email": "a@b.de"})
+        mock_request.headers = {"Authorization": f"Bearer {token}"}
+
+        await RateLimiter("create_review", per_user=True)(mock_request, Response())
+
+        assert mock_gcra_script.call_args.kwargs["keys"] == [
+            "ratelimit:create_review:user:7"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, mocker, mock_request, mock_gcra_script):
+        mocker.patch("src.rate_limit.settings.RATE_LIMIT_ENABLED", False)
+
+        await RateLimiter("login")(mock_request, Response())
+
+        mock_gcra_script.assert_not_called()
@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from src import redis
+from src.circuit_breaker import CircuitBreaker
+from src.exceptions import ServiceUnavailableException
+
+
+@pytest.fixture
+def mock_redis_client(mocker):
+    mocker.patch.dict(redis._token_versions, clear=True)
+    mocker.patch.dict(redis._revoked_jtis, clear=True)
+    mocker.patch.object(
+        redis, "redis_breaker", new=CircuitBreaker("redis", failure_threshold=2)
+    )
+    return mocker.patch.object(redis, "redis_client", new=mocker.AsyncMock())
+
+
+class TestRedis:
+    @pytest.mark.asyncio
+    async def test_blocklist_entry_expires_with_the_token(self, mock_redis_client):
+        await redis.add_jti_to_blocklist("jti", int(time.time()) + 7200)
+
+        ttl = mock_redis_client.set.call_args.kwargs["ex"]
+        assert 7100 < ttl <= 7200
+
+    @pytest.mark.asyncio
+    async def test_token_version_is_cached(self, mock_redis_client):
+        mock_redis_client.get.return_value = b"4"
+
+        assert await redis.get_token_version(7) == 4
+        assert await redis.get_token_version(7) == 4
+        mock_redis_client.get.assert_called_once_with("token_version:7")
+
+    @pytest.mark.asyncio
+    async def test_token_version_can_bypass_the_cache(self, mock_redis_client):
+        mock_redis_client.get.side_effect = [b"4", b"5"]
+
+        assert await redis.get_token_version(7) == 4
+        assert await redis.get_token_version(7, use_cache=False) == 5
+        assert await redis.get_token_version(7) == 5
+        assert mock_redis_client.get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_revoke_user_tokens_updates_the_local_cache(self, mock_redis_client):
+        mock_redis_client.get.return_value = None
+        mock_redis_client.incr.return_value = 1
+
+        assert await redis.get_token_version(7) == 0
+        assert await redis.revoke_user_tokens(7) == 1
+        assert await redis.get_token_version(7) == 1
+        mock_redis_client.get.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_revoked_jtis_are_remembered(self, mock_redis_client):
+        mock_redis_client.ttl.return_value = 600
+
+        assert await redis.is_jti_in_blocklist("revoked") is True
+        assert await redis.is_jti_in_blocklist("revoked") is True
+        mock_redis_client.ttl.assert_called_once_with("revoked")
+
+    @pytest.mark.asyncio
+    async def test_jti_check_fails_closed(self, mock_redis_client):
+        mock_redis_client.ttl.side_effect = redis.redis.ConnectionError("refused")
+
+        with pytest.raises(ServiceUnavailableException):
+            await redis.is_jti_in_blocklist("jti")
+
+    @pytest.mark.asyncio
+    async def test_jti_check_fails_open_with_the_local_revocations(
+        self, mocker, mock_redis_client
+    ):
+        mocker.patch("src.redis.settings.JTI_CHECK_FAILURE_POLICY", "fail_open")
+        mock_redis_client.set.side_effect = redis.redis.ConnectionError("refused")
+        mock_redis_client.ttl.side_effect = redis.redis.ConnectionError("refused")
+
+        with pytest.raises(ServiceUnavailableException):
+            await redis.add_jti_to_blocklist("revoked", int(time.time()) + 600)
+
+        assert await redis.is_jti_in_blocklist("revoked") is True
+        assert await redis.is_jti_in_blocklist("jti") is False
+        # The breaker opened after two failures, Redis isn't called anymore.
+        assert await redis.is_jti_in_blocklist("other") is False
+        assert mock_redis_client.ttl.call_count == 1
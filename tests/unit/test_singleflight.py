@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.singleflight import SingleFlight, coalesce, single_flights
+
+
+class Catalogue:
+    def __init__(self) -> None:
+        self.lookups = 0
+        self.release = asyncio.Event()
+
+    @coalesce
+    async def get_book(self, book_id: int, session, fields: list[str] | None = None):
+        self.lookups += 1
+        self.session = session
+        await self.release.wait()
+        return {"id": book_id, "fields": fields}
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_share_one_execution(
+        self, mock_async_db_session
+    ):
+        catalogue = Catalogue()
+        group = single_flights["Catalogue.get_book"]
+        executions, coalesced = group.executions, group.coalesced
+
+        calls = [
+            asyncio.create_task(catalogue.get_book(1, mock_async_db_session)),
+            asyncio.create_task(catalogue.get_book(1, session=mock_async_db_session)),
+            asyncio.create_task(catalogue.get_book(2, mock_async_db_session)),
+            asyncio.create_task(catalogue.get_book(2, mock_async_db_session, ["id"])),
+        ]
+        await asyncio.sleep(0)
+        catalogue.release.set()
+        results = await asyncio.gather(*calls)
+
+        assert results[0] is results[1]
+        assert [result["id"] for result in results] == [1, 1, 2, 2]
+        assert catalogue.lookups == 3
+        assert group.executions - executions == 3
+        assert group.coalesced - coalesced == 1
+
+    @pytest.mark.asyncio
+    async def test_calls_after_completion_execute_again(self, mock_async_db_session):
+        catalogue = Catalogue()
+        catalogue.release.set()
+
+        await catalogue.get_book(1, mock_async_db_session)
+        await catalogue.get_book(1, mock_async_db_session)
+
+        assert catalogue.lookups == 2
+
+    @pytest.mark.asyncio
+    async def test_calls_run_on_the_session_of_the_first_caller(
+        self, mocker, mock_async_db_session
+    ):
+        other_session = mocker.AsyncMock(spec=AsyncSession)
+        catalogue = Catalogue()
+
+        calls = [
+            asyncio.create_task(catalogue.get_book(1, session))
+            for session in (mock_async_db_session, other_session)
+        ]
+        await asyncio.sleep(0)
+        catalogue.release.set()
+        await asyncio.gather(*calls)
+
+        assert catalogue.lookups == 1
+        assert catalogue.session is mock_async_db_session
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, mocker, mock_async_db_session):
+        mocker.patch("src.singleflight.settings.SINGLE_FLIGHT_ENABLED", False)
+        catalogue = Catalogue()
+
+        calls = [
+            asyncio.create_task(catalogue.get_book(1, mock_async_db_session))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        catalogue.release.set()
+        await asyncio.gather(*calls)
+
+        assert catalogue.lookups == 2
+        assert catalogue.session is mock_async_db_session
+
+    @pytest.mark.asyncio
+    async def test_cancelling_the_first_call_keeps_the_execution(self):
+        group = SingleFlight()
+        release = asyncio.Event()
+
+        async def lookup():
+            await release.wait()
+            return "book"
+
+        first = asyncio.create_task(group.do("book", lookup))
+        second = asyncio.create_task(group.do("book", lookup))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == "book"
+        assert group.metrics() == {
+            "executions": 1,
+            "coalesced": 1,
+            "coalescing_rate": 0.5,
+            "in_flight": 0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared(self):
+        group = SingleFlight()
+
+        async def lookup():
+            await asyncio.sleep(0)
+            raise ValueError("Database Error")
+
+        results = await asyncio.gather(
+            group.do("book", lookup), group.do("book", lookup), return_exceptions=True
+        )
+
+        assert [str(result) for result in results] == ["Database Error"] * 2
+        assert group.executions == 1
@@ -2,12 +2,14 @@ import pytest
 from fastapi.exceptions import HTTPException
 from fastapi.security import HTTPBearer
 
+from src.exceptions import ServiceUnavailableException
 from src.users.dependencies import (
     AccessTokenBearer,
     RefreshTokenBearer,
     RoleChecker,
     TokenBearer,
     get_current_user,
+    get_current_user_or_claims,
 )
 from src.users.domains import UserProfile
 from src.users.service import UserService
@@ -193,6 +195,31 @@ class TestTokenBearer:
             "resolution": "Please get a new token",
         }
 
+    @pytest.mark.asyncio
+    async def test_is_revoked_by_token_version(self, mocker):
+        mocker.patch("src.users.dependencies.get_token_version", return_value=2)
+        mock_is_jti_in_blocklist = mocker.patch(
+            "src.users.dependencies.is_jti_in_blocklist"
+        )
+        token_data = {"user": {"id": 7, "token_version": 1}, "jti": "jti"}
+
+        assert await TokenBearer().is_revoked(token_data) is True
+        mock_is_jti_in_blocklist.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_is_revoked_token_version_mode_skips_blocklist(self, mocker):
+        mocker.patch(
+            "src.users.dependencies.settings.TOKEN_REVOCATION_MODE", "token_version"
+        )
+        mocker.patch("src.users.dependencies.get_token_version", return_value=2)
+        mock_is_jti_in_blocklist = mocker.patch(
+            "src.users.dependencies.is_jti_in_blocklist"
+        )
+        token_data = {"user": {"id": 7, "token_version": 2}, "jti": "jti"}
+
+        assert await TokenBearer().is_revoked(token_data) is False
+        mock_is_jti_in_blocklist.assert_not_called()
+
 
 class TestAccessTokenBearer:
     @pytest.mark.asyncio
@@ -342,6 +369,43 @@ class TestGetCurrentUser:
 
         assert str(exc_info.value) == "Database access error"
 
+    @pytest.mark.asyncio
+    async def test_get_current_user_or_claims_while_the_database_is_unavailable(
+        self, monkeypatch
+    ):
+        token_detail = {
+            "user": {"id": 7, "email": "example@example.de", "role": "user"},
+            "exp": 1737800948,
+            "jti": "b0478698-5b8a-42db-86bc-4102f07d79ef",
+            "refresh": False,
+        }
+
+        async def mock_get_user_by_email(self, user_email, session):
+            raise ServiceUnavailableException("The database circuit breaker is open")
+
+        monkeypatch.setattr(UserService, "get_user_by_email", mock_get_user_by_email)
+
+        user = await get_current_user_or_claims(token_detail, None)
+
+        assert (user.id, user.email, user.role) == (7, "example@example.de", "user")
+
+    @pytest.mark.asyncio
+    async def test_get_current_user_or_claims_without_a_role_claim(self, monkeypatch):
+        token_detail = {
+            "user": {"email": "example@example.de"},
+            "exp": 1737800948,
+            "jti": "b0478698-5b8a-42db-86bc-4102f07d79ef",
+            "refresh": False,
+        }
+
+        async def mock_get_user_by_email(self, user_email, session):
+            raise ServiceUnavailableException("The database circuit breaker is open")
+
+        monkeypatch.setattr(UserService, "get_user_by_email", mock_get_user_by_email)
+
+        with pytest.raises(ServiceUnavailableException):
+            await get_current_user_or_claims(token_detail, None)
+
 
 class TestRoleChecker:
     @pytest.fixture
@@ -0,0 +1,91 @@
+import os
+
+import jwt
+import pytest
+
+from src.users import domains
+from src.users.domains import UserProfile
+from src.users.keyring import Keyring, generate_key
+
+USER_DATA = {"id": 10, "email": "keyring@example.de", "role": "user"}
+
+
+def write_key(directory, kid, algorithm):
+    path = directory / f"{kid}.pem"
+    path.write_bytes(generate_key(algorithm))
+    return path
+
+
+@pytest.fixture
+def use_keyring(mocker):
+    def use(keyring):
+        mocker.patch.object(domains, "keyring", keyring)
+        mocker.patch.object(domains.settings, "JWT_ALGORITHM", keyring.algorithm)
+
+    return use
+
+
+class TestKeyring:
+    @pytest.mark.parametrize("algorithm", ["RS256", "EdDSA"])
+    def test_sign_and_verify_with_kid(self, tmp_path, use_keyring, algorithm):
+        write_key(tmp_path, "2026-01", algorithm)
+        use_keyring(Keyring(str(tmp_path), algorithm))
+
+        token = UserProfile.generate_jwt_token(USER_DATA)
+
+        assert jwt.get_unverified_header(token) == {
+            "alg": algorithm,
+            "kid": "2026-01",
+            "typ": "JWT",
+        }
+        assert UserProfile.decode_token(token)["user"] == USER_DATA
+
+    def test_rotation_keeps_verifying_old_tokens(self, tmp_path, use_keyring):
+        write_key(tmp_path, "2026-01", "EdDSA")
+        keyring = Keyring(str(tmp_path), "EdDSA", reload_interval=0)
+        use_keyring(keyring)
+        old_token = UserProfile.generate_jwt_token(USER_DATA)
+
+        write_key(tmp_path, "2026-02", "EdDSA")
+        new_token = UserProfile.generate_jwt_token(USER_DATA)
+
+        assert jwt.get_unverified_header(new_token)["kid"] == "2026-02"
+        assert UserProfile.decode_token(old_token) is not None
+        assert UserProfile.decode_token(new_token) is not None
+
+        os.remove(tmp_path / "2026-01.pem")
+        assert UserProfile.decode_token(old_token) is None
+
+    def test_unknown_kid_is_rejected(self, tmp_path, use_keyring):
+        write_key(tmp_path, "2026-01", "EdDSA")
+        use_keyring(Keyring(str(tmp_path), "EdDSA"))
+        token = jwt.encode(
+            {"user": USER_DATA},
+            generate_key("EdDSA"),
+            algorithm="EdDSA",
+            headers={"kid": "forged"},
+        )
+
+        assert UserProfile.decode_token(token) is None
+
+    def test_parsed_keys_are_cached(self, tmp_path, mocker):
+        write_key(tmp_path, "2026-01", "RS256")
+        keyring = Keyring(str(tmp_path), "RS256", reload_interval=0)
+        parse = mocker.spy(keyring, "_parse")
+
+        first = keyring.verification_key("2026-01")
+        second = keyring.verification_key("2026-01")
+
+        assert first is second
+        parse.assert_called_once()
+
+    def test_jwks(self, tmp_path):
+        write_key(tmp_path, "2026-01", "EdDSA")
+        (tmp_path / "broken.pem").write_text("not a key")
+
+        jwks = Keyring(str(tmp_path), "EdDSA").jwks()
+
+        assert [key["kid"] for key in jwks["keys"]] == ["2026-01"]
+        assert jwks["keys"][0]["kty"] == "OKP"
+        assert jwks["keys"][0]["alg"] == "EdDSA"
+        assert "d" not in jwks["keys"][0]
@@ -11,7 +11,7 @@ class TestUserService:
         self, mocker, dummy_user, mock_async_db_session
     ):
         mock_query = mocker.MagicMock()
-        mock_query.first.return_value = dummy_user
+        mock_query.all.return_value = [dummy_user]
         mock_async_db_session.exec.return_value = mock_query
 
         result = await UserService().get_user_by_email(
@@ -22,19 +22,19 @@ class TestUserService:
         assert result.email == "captain.unit.test@example.com"
 
     @pytest.mark.asyncio
-    async def test_get_user_by_email_case_insensitive(
+    async def test_get_user_by_email_case_sensitive(
         self, mocker, dummy_user, mock_async_db_session
     ):
         mock_query = mocker.MagicMock()
-        mock_query.first.return_value = dummy_user
+        mock_query.all.return_value = [dummy_user]
         mock_async_db_session.exec.return_value = mock_query
 
         result = await UserService().get_user_by_email(
             "CAPTAIN.UNIT.TEST@EXAMPLE.COM", mock_async_db_session
         )
 
-        assert result is not None
-        assert result.email == "captain.unit.test@example.com"
+        # Emails match exactly, like the unique index on them.
+        assert result is None
 
     @pytest.mark.asyncio
     async def test_get_user_by_email_not_found(self, mocker, mock_async_db_session):
@@ -62,7 +62,7 @@ class TestUserService:
         self, mocker, dummy_user, mock_async_db_session
     ):
         mock_query = mocker.MagicMock()
-        mock_query.first.return_value = dummy_user
+        mock_query.all.return_value = [dummy_user]
         mock_async_db_session.exec.return_value = mock_query
 
         result = await UserService().get_user_by_id(1, mock_async_db_session)
@@ -163,6 +163,9 @@ class TestUserService:
             "src.users.service.UserService.get_user_by_email", return_value=dummy_user
         )
         mocker.patch("src.users.domains.UserProfile.verify_password", return_value=True)
+        mock_get_token_version = mocker.patch(
+            "src.users.service.get_token_version", return_value=3
+        )
 
         mock_create_auth_tokens = mocker.patch(
             "src.users.service.UserService.create_auth_tokens",
@@ -184,9 +187,40 @@ class TestUserService:
         assert isinstance(token["access_token"], str)
         assert isinstance(token["refresh_token"], str)
         mock_create_auth_tokens.assert_called_once_with(
-            {"id": dummy_user.id, "email": dummy_user.email, "role": dummy_user.role}
+            {
+                "id": dummy_user.id,
+                "email": dummy_user.email,
+                "role": dummy_user.role,
+                "token_version": 3,
+            }
+        )
+        mock_get_token_version.assert_called_once_with(dummy_user.id, use_cache=False)
+
+    @pytest.mark.asyncio
+    async def test_authenticate_and_generate_token_releases_connection_first(
+        self, mocker, dummy_user, mock_async_db_session
+    ):
+        calls = mocker.MagicMock()
+        mocker.patch(
+            "src.users.service.UserService.get_user_by_email", return_value=dummy_user
+        )
+        mocker.patch("src.users.service.get_token_version", return_value=0)
+        calls.attach_mock(mock_async_db_session.close, "close")
+        calls.attach_mock(
+            mocker.patch(
+                "src.users.domains.UserProfile.verify_password", return_value=True
+            ),
+            "verify_password",
         )
 
+        await UserService().authenticate_and_generate_token(
+            email="captain.unit.test@example.com",
+            password="Bookhive1234",
+            session=mock_async_db_session,
+        )
+
+        assert [call[0] for call in calls.mock_calls] == ["close", "verify_password"]
+
     @pytest.mark.asyncio
     async def test_authenticate_and_generate_token_user_not_found(
         self, mocker, mock_async_db_session